@@ -2,27 +2,30 @@ import streamlit as st
 import pandas as pd
 import time
 import plotly.graph_objects as go
-import requests
 import os
+from src.apiclient import get_api_client
+from src.replay import ReplayEngine, StreamingReplay
+from src.rendering import FrameThrottle, LiveFigure
+from src.evaluation import load_report
+from src.processdata import DASHBOARD_COLUMNS
+from src.datastore import open_store
 
 # --- 1. CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="Monitor the reactor", page_icon="🏭", layout="wide")
 
-# --- 2. FONCTION POUR L'URL API ---
-def get_api_url():
-    if "API_URL" in st.secrets:
-        return st.secrets["API_URL"]
-    elif "API_URL" in os.environ:
-        return os.environ["API_URL"]
-    else:
-        return "http://localhost:8000"
+# --- 2. CLIENT API (URL : secrets, puis variable API_URL, puis localhost) ---
+# Partagé par toutes les sessions : pool keep-alive, timeouts, nouvelles tentatives
+api = get_api_client()
 
-API_URL = get_api_url()
+# Store mmap local (python -m src.datastore) : open_store le partage entre toutes les sessions du serveur Streamlit
+PROCESS_STORE_PATH = os.environ.get("PROCESS_STORE_PATH", "data/store")
 
-# --- 3. PARAMÈTRES SCIENTIFIQUES ---
-TIME_STEP_MINUTES = 3
-INJECTION_TIME_MIN = 60
-PERSISTENCE_LIMIT = 2
+# --- 3. PARAMÈTRES DE REJEU ---
+# (Les paramètres scientifiques TIME_STEP_MINUTES, INJECTION_TIME_MIN, PERSISTENCE_LIMIT sont dans src/replay.py)
+REPLAY_CHUNK_SIZE = 10
+REPLAY_SPEEDS = {"x1": 1.0, "x2": 2.0, "x5": 5.0, "x10": 10.0, "Max": 0.0}
+RENDER_MAX_POINTS = 600  # points max par courbe envoyés au navigateur
+RENDER_FPS = 10          # rafraîchissements max par seconde
 
 # Métadonnées (inchangé)
 FAULT_METADATA = {
@@ -35,8 +38,18 @@ FAULT_METADATA = {
     7: {"desc": "Pression Collecteur", "f1": 0.97, "accuracy": 0.98, "difficulty": "Moyen", "comment": "Bonne détection."},
 }
 
+# Scores issus de l'évaluation hors-ligne (python -m src.evaluation), prioritaires sur les valeurs statiques
+@st.cache_data(ttl=600)
+def load_fault_report():
+    return load_report().set_index("faultNumber")
+
 def get_fault_info(code):
-    return FAULT_METADATA.get(code, {"desc": "Scénario Standard", "f1": 0.85, "accuracy": 0.88, "difficulty": "Moyen", "comment": "Performance standard."})
+    meta = dict(FAULT_METADATA.get(code, {"desc": "Scénario Standard", "f1": 0.85, "accuracy": 0.88, "difficulty": "Moyen", "comment": "Performance standard."}))
+    report = load_fault_report()
+    if code in report.index:
+        meta["f1"] = float(report.loc[code, "f1"])
+        meta["accuracy"] = float(report.loc[code, "accuracy"])
+    return meta
 
 # --- 4. CSS ---
 st.markdown("""
@@ -63,22 +76,6 @@ def create_reactor_synoptic(current_p, current_t, current_f, base_p, base_t, bas
     Crée un schéma Plotly du réacteur avec 3 LEDs qui changent de couleur
     si la valeur dévie de plus de 2% de la valeur de base.
     """
-
-    # Seuil de tolérance (ex: 2% de déviation = anomalie capteur)
-    THRESHOLD = 0.02
-
-    # Logique couleur (Vert = OK, Rouge = Alerte)
-    def get_color(curr, base):
-        if base == 0: return "#00CC96"
-        dev = abs(curr - base) / base
-        return "#FF4B4B" if dev > THRESHOLD else "#00CC96"
-
-    # Calcul des couleurs pour chaque capteur
-    # Si base est None (début simulation), on reste vert
-    c_p = get_color(current_p, base_p) if base_p else "#00CC96"
-    c_t = get_color(current_t, base_t) if base_t else "#00CC96"
-    c_f = get_color(current_f, base_f) if base_f else "#00CC96"
-
     fig = go.Figure()
 
     # 1. Le Réacteur (Rectangle arrondi)
@@ -93,28 +90,13 @@ def create_reactor_synoptic(current_p, current_t, current_f, base_p, base_t, bas
 
     # 3. Les LEDs (Scatter points)
     # Positions: Pression (Haut), Temp (Milieu), Débit (Sortie)
-
-    # LED Pression
-    fig.add_trace(go.Scatter(
-        x=[5], y=[8], mode='markers+text',
-        marker=dict(size=25, color=c_p, line=dict(width=2, color='white')),
-        text=["<b>P</b>"], textposition="middle center", textfont=dict(color='white'),
-        hoverinfo='text', hovertext=f"Pression: {current_p:.1f}"
-    ))
-    # LED Température
-    fig.add_trace(go.Scatter(
-        x=[5], y=[5], mode='markers+text',
-        marker=dict(size=25, color=c_t, line=dict(width=2, color='white')),
-        text=["<b>T</b>"], textposition="middle center", textfont=dict(color='white'),
-        hoverinfo='text', hovertext=f"Température: {current_t:.1f}"
-    ))
-    # LED Débit
-    fig.add_trace(go.Scatter(
-        x=[8], y=[3], mode='markers+text',
-        marker=dict(size=25, color=c_f, line=dict(width=2, color='white')),
-        text=["<b>D</b>"], textposition="middle center", textfont=dict(color='white'),
-        hoverinfo='text', hovertext=f"Débit: {current_f:.1f}"
-    ))
+    for x, y, label in [(5, 8, "P"), (5, 5, "T"), (8, 3, "D")]:
+        fig.add_trace(go.Scatter(
+            x=[x], y=[y], mode='markers+text',
+            marker=dict(size=25, color="#00CC96", line=dict(width=2, color='white')),
+            text=[f"<b>{label}</b>"], textposition="middle center", textfont=dict(color='white'),
+            hoverinfo='text'
+        ))
 
     # Mise en page propre (sans axes)
     fig.update_layout(
@@ -127,6 +109,26 @@ def create_reactor_synoptic(current_p, current_t, current_f, base_p, base_t, bas
         yaxis=dict(range=[0, 10], showgrid=False, zeroline=False, visible=False),
         showlegend=False
     )
+    return update_reactor_synoptic(fig, current_p, current_t, current_f, base_p, base_t, base_f)
+
+def update_reactor_synoptic(fig, current_p, current_t, current_f, base_p, base_t, base_f):
+    """Met à jour les LEDs d'un schéma existant (couleurs et infobulles uniquement)."""
+
+    # Seuil de tolérance (ex: 2% de déviation = anomalie capteur)
+    THRESHOLD = 0.02
+
+    # Logique couleur (Vert = OK, Rouge = Alerte)
+    def get_color(curr, base):
+        if base == 0: return "#00CC96"
+        dev = abs(curr - base) / base
+        return "#FF4B4B" if dev > THRESHOLD else "#00CC96"
+
+    # Si base est None (début simulation), on reste vert
+    leds = [(current_p, base_p, "Pression"), (current_t, base_t, "Température"), (current_f, base_f, "Débit")]
+    with fig.batch_update():
+        for trace, (curr, base, name) in zip(fig.data, leds):
+            trace.marker.color = get_color(curr, base) if base else "#00CC96"
+            trace.hovertext = f"{name}: {curr:.1f}"
     return fig
 
 # --- 6. INITIALISATION STATE ---
@@ -134,8 +136,6 @@ if 'simulation_running' not in st.session_state: st.session_state.simulation_run
 if 'final_report' not in st.session_state: st.session_state.final_report = None
 if 'final_figs' not in st.session_state: st.session_state.final_figs = None
 
-# Valeurs de base (Moyennes) pour comparer
-if 'base_values' not in st.session_state: st.session_state.base_values = {'p': None, 't': None, 'f': None}
 
 # --- 7. MISE EN PAGE ---
 st.title("🏭 Monitor the Reactor")
@@ -151,18 +151,17 @@ with col_left:
 
     meta = get_fault_info(selected_fault_code)
 
+    replay_speed = REPLAY_SPEEDS[st.select_slider("Vitesse de rejeu", options=list(REPLAY_SPEEDS.keys()), value="x1", disabled=st.session_state.simulation_running)]
+    replay_decimation = st.number_input("Décimation (1 point sur N)", min_value=1, max_value=50, value=1, disabled=st.session_state.simulation_running)
+    live_mode = st.toggle("Flux live (SSE)", value=False, disabled=st.session_state.simulation_running, help="Consomme /stream/telemetry au fil de l'eau au lieu de télécharger le jeu complet.")
+    live_local_producer = st.checkbox("Alimenter par rejeu local", value=True, disabled=not live_mode or st.session_state.simulation_running)
+
     col_btn1, col_btn2 = st.columns(2)
     with col_btn1:
         if st.button("▶️ DÉMARRER", type="primary", use_container_width=True):
             st.session_state.simulation_running = True
             st.session_state.final_report = None
             st.session_state.final_figs = None
-            st.session_state.base_values = {'p': None, 't': None, 'f': None} # Reset bases
-            st.session_state.anomaly_detected = False
-            st.session_state.anomaly_time_min = None
-            st.session_state.diagnosis_confirmed = False
-            st.session_state.diagnosis_time_min = None
-            st.session_state.diag_consecutive_count = 0
 
     with col_btn2:
         if st.button("⏹️ ANNULER", type="primary", use_container_width=True):
@@ -231,106 +230,108 @@ with col_right:
 # ==========================
 if st.session_state.simulation_running:
 
+    # Filtrage et projection côté serveur, transport Arrow IPC compressé
     @st.cache_data(ttl=600)
-    def fetch_data_from_api(url):
-        try:
-            response = requests.get(f"{url}/get-process-data")
-            return pd.DataFrame(response.json()) if response.status_code == 200 else pd.DataFrame()
+    def fetch_data_from_api(url, fault):
+        try: return get_api_client(url).fetch_process_data(fault, DASHBOARD_COLUMNS)
         except Exception: return pd.DataFrame()
 
-    with st.spinner("Chargement..."): df_full = fetch_data_from_api(API_URL)
-    if df_full.empty: st.error("Erreur API."); st.session_state.simulation_running = False; st.stop()
-    if 'faultNumber' in df_full.columns:
-        df_full['faultNumber'] = df_full['faultNumber'].astype(int)
-        simulation_data = df_full[df_full['faultNumber'] == selected_fault_code].reset_index(drop=True)
-    else: simulation_data = df_full
-    if simulation_data.empty: st.error("Aucune donnée."); st.session_state.simulation_running = False; st.stop()
-
-    history_pression, history_temp, history_debit, history_pred, history_time = [], [], [], [], []
-
-    # Pour calculer la moyenne des 10 premiers points (calibration des capteurs)
-    init_p, init_t, init_f = [], [], []
-
-    for index, row in simulation_data.iterrows():
-        if not st.session_state.simulation_running: break
-
-        val_press = row.get('xmeas_7', 0); val_temp = row.get('xmeas_9', 0); val_debit = row.get('xmeas_10', 0)
-        val_sample = row.get('sample', index)
-        val_detector = float(row.get('detector', 0)); val_diagnosis = float(row.get('faults_pred', 0))
-
-        current_time_hours = (val_sample * TIME_STEP_MINUTES) / 60
-        current_time_minutes = val_sample * TIME_STEP_MINUTES
-        display_pred = 0.0 if current_time_hours < 1.0 else val_diagnosis
-
-        # --- CALIBRATION DU RÉACTEUR (5 premiers points) ---
-        # On détermine les valeurs "Normales" au tout début
-        if index < 5:
-            init_p.append(val_press)
-            init_t.append(val_temp)
-            init_f.append(val_debit)
-        elif index == 5:
-            st.session_state.base_values['p'] = sum(init_p)/len(init_p)
-            st.session_state.base_values['t'] = sum(init_t)/len(init_t)
-            st.session_state.base_values['f'] = sum(init_f)/len(init_f)
-
-        # --- LOGIQUE HYBRIDE ---
-        if current_time_minutes > INJECTION_TIME_MIN:
-            if not st.session_state.anomaly_detected and val_detector > 0.5:
-                st.session_state.anomaly_detected = True
-                st.session_state.anomaly_time_min = current_time_minutes
-            if not st.session_state.diagnosis_confirmed:
-                if round(val_diagnosis) == selected_fault_code: st.session_state.diag_consecutive_count += 1
-                else: st.session_state.diag_consecutive_count = 0
-                if st.session_state.diag_consecutive_count >= PERSISTENCE_LIMIT:
-                    st.session_state.diagnosis_confirmed = True
-                    st.session_state.diagnosis_time_min = current_time_minutes
-
-        history_pression.append(val_press); history_temp.append(val_temp); history_debit.append(val_debit)
-        history_pred.append(display_pred); history_time.append(current_time_hours)
-
-        # --- UPDATE GRAPHS ---
-        fig1 = go.Figure(go.Scatter(x=history_time, y=history_pression, mode='lines', line=dict(color='cyan')))
-        fig1.update_layout(height=180, margin=dict(t=30,b=10,l=10,r=10), title="Pression", xaxis_title="Heures", template="plotly_dark")
-        chart_feat1.plotly_chart(fig1, use_container_width=True, key=f"f1_{index}")
-
-        fig2 = go.Figure(go.Scatter(x=history_time, y=history_temp, mode='lines', line=dict(color='orange')))
-        fig2.update_layout(height=180, margin=dict(t=30,b=10,l=10,r=10), title="Température", xaxis_title="Heures", template="plotly_dark")
-        chart_feat2.plotly_chart(fig2, use_container_width=True, key=f"f2_{index}")
-
-        fig3 = go.Figure(go.Scatter(x=history_time, y=history_debit, mode='lines', line=dict(color='#00FF00')))
-        fig3.update_layout(height=180, margin=dict(t=30,b=10,l=10,r=10), title="Débit", xaxis_title="Heures", template="plotly_dark")
-        chart_feat3.plotly_chart(fig3, use_container_width=True, key=f"f3_{index}")
-
-        fig_main = go.Figure()
-        fig_main.add_trace(go.Scatter(x=history_time, y=history_pred, mode='lines', name='Diag', line=dict(color='#FF4B4B', width=2)))
-        fig_main.add_vrect(x0=0, x1=1, fillcolor="gray", opacity=0.3, line_width=0, annotation_text="STABILISATION", annotation_position="top left", annotation_font_color="white")
-        fig_main.update_layout(title="Type de Panne", height=250, margin=dict(t=30,b=20,l=20,r=20), paper_bgcolor="rgba(0,0,0,0)", template="plotly_dark", xaxis=dict(title="Heures", range=[0, max(1.1, current_time_hours + 0.1)]), yaxis=dict(title="Code Panne", visible=True, automargin=True))
-        chart_main_spot.plotly_chart(fig_main, use_container_width=True, key=f"main_{index}")
-
-        # --- UPDATE SYNOPTIQUE (NOUVEAU) ---
-        # On passe les valeurs actuelles et les valeurs de base
+    if live_mode:
+        # Flux poussé par le serveur : aucun téléchargement du jeu complet
+        if live_local_producer:
+            try:
+                api.post("/stream/replay", params={"fault": selected_fault_code, "speed": replay_speed}).raise_for_status()
+            except Exception: st.error("Erreur API."); st.session_state.simulation_running = False; st.stop()
+        engine = StreamingReplay(selected_fault_code, decimation=int(replay_decimation))
+        replay_chunks = (engine.push(frame) for frame in api.stream_chunks(selected_fault_code, REPLAY_CHUNK_SIZE))
+    else:
+        store = open_store(PROCESS_STORE_PATH)
+        if store is not None: df_full = store.frame(fault=selected_fault_code, columns=DASHBOARD_COLUMNS)
+        else:
+            with st.spinner("Chargement..."): df_full = fetch_data_from_api(api.base_url, selected_fault_code)
+            # Scénario suivant téléchargé en tâche de fond pendant ce rejeu
+            next_fault = selected_fault_code % len(scenario_options) + 1
+            api.prefetch_process_data(next_fault, DASHBOARD_COLUMNS)
+        if df_full.empty: st.error("Erreur API."); st.session_state.simulation_running = False; st.stop()
+        if 'faultNumber' in df_full.columns:
+            df_full['faultNumber'] = df_full['faultNumber'].astype(int)
+            simulation_data = df_full[df_full['faultNumber'] == selected_fault_code].reset_index(drop=True)
+        else: simulation_data = df_full
+        if simulation_data.empty: st.error("Aucune donnée."); st.session_state.simulation_running = False; st.stop()
+
+        # Colonnes lues une seule fois en NumPy, état de détection/diagnostic calculé d'avance
+        engine = ReplayEngine(simulation_data, selected_fault_code, chunk_size=REPLAY_CHUNK_SIZE,
+                              decimation=int(replay_decimation), speed=replay_speed)
+        replay_chunks = engine.chunks()
+
+    # --- FIGURES (construites une seule fois, étendues à chaque bloc) ---
+    def make_sensor_fig(title, color):
+        fig = go.Figure(go.Scatter(x=[], y=[], mode='lines', line=dict(color=color)))
+        fig.update_layout(height=180, margin=dict(t=30,b=10,l=10,r=10), title=title, xaxis_title="Heures", template="plotly_dark")
+        return fig
+
+    fig1 = make_sensor_fig("Pression", 'cyan')
+    fig2 = make_sensor_fig("Température", 'orange')
+    fig3 = make_sensor_fig("Débit", '#00FF00')
+
+    fig_main = go.Figure()
+    fig_main.add_trace(go.Scatter(x=[], y=[], mode='lines', name='Diag', line=dict(color='#FF4B4B', width=2)))
+    fig_main.add_vrect(x0=0, x1=1, fillcolor="gray", opacity=0.3, line_width=0, annotation_text="STABILISATION", annotation_position="top left", annotation_font_color="white")
+    fig_main.update_layout(title="Type de Panne", height=250, margin=dict(t=30,b=20,l=20,r=20), paper_bgcolor="rgba(0,0,0,0)", template="plotly_dark", xaxis=dict(title="Heures", range=[0, 1.1]), yaxis=dict(title="Code Panne", visible=True, automargin=True))
+
+    # Historique complet en tampons NumPy, affichage sous-échantillonné (LTTB) et cadencé
+    live_figs = {name: LiveFigure(fig, RENDER_MAX_POINTS) for name, fig in [('f1', fig1), ('f2', fig2), ('f3', fig3), ('main', fig_main)]}
+    spots = {'f1': chart_feat1, 'f2': chart_feat2, 'f3': chart_feat3, 'main': chart_main_spot}
+    throttle = FrameThrottle(RENDER_FPS)
+    fig_syn = create_reactor_synoptic(0, 0, 0, None, None, None)
+
+    def draw_frame(chunk):
+        current_time_hours = chunk.current["time_h"]
+        fig_main.update_xaxes(range=[0, max(1.1, current_time_hours + 0.1)])
+        for name, live in live_figs.items():
+            spots[name].plotly_chart(live.render(), use_container_width=True, key=f"{name}_{throttle.frames}")
+
+        # --- UPDATE SYNOPTIQUE ---
         # Note : On force l'affichage Vert pendant la première heure (current_time_hours < 1.0)
         # pour éviter que ça clignote pendant la chauffe.
+        val_press, val_temp, val_debit = chunk.current["pressure"], chunk.current["temperature"], chunk.current["flow"]
+        base = engine.baseline
         if current_time_hours < 1.0:
-            fig_syn = create_reactor_synoptic(val_press, val_temp, val_debit, None, None, None)
+            update_reactor_synoptic(fig_syn, val_press, val_temp, val_debit, None, None, None)
         else:
-            fig_syn = create_reactor_synoptic(val_press, val_temp, val_debit,
-                                              st.session_state.base_values['p'],
-                                              st.session_state.base_values['t'],
-                                              st.session_state.base_values['f'])
+            update_reactor_synoptic(fig_syn, val_press, val_temp, val_debit, base['p'], base['t'], base['f'])
+        synoptic_spot.plotly_chart(fig_syn, use_container_width=True, key=f"syn_{throttle.frames}")
+
+    last_chunk = None
+    try:
+        for chunk in replay_chunks:
+            if not st.session_state.simulation_running: break
+
+            # --- UPDATE GRAPHS (points du bloc uniquement) ---
+            live_figs['f1'].extend(chunk.time_h, chunk.pressure)
+            live_figs['f2'].extend(chunk.time_h, chunk.temperature)
+            live_figs['f3'].extend(chunk.time_h, chunk.flow)
+            live_figs['main'].extend(chunk.time_h, chunk.prediction)
+            last_chunk = chunk
+
+            if throttle.ready(): draw_frame(chunk)
+
+            time.sleep(engine.pause_for(chunk))
+    except Exception:
+        # Flux SSE coupé (API arrêtée, timeout...) : la simulation ne doit pas rester "En cours"
+        st.error("Erreur API : flux interrompu."); st.session_state.simulation_running = False; st.stop()
 
-        synoptic_spot.plotly_chart(fig_syn, use_container_width=True, key=f"syn_{index}")
+    # Dernière image toujours affichée, même si le throttle l'avait sautée
+    if st.session_state.simulation_running and last_chunk is not None and any(live.dirty for live in live_figs.values()):
+        throttle.ready(force=True); draw_frame(last_chunk)
 
-        time.sleep(0.05)
+    if st.session_state.simulation_running and len(engine) == 0: st.error("Aucune donnée."); st.session_state.simulation_running = False; st.stop()
 
     if st.session_state.simulation_running:
-        d_det, d_diag, det_time_h, diag_time_h = None, None, None, None
-        if st.session_state.anomaly_detected:
-            d_det = max(0, st.session_state.anomaly_time_min - INJECTION_TIME_MIN)
-            det_time_h = st.session_state.anomaly_time_min / 60
-        if st.session_state.diagnosis_confirmed:
-            d_diag = max(0, st.session_state.diagnosis_time_min - INJECTION_TIME_MIN)
-            diag_time_h = st.session_state.diagnosis_time_min / 60
+        events = engine.events
+        d_det, d_diag = events.detection_delay, events.diagnosis_delay
+        det_time_h = events.anomaly_time_min / 60 if events.anomaly_time_min is not None else None
+        diag_time_h = events.diagnosis_time_min / 60 if events.diagnosis_time_min is not None else None
 
         st.session_state.final_report = {"scenario": selected_scenario_name, "detection_delay": d_det, "diagnosis_delay": d_diag}
 
@@ -1,24 +1,23 @@
 import streamlit as st
-import requests
+import pandas as pd
 import time
-import os
+from src.apiclient import get_api_client, get_api_url
+from src.metrics import histogram_quantile, parse_metrics
 
 st.set_page_config(page_title="Test API", page_icon="🔧")
 
 st.title("🔧 Console de Test API")
 
 # --- CONFIGURATION ---
-# Astuce : Pour ne pas modifier le code à chaque fois, on essaie de lire les secrets Streamlit,
-# sinon on utilise une valeur par défaut.
-# Pour l'instant, remplacez juste la string ci-dessous par votre URL Cloud Run.
+# Astuce : Pour ne pas modifier le code à chaque fois, on lit les secrets Streamlit (puis la variable API_URL),
+# sinon on utilise l'URL Cloud Run ci-dessous.
 DEFAULT_URL = "https://monitor-the-reactor-api-899473705146.europe-west1.run.app"
 
 # Champ texte pour modifier l'URL à la volée si besoin (pratique pour tester local vs distant)
-api_url = st.text_input("URL de l'API cible", value=DEFAULT_URL)
+api_url = st.text_input("URL de l'API cible", value=get_api_url(DEFAULT_URL))
 
-# On retire le slash final s'il est présent pour éviter les erreurs "//"
-if api_url.endswith("/"):
-    api_url = api_url[:-1]
+# Client partagé (pool keep-alive, timeouts, nouvelles tentatives), un par URL ; le slash final est retiré
+api = get_api_client(api_url)
 
 st.divider()
 
@@ -31,9 +30,9 @@ with col1:
     if st.button("Pinger l'API", type="primary"):
         with col2:
             try:
-                start_time = time.time()
-                response = requests.get(f"{api_url}/")
-                duration = time.time() - start_time
+                start_time = time.perf_counter()
+                response = api.get("/")
+                duration = time.perf_counter() - start_time
 
                 if response.status_code == 200:
                     data = response.json()
@@ -59,7 +58,7 @@ with col_h1:
     if st.button("Vérifier Santé"):
         with col_h2:
             try:
-                response = requests.get(f"{api_url}/health")
+                response = api.get("/health")
 
                 if response.status_code == 200:
                     data = response.json()
@@ -72,6 +71,52 @@ with col_h1:
             except Exception as e:
                 st.error(f"❌ Erreur technique : {e}")
 
+st.divider()
+
+# --- BLOC DE TEST 3 : LATENCES EN DIRECT ---
+st.subheader("3. Latences en Direct (Route `/metrics`)")
+
+LATENCY_QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+def latency_table(samples, metric, *labels):
+    """Percentiles (ms) par combinaison de `labels` (ex. méthode et route), calculés depuis les buckets de l'histogramme."""
+    buckets, counts = {}, {}
+    for sample, value in samples.get(f"{metric}_bucket", []):
+        buckets.setdefault(tuple(sample[l] for l in labels), {})[sample["le"]] = value
+    for sample, value in samples.get(f"{metric}_count", []):
+        key = tuple(sample[l] for l in labels)
+        counts[key] = counts.get(key, 0) + value
+    rows = []
+    for key, b in sorted(buckets.items()):
+        row = {**dict(zip(labels, key)), "requêtes": int(counts.get(key, 0))}
+        row.update({q: round(histogram_quantile(v, b) * 1000, 3) for q, v in LATENCY_QUANTILES.items()})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+auto_refresh = st.toggle("Rafraîchissement automatique (2 s)", value=False)
+
+@st.fragment(run_every=2 if auto_refresh else None)
+def live_latencies():
+    try:
+        response = api.get("/metrics")
+        response.raise_for_status()
+    except Exception as e:
+        st.error(f"❌ Erreur technique : {e}")
+        return
+    samples = parse_metrics(response.text)
+    in_flight = samples.get("reactor_http_requests_in_flight", [({}, 0)])[0][1]
+    load_s = samples.get("reactor_model_load_seconds", [({}, 0)])[0][1]
+    c1, c2 = st.columns(2)
+    c1.metric("Requêtes en cours", int(in_flight))
+    c2.metric("Chargement du modèle", f"{load_s * 1000:.1f} ms")
+    st.caption("Latence par méthode et route (ms)")
+    st.dataframe(latency_table(samples, "reactor_http_request_duration_seconds", "method", "route"), hide_index=True, use_container_width=True)
+    st.caption("Latence par étape (ms)")
+    st.dataframe(latency_table(samples, "reactor_stage_duration_seconds", "stage"), hide_index=True, use_container_width=True)
+
+if auto_refresh or st.button("Lire les métriques"):
+    live_latencies()
+
 # --- SECTION INFO ---
 st.sidebar.markdown("---")
 st.sidebar.info(
@@ -0,0 +1,64 @@
+import streamlit as st
+import pandas as pd
+import time
+import os
+from src.apiclient import get_api_client
+from src.comparison import ScenarioSet, small_multiples, summary
+from src.datastore import open_store
+from src.processdata import DASHBOARD_COLUMNS
+
+st.set_page_config(page_title="Comparaison", page_icon="📊", layout="wide")
+
+st.title("📊 Comparaison de Scénarios")
+
+# --- CONFIGURATION ---
+PROCESS_STORE_PATH = os.environ.get("PROCESS_STORE_PATH", "data/store")
+COMPARISON_WORKERS = os.cpu_count() or 1
+SERIES_OPTIONS = {"Score détecteur": "detector", "Diagnostic (code panne)": "prediction",
+                  "Pression": "pressure", "Température": "temperature", "Débit": "flow"}
+
+api = get_api_client()
+
+# Un seul jeu de données pour tous les scénarios : store mmap local, sinon téléchargements concurrents
+@st.cache_data(ttl=600, show_spinner=False)
+def load_scenarios(url, faults):
+    store = open_store(PROCESS_STORE_PATH)
+    if store is not None:
+        frames = [store.frame(fault=f, columns=DASHBOARD_COLUMNS) for f in faults]
+    else:
+        frames = list(get_api_client(url).fetch_process_data_many(faults, DASHBOARD_COLUMNS).values())
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=DASHBOARD_COLUMNS)
+
+# --- CONTRÔLES ---
+c1, c2, c3 = st.columns([3, 1, 1])
+with c1:
+    selected_faults = st.multiselect("Scénarios", list(range(1, 21)), default=list(range(1, 7)), format_func=lambda f: f"Panne #{f}")
+with c2:
+    series_label = st.selectbox("Courbe", list(SERIES_OPTIONS.keys()))
+with c3:
+    ncols = st.number_input("Colonnes", min_value=1, max_value=6, value=4)
+
+if st.button("📊 COMPARER", type="primary") and selected_faults:
+    faults = tuple(sorted(selected_faults))
+    start = time.perf_counter()
+    try:
+        with st.spinner("Chargement..."): df = load_scenarios(api.base_url, faults)
+    except Exception as e:
+        st.error(f"❌ Erreur API : {e}"); st.stop()
+    loaded = time.perf_counter()
+
+    # Conversion en tableaux une seule fois, chronologies calculées en parallèle
+    scenarios = ScenarioSet(df)
+    series = SERIES_OPTIONS[series_label]
+    timelines = scenarios.timelines(faults, series=(series,), workers=COMPARISON_WORKERS)
+    if not timelines: st.error("Aucune donnée."); st.stop()
+    fig = small_multiples(timelines, series, ncols=int(ncols))
+    computed = time.perf_counter()
+
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(timelines)} scénarios — chargement {loaded - start:.2f}s, calcul et rendu {computed - loaded:.2f}s. "
+               "Pointillés gris : injection, orange : détection, rouge : diagnostic.")
+
+    report = summary(timelines).rename(columns={"faultNumber": "Panne", "samples": "Points",
+                                                "detection_delay": "Détection (min)", "diagnosis_delay": "Diagnostic (min)"})
+    st.dataframe(report, hide_index=True, use_container_width=True)
@@ -0,0 +1,164 @@
+"""
+Client HTTP de l'API partagé par les pages du tableau de bord.
+
+Un seul ApiClient par URL et par serveur Streamlit (st.cache_resource) :
+- requests.Session avec pool de connexions keep-alive (pas de nouvelle
+  poignée TCP/TLS vers Cloud Run à chaque appel) ;
+- timeouts de connexion et de lecture sur tous les appels ;
+- nouvelles tentatives bornées avec backoff exponentiel (erreurs de connexion,
+  502/503/504 sur les GET) ;
+- réponses en flux (SSE, gros téléchargements) ;
+- requêtes concurrentes via httpx.AsyncClient (fetch_many) ;
+- préchargement en tâche de fond du jeu de données d'un scénario.
+"""
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import pandas as pd
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.processdata import DASHBOARD_COLUMNS, deserialize
+from src.telemetry import stream_chunks
+
+DEFAULT_API_URL = "http://localhost:8000"
+CONNECT_TIMEOUT_S = 3.05
+READ_TIMEOUT_S = 30.0
+RETRIES = 3
+BACKOFF_FACTOR = 0.3
+POOL_SIZE = 10
+PREFETCH_SLOTS = 2
+RETRY_STATUSES = (502, 503, 504)
+
+
+def get_api_url(default: str = DEFAULT_API_URL) -> str:
+    """API_URL from the Streamlit secrets, then the environment, else `default`."""
+    try:
+        if "API_URL" in st.secrets:
+            return st.secrets["API_URL"].rstrip("/")
+    except FileNotFoundError:
+        pass  # pas de secrets.toml
+    return os.environ.get("API_URL", default).rstrip("/")
+
+
+class ApiClient:
+    def __init__(self, base_url: str, connect_timeout: float = CONNECT_TIMEOUT_S, read_timeout: float = READ_TIMEOUT_S,
+                 retries: int = RETRIES, backoff_factor: float = BACKOFF_FACTOR, pool_size: int = POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.pool_size = pool_size
+        # Les erreurs de connexion sont rejouées pour toutes les méthodes, les statuts seulement pour les GET
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff_factor,
+                      status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({"GET", "HEAD"}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="api-prefetch")
+        self._prefetched: "OrderedDict[Tuple, Future]" = OrderedDict()
+        self._lock = threading.Lock()  # client partagé entre les sessions Streamlit
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    # --- Appels synchrones ---
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, self.url(path), **kwargs)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    @contextmanager
+    def stream(self, path: str, **kwargs) -> Iterator[requests.Response]:
+        """GET whose body is read incrementally (iter_lines / iter_content)."""
+        with self.get(path, stream=True, **kwargs) as response:
+            response.raise_for_status()
+            yield response
+
+    def stream_chunks(self, fault: int, chunk_size: int = 10, last_id: int = -1) -> Iterator[pd.DataFrame]:
+        return stream_chunks(self.base_url, fault, chunk_size, last_id, timeout=self.timeout, session=self.session)
+
+    # --- Jeu de données process ---
+    def fetch_process_data(self, fault: int, columns: Sequence[str] = DASHBOARD_COLUMNS) -> pd.DataFrame:
+        """Server-filtered, projected run data over Arrow IPC; served from a prefetch if one is pending."""
+        key = (fault, tuple(columns))
+        with self._lock:
+            pending = self._prefetched.pop(key, None)
+        if pending is not None:
+            try:
+                return pending.result()
+            except requests.RequestException:
+                pass  # échec du préchargement : nouvel appel ci-dessous
+        return self._fetch_process_data(fault, columns)
+
+    def _fetch_process_data(self, fault: int, columns: Sequence[str]) -> pd.DataFrame:
+        params = {"fault": fault, "columns": ",".join(columns), "format": "arrow"}
+        response = self.get("/get-process-data", params=params)
+        response.raise_for_status()
+        return deserialize(response.content, response.headers.get("content-type", ""))
+
+    def prefetch_process_data(self, fault: int, columns: Sequence[str] = DASHBOARD_COLUMNS) -> Future:
+        """Starts downloading a scenario in the background; the next fetch_process_data picks it up."""
+        key = (fault, tuple(columns))
+        with self._lock:
+            if key not in self._prefetched:
+                self._prefetched[key] = self._executor.submit(self._fetch_process_data, fault, columns)
+                while len(self._prefetched) > PREFETCH_SLOTS:
+                    self._prefetched.popitem(last=False)
+            return self._prefetched[key]
+
+    # --- Appels concurrents ---
+    async def _gather(self, calls: List[Tuple[str, Dict[str, Any]]], concurrency: int):
+        import httpx
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        transport = httpx.AsyncHTTPTransport(retries=self.retries, limits=limits)
+        timeout = httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, transport=transport, timeout=timeout) as client:
+            async def one(path, params):
+                async with semaphore:
+                    return await client.get(path, params=params)
+            return await asyncio.gather(*(one(path, params) for path, params in calls), return_exceptions=True)
+
+    def fetch_many(self, calls: List[Tuple[str, Dict[str, Any]]], concurrency: Optional[int] = None) -> List[Any]:
+        """
+        Runs GET (path, params) calls concurrently; returns, in order, an
+        httpx.Response or the exception raised by each call.
+        """
+        return asyncio.run(self._gather(calls, concurrency or self.pool_size))
+
+    def fetch_process_data_many(self, faults: Sequence[int], columns: Sequence[str] = DASHBOARD_COLUMNS) -> Dict[int, pd.DataFrame]:
+        params = {"columns": ",".join(columns), "format": "arrow"}
+        responses = self.fetch_many([("/get-process-data", {**params, "fault": f}) for f in faults])
+        frames = {}
+        for fault, response in zip(faults, responses):
+            if isinstance(response, Exception):
+                raise response
+            response.raise_for_status()
+            frames[fault] = deserialize(response.content, response.headers.get("content-type", ""))
+        return frames
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_client(url: str) -> ApiClient:
+    return ApiClient(url)
+
+
+def get_api_client(url: Optional[str] = None) -> ApiClient:
+    """Client shared by every session and page of the Streamlit server (one per URL)."""
+    return _cached_client((url or get_api_url()).rstrip("/"))
@@ -0,0 +1,282 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+from pydantic import BaseModel
+from src import processdata
+from src.batching import MicroBatcher
+from src.config import settings
+from src.datastore import open_store
+from src.features import RollingFeatures, RollingState
+from src.metrics import SIZE_BUCKETS_BYTES, MetricsMiddleware, MetricsRegistry
+from src.predcache import PredictionCache
+from src.registry import ModelRegistry
+from src.schema import SchemaError, load_schema
+from src.scoring import ScoringPool
+from src.streamdetector import StreamDetector
+from src.telemetry import TelemetryHub, replay_producer, sse_events
+
+# --- Métriques (/metrics) ---
+metrics = MetricsRegistry()
+http_requests = metrics.counter("reactor_http_requests_total", "HTTP requests by method, route and status.", ["method", "route", "status"])
+http_duration = metrics.histogram("reactor_http_request_duration_seconds", "HTTP request latency.", ["method", "route"])
+http_in_flight = metrics.gauge("reactor_http_requests_in_flight", "HTTP requests being served.")
+stage_duration = metrics.histogram("reactor_stage_duration_seconds", "Time spent per processing stage.", ["stage"])
+fetch_bytes = metrics.histogram("reactor_process_data_response_bytes", "Size of /get-process-data responses.", ["format"], buckets=SIZE_BUCKETS_BYTES)
+fetch_duration = metrics.histogram("reactor_process_data_fetch_duration_seconds", "Selection + serialization time of /get-process-data.", ["format"])
+stage_timer = stage_duration.time if settings.metrics_enabled else None
+
+schema = load_schema(settings.feature_schema_path or None, on_invalid=settings.feature_on_invalid or None)
+window = (RollingFeatures(len(schema.names), settings.rolling_windows, settings.rolling_ewma_alphas)
+          if settings.rolling_windows or settings.rolling_ewma_alphas else None)
+registry = ModelRegistry(settings.model_registry_dir, settings.model_path, settings.scaler_path, backend=settings.inference_backend,
+                         timer=stage_timer, snapshot_dir=settings.model_snapshot_dir or None, schema=schema,
+                         window=window)
+cache = PredictionCache(settings.prediction_cache_size, settings.prediction_cache_ttl_s, settings.prediction_cache_precision) if settings.prediction_cache_enabled else None
+if cache is not None:
+    registry.on_reload(lambda _: cache.clear())
+# Résolu à chaque lot pour suivre les rechargements à chaud du registre
+batcher = MicroBatcher(lambda rows: registry.pipeline.predict_proba_batch(rows), settings.batch_max_size, settings.batch_max_wait_ms)
+scoring = ScoringPool(settings.scoring_pool_workers, settings.scoring_pool_min_batch)
+telemetry = TelemetryHub(settings.telemetry_buffer_size)
+
+# Valeurs lues au moment du scrape : aucun coût sur le chemin des requêtes
+metrics.gauge("reactor_model_load_seconds", "Load time of the served model version.").set_function(lambda: registry.load_time_s)
+metrics.gauge("reactor_model_warmup_seconds", "Warm-up time of the served model version.").set_function(lambda: registry.warmup_time_s)
+metrics.counter("reactor_model_reloads_total", "Model loads and hot reloads.").set_function(lambda: registry.reloads)
+metrics.gauge("reactor_batch_pending_rows", "Rows waiting in the micro-batcher.").set_function(lambda: batcher.pending)
+metrics.counter("reactor_scoring_offloaded_total", "Batches scored in the process pool.").set_function(lambda: scoring.offloaded)
+metrics.counter("reactor_scoring_inline_total", "Batches scored in a worker thread.").set_function(lambda: scoring.inline)
+metrics.register_histogram("reactor_batch_size", "Rows per micro-batch.", batcher.batch_sizes)
+metrics.register_histogram("reactor_batch_queue_wait_ms", "Queue wait of micro-batched rows (ms).", batcher.queue_wait_ms)
+if cache is not None:
+    metrics.counter("reactor_prediction_cache_hits_total", "Prediction cache hits.").set_function(lambda: cache.hits)
+    metrics.counter("reactor_prediction_cache_misses_total", "Prediction cache misses.").set_function(lambda: cache.misses)
+detector = StreamDetector(window=settings.detector_window)
+_detector_streams: Dict[int, int] = {}
+# États glissants par flux pour /predict, en mémoire du processus : src.serve démarre alors un seul worker
+MAX_FEATURE_STREAMS = 1024
+_feature_states: "OrderedDict[str, RollingState]" = OrderedDict()
+_feature_lock = threading.Lock()
+
+def feature_state(stream: str) -> RollingState:
+    state = _feature_states.pop(stream, None)
+    if state is None:
+        state = window.state()
+        while len(_feature_states) >= MAX_FEATURE_STREAMS:
+            _feature_states.popitem(last=False)
+    _feature_states[stream] = state
+    return state
+
+def predict_stream(features: Dict[str, float], stream: str) -> float:
+    pipeline = registry.pipeline
+    # Verrou limité à la mise à jour O(1) de l'état (ordre des échantillons d'un flux) ; inférence hors verrou
+    with _feature_lock:
+        x = pipeline.vector(features, feature_state(stream))
+    return pipeline.predict_proba_vector(x)
+# Un producteur de rejeu par panne : relancer un rejeu annule le précédent
+_producers: Dict[int, asyncio.Task] = {}
+
+def load_model():
+    try:
+        registry.ensure_loaded()
+    except Exception:
+        pass  # journalisé par le registre et exposé par /health/ready ; le watcher réessaiera
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Modèle chargé en tâche de fond : le port écoute tout de suite, /health/ready passe à 200 une fois prêt
+    loader = asyncio.create_task(asyncio.to_thread(load_model))
+    watcher = asyncio.create_task(registry.watch(settings.model_watch_interval_s)) if settings.model_watch_interval_s > 0 else None
+    yield
+    loader.cancel()
+    if watcher is not None:
+        watcher.cancel()
+    for task in list(_producers.values()):
+        task.cancel()
+    scoring.shutdown()
+
+app = FastAPI(title="Monitor the Reactor API", lifespan=lifespan)
+# Compression gzip des réponses JSON négociée via Accept-Encoding ; Arrow / Parquet sont déjà compressés (zstd / lz4)
+app.add_middleware(GZipMiddleware, minimum_size=1024,
+                   exclude_content_types=(*DEFAULT_EXCLUDED_CONTENT_TYPES, processdata.ARROW_MEDIA_TYPE, processdata.PARQUET_MEDIA_TYPE))
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, requests_total=http_requests, duration=http_duration, in_flight=http_in_flight)
+
+class SensorData(BaseModel):
+    temperature: float
+    pressure: float
+    flowrate: float
+    vibration: float
+    threshold: Optional[float] = None
+    stream: str = "default"  # variables glissantes : identifiant du flux (réacteur / run)
+
+class SensorBatch(BaseModel):
+    # null : valeur absente, rejetée ou imputée par le schéma ; variables glissantes : un run, dans l'ordre
+    instances: List[Dict[str, Optional[float]]]
+    threshold: Optional[float] = None
+
+@app.get("/")
+def root():
+    return {"greeting": "Monitor the Reactor API is running"}
+
+@app.get("/health")
+def health():
+    pipeline = registry.pipeline
+    return {
+        "status": "ok",
+        "modelloaded": pipeline.has_model,
+        "preprocessorloaded": pipeline.has_scaler,
+        "worker_pid": os.getpid(),
+        **registry.info(),
+    }
+
+@app.get("/health/live")
+def health_live():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def health_ready(response: Response):
+    # Ne déclenche pas le chargement : sonde de disponibilité (Cloud Run / Kubernetes)
+    if not registry.ready:
+        response.status_code = 503
+        if registry.load_error:
+            return {"status": "error", "error": registry.load_error}
+        return {"status": "loading"}
+    return {"status": "ready", "model_version": registry.version}
+
+@app.post("/predict")
+async def predict(data: SensorData):
+    threshold = data.threshold if data.threshold is not None else settings.alert_threshold
+    try:
+        # Validé seul avant le micro-batch : une ligne invalide ne fait pas rejeter le lot des autres requêtes
+        x = schema.row(data.model_dump(exclude={"threshold", "stream"}))
+    except SchemaError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "report": e.report})
+    features = dict(zip(schema.names, x))
+    if window is not None:
+        # L'échantillon met à jour l'état de son flux en O(1) : ni cache ni micro-batch (l'ordre compte)
+        proba = await asyncio.to_thread(predict_stream, features, data.stream)
+        return {"probability": proba, "alert": proba >= threshold, "threshold": threshold}
+    if cache is not None:
+        key = cache.key(registry.signature, x)
+        proba = cache.get(key)
+        if proba is not None:
+            return {"probability": proba, "alert": proba >= threshold, "threshold": threshold}
+    if settings.batching_enabled:
+        proba = await batcher.submit(features)
+    else:
+        proba = await asyncio.to_thread(lambda: registry.pipeline.predict_proba(features))
+    if cache is not None:
+        cache.put(key, proba)
+    return {"probability": proba, "alert": proba >= threshold, "threshold": threshold}
+
+@app.post("/predict/batch")
+async def predict_batch(batch: SensorBatch):
+    threshold = batch.threshold if batch.threshold is not None else settings.alert_threshold
+    try:
+        # Gros lots scorés dans le pool de processus : la boucle asyncio n'est jamais bloquée
+        probas = await scoring.predict_proba_batch(registry.pipeline, batch.instances)
+    except SchemaError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "report": e.report})
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    with stage_duration.time("serialization"):
+        return {
+            "probabilities": probas.tolist(),
+            "alerts": (probas >= threshold).tolist(),
+            "threshold": threshold,
+            "count": len(batch.instances),
+        }
+
+@app.post("/admin/reload")
+def reload_model(version: Optional[str] = None):
+    # Version explicite épinglée (le watcher ne la remplace pas) ; sans version : retour à ACTIVE / la plus récente
+    try:
+        return registry.load(version, pin=True)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats/cache")
+def cache_stats():
+    return {"enabled": cache is not None, **(cache.stats() if cache is not None else {})}
+
+@app.get("/stats/batching")
+def batching_stats():
+    return {"enabled": settings.batching_enabled, **batcher.stats()}
+
+def select_process_data(fault=None, run=None, start=None, stop=None, columns=None):
+    # Store mmap partagé si construit (python -m src.datastore), sinon fichier source
+    store = open_store(settings.process_store_path)
+    try:
+        if store is not None:
+            return store.frame(fault, run, start, stop, columns)
+        df = processdata.load_process_data(settings.process_data_path)
+        return processdata.filter_process_data(df, fault, run, start, stop, columns)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.get("/get-process-data")
+def get_process_data(fault: Optional[int] = None, run: Optional[int] = None,
+                     start: Optional[int] = None, stop: Optional[int] = None,
+                     columns: Optional[str] = None, format: Optional[str] = None,
+                     compression: str = "zstd", accept: Optional[str] = Header(None)):
+    started = time.perf_counter()
+    with stage_duration.time("fetch"):
+        subset = select_process_data(fault, run, start, stop, processdata.parse_columns(columns))
+    try:
+        fmt = processdata.negotiate_format(format, accept)
+        with stage_duration.time("serialization"):
+            content = processdata.serialize(subset, fmt, compression)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    fetch_duration.labels(fmt).observe(time.perf_counter() - started)
+    fetch_bytes.labels(fmt).observe(len(content))
+    return Response(content=content, media_type=processdata.FORMATS[fmt])
+
+@app.post("/stream/replay")
+async def start_replay(fault: int, run: Optional[int] = None, speed: float = 1.0):
+    """Producteur local : rejoue un run enregistré dans le flux de la panne `fault`."""
+    frame = select_process_data(fault, run, columns=processdata.DASHBOARD_COLUMNS)
+    previous = _producers.pop(fault, None)
+    if previous is not None:
+        # Annulé avant la remise à zéro : il ne met plus à jour le flux du détecteur
+        previous.cancel()
+    broker = telemetry.reset(fault)
+    if fault not in _detector_streams:
+        _detector_streams[fault] = detector.add_stream(target=fault)
+    stream = _detector_streams[fault]
+    detector.reset(stream)
+    seconds_per_sample = settings.telemetry_seconds_per_sample / speed if speed > 0 else 0
+    task = asyncio.get_running_loop().create_task(replay_producer(broker, frame, seconds_per_sample, detector, stream))
+    _producers[fault] = task
+    task.add_done_callback(lambda done: _producers.pop(fault) if _producers.get(fault) is done else None)
+    return {"fault": fault, "samples": len(frame)}
+
+@app.get("/stream/telemetry")
+async def stream_telemetry(fault: int, last_id: Optional[int] = None, last_event_id: Optional[str] = Header(None)):
+    broker = telemetry.get(fault)
+    if broker is None:
+        raise HTTPException(status_code=404, detail=f"No telemetry stream for fault {fault}")
+    # Reprise : ?last_id= prioritaire sur l'en-tête Last-Event-ID envoyé par EventSource
+    if last_id is None and last_event_id:
+        try:
+            last_id = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid Last-Event-ID header: {last_event_id!r}")
+    resume = last_id if last_id is not None else -1
+    return StreamingResponse(sse_events(broker, resume), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
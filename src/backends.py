@@ -0,0 +1,200 @@
+"""
+Backend d'inférence compilé pour le couple préprocesseur + modèle.
+
+Au chargement, le scaler est réduit à une transformation affine x * a + b, puis :
+- modèles linéaires (LogisticRegression) : l'affine est repliée dans les
+  coefficients, la prédiction devient un produit scalaire + sigmoïde/softmax ;
+- arbres et forêts (DecisionTree, RandomForest, ExtraTrees) : les nœuds de tous
+  les arbres sont aplatis dans des tableaux NumPy et parcourus en parallèle
+  (le scaler y est appliqué avec la même arithmétique que sklearn, pour que
+  les comparaisons aux seuils soient identiques).
+
+`compile_pipeline` renvoie None pour tout estimateur non pris en charge : le
+pipeline reste alors sur le chemin sklearn.
+
+Le résultat ne contient que des tableaux NumPy : il peut être sérialisé en
+instantané (save_snapshot) et rechargé au démarrage sans importer sklearn ni
+désérialiser les artefacts joblib.
+"""
+import hashlib
+import math
+import os
+import pickle
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+
+
+def scaler_affine(scaler, n_features: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(a, b) such that scaler.transform(X) == X * a + b, or None if not affine."""
+    if scaler is None:
+        return np.ones(n_features), np.zeros(n_features)
+    name = type(scaler).__name__
+    if name == "StandardScaler":
+        a = 1 / scaler.scale_ if scaler.with_std else np.ones(n_features)
+        b = -scaler.mean_ * a if scaler.with_mean else np.zeros(n_features)
+        return a, b
+    if name == "MinMaxScaler" and not scaler.clip:
+        return scaler.scale_.copy(), scaler.min_.copy()
+    if name == "RobustScaler":
+        a = 1 / scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        b = -scaler.center_ * a if scaler.center_ is not None else np.zeros(n_features)
+        return a, b
+    return None
+
+
+class ExactScaler:
+    """(X - center) / scale, or X * scale + center when `multiply` (MinMaxScaler's order)."""
+
+    def __init__(self, center=0.0, scale=1.0, multiply: bool = False):
+        self.center, self.scale, self.multiply = center, scale, multiply
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        return X * self.scale + self.center if self.multiply else (X - self.center) / self.scale
+
+
+def scaler_exact(scaler) -> ExactScaler:
+    """
+    NumPy transform reproducing the scaler's own arithmetic (same operation
+    order, hence same rounding) - needed where results are compared to tree
+    thresholds. Only called for scalers accepted by scaler_affine.
+    """
+    if scaler is None:
+        return ExactScaler()
+    name = type(scaler).__name__
+    if name == "MinMaxScaler":
+        return ExactScaler(scaler.min_, scaler.scale_, multiply=True)
+    if name == "StandardScaler":
+        center = scaler.mean_ if scaler.with_mean else 0.0
+        scale = scaler.scale_ if scaler.with_std else 1.0
+    else:
+        center = 0.0 if scaler.center_ is None else scaler.center_
+        scale = 1.0 if scaler.scale_ is None else scaler.scale_
+    return ExactScaler(center, scale)
+
+
+class CompiledLinear:
+    """Logistic regression with the scaler folded into its coefficients."""
+
+    def __init__(self, model, a: np.ndarray, b: np.ndarray):
+        coef = np.asarray(model.coef_, dtype=float)
+        intercept = np.asarray(model.intercept_, dtype=float)
+        self.coef = coef * a  # (k, n)
+        self.intercept = intercept + coef @ b  # (k,)
+        self.binary = self.coef.shape[0] == 1
+        # Chemin ligne unique en Python pur (pas d'allocation NumPy)
+        self._w = self.coef[0].tolist()
+        self._c = float(self.intercept[0])
+
+    def predict_proba_batch(self, X: np.ndarray) -> np.ndarray:
+        z = X @ self.coef.T + self.intercept
+        if self.binary:
+            return 1 / (1 + np.exp(-z[:, 0]))
+        z -= z.max(axis=1, keepdims=True)
+        e = np.exp(z)
+        return e[:, 1] / e.sum(axis=1)
+
+    def predict_proba_one(self, x: Sequence[float]) -> float:
+        if not self.binary:
+            return float(self.predict_proba_batch(np.asarray(x, dtype=float).reshape(1, -1))[0])
+        z = self._c
+        for w, v in zip(self._w, x):
+            z += w * v
+        if z >= 0:
+            return 1 / (1 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1 + e)
+
+
+class CompiledTrees:
+    """Decision tree / forest flattened into node arrays, averaged like sklearn."""
+
+    def __init__(self, model, transform):
+        estimators = getattr(model, "estimators_", [model])
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, depth = 0, 0
+        for est in estimators:
+            tree = est.tree_
+            value = tree.value[:, 0, :]
+            value = value / np.maximum(value.sum(axis=1, keepdims=True), 1e-300)
+            leaf = tree.children_left < 0
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            # Les feuilles bouclent sur elles-mêmes : le parcours peut s'arrêter à la profondeur max
+            lefts.append(np.where(leaf, np.arange(tree.node_count), tree.children_left) + offset)
+            rights.append(np.where(leaf, np.arange(tree.node_count), tree.children_right) + offset)
+            values.append(value[:, 1] if value.shape[1] > 1 else np.zeros(tree.node_count))
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots)
+        self.depth = depth
+        self.transform = transform
+
+    def predict_proba_batch(self, X: np.ndarray) -> np.ndarray:
+        # sklearn compare les entrées converties en float32
+        Xs = self.transform(X).astype(np.float32)
+        rows = np.arange(len(Xs))[:, None]
+        node = np.broadcast_to(self.roots, (len(Xs), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = Xs[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1)
+
+    def predict_proba_one(self, x: Sequence[float]) -> float:
+        return float(self.predict_proba_batch(np.asarray(x, dtype=float).reshape(1, -1))[0])
+
+
+LINEAR_MODELS = {"LogisticRegression"}
+TREE_MODELS = {"DecisionTreeClassifier", "RandomForestClassifier", "ExtraTreesClassifier"}
+
+
+def compile_pipeline(model, scaler, n_features: int):
+    """Compiled equivalent of scaler.transform + model.predict_proba[:, 1], or None."""
+    if model is None:
+        return None
+    affine = scaler_affine(scaler, n_features)
+    if affine is None:
+        return None
+    name = type(model).__name__
+    if name in LINEAR_MODELS:
+        return CompiledLinear(model, *affine)
+    if name in TREE_MODELS and getattr(model, "n_outputs_", 1) == 1:
+        return CompiledTrees(model, scaler_exact(scaler))
+    return None
+
+
+# --- Instantanés ---
+def snapshot_key(*paths) -> str:
+    """Identifies the artefacts (path, mtime, size) a snapshot was compiled from."""
+    digest = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode())
+    for path in map(Path, paths):
+        stat = path.stat() if path.exists() else None
+        digest.update(f"{path.resolve()}|{stat.st_mtime_ns if stat else 0}|{stat.st_size if stat else 0};".encode())
+    return digest.hexdigest()[:16]
+
+
+def save_snapshot(compiled, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)  # jamais d'instantané à moitié écrit
+    return path
+
+
+def load_snapshot(path):
+    """Compiled pipeline stored at `path`, or None if absent or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, AttributeError, pickle.UnpicklingError):
+        return None
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+from src.metrics import Histogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_WAIT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row requests into one vectorized call.
+
+    The first row of a window arms a timer of max_wait_ms; the batch is scored
+    when the timer fires or as soon as max_batch_size rows are queued. Scoring
+    runs in the loop's default executor, off the event loop; each caller awaits
+    its own future and gets back its own probability.
+    """
+
+    def __init__(self, score_fn: Callable[[List[Dict[str, Any]]], np.ndarray], max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._timer = None
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_BUCKETS_MS)
+
+    async def submit(self, row: Dict[str, Any]) -> float:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((row, fut, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        now = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        for _, _, enqueued in batch:
+            self.queue_wait_ms.observe((now - enqueued) * 1000)
+        scoring = asyncio.get_running_loop().run_in_executor(None, self.score_fn, [row for row, _, _ in batch])
+        scoring.add_done_callback(partial(self._resolve, batch))
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[Dict[str, Any], asyncio.Future, float]], scoring: asyncio.Future):
+        error = asyncio.CancelledError() if scoring.cancelled() else scoring.exception()
+        probas = scoring.result() if error is None else [None] * len(batch)
+        for (_, fut, _), proba in zip(batch, probas):
+            if fut.done():  # appelant annulé entre-temps
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(float(proba))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
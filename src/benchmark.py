@@ -0,0 +1,374 @@
+"""
+Banc de mesure des performances : inférence, API et rejeu du tableau de bord.
+
+Tout est généré localement (modèle, scaler et jeu de données TEP synthétiques
+dans un dossier temporaire), la suite tourne donc sans artefact ni réseau :
+
+- pipeline : latence de PredictionPipeline ligne à ligne et par lots ;
+- predict  : débit de /predict sous charge concurrente (client ASGI en processus) ;
+- process_data : coût de sérialisation de /get-process-data selon la taille ;
+- replay   : coût par image de la boucle de rejeu de app.py ;
+- serving  : débit du serveur pré-forké (src.serve) selon le nombre de workers
+  (lancé seulement avec --suite serving).
+
+Les résultats sont écrits en JSON ; --baseline compare à un fichier précédent
+et sort en code 1 si une mesure régresse au-delà de --tolerance.
+
+    python -m src.benchmark --output reports/benchmark.json
+    python -m src.benchmark --quick --baseline reports/benchmark_baseline.json
+    python -m src.benchmark --suite serving      # montée en charge du mode pré-fork
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+import numpy as np
+import pandas as pd
+from src.preprocesspredict import FEATURES_ORDER, PredictionPipeline
+from src.processdata import FAULT_COLUMN, RUN_COLUMN, SAMPLE_COLUMN
+
+DEFAULT_OUTPUT_PATH = "reports/benchmark.json"
+DEFAULT_TOLERANCE = 0.2
+
+# Mesure principale de chaque résultat et sens de l'amélioration
+PRIMARY_METRICS = {"p50_ms": "lower", "rps": "higher"}
+
+FULL = {"repeat": 300, "batch_sizes": (1, 64, 1024), "concurrency": (1, 8, 64), "requests": 2000,
+        "dataset_rows": (1_000, 10_000, 100_000), "replay_rows": 2_000,
+        "serving_workers": (1, 2, 4), "serving_requests": 400, "serving_batch": 256}
+QUICK = {"repeat": 30, "batch_sizes": (1, 64), "concurrency": (1, 8), "requests": 200,
+         "dataset_rows": (1_000, 10_000), "replay_rows": 300,
+         "serving_workers": (1, 2), "serving_requests": 100, "serving_batch": 256}
+
+
+# --- Données synthétiques ---
+def synthetic_features(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(loc=[300, 5, 10, 0.3], scale=[20, 1, 2, 0.1], size=(n, len(FEATURES_ORDER)))
+    y = (X[:, 0] + 10 * X[:, 1] + rng.normal(scale=10, size=n) > 350).astype(int)
+    return X, y
+
+
+def make_model(root, kind: str = "logistic"):
+    """Fits and dumps a small model + StandardScaler; returns (model_path, scaler_path)."""
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = synthetic_features(2000)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression() if kind == "logistic" else RandomForestClassifier(n_estimators=50, max_depth=8, random_state=0)
+    model.fit(scaler.transform(X), y)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, root / "bestmodel.pkl")
+    joblib.dump(scaler, root / "preprocessor.pkl")
+    return root / "bestmodel.pkl", root / "preprocessor.pkl"
+
+
+def make_process_data(n_rows: int, fault: int = 1, run: int = 1, seed: int = 0) -> pd.DataFrame:
+    """One TEP-like run of n_rows samples, fault injected at sample 20."""
+    rng = np.random.default_rng(seed)
+    sample = np.arange(1, n_rows + 1)
+    faulty = sample > 20
+    detector = np.clip(rng.normal(0.1, 0.05, n_rows) + 0.8 * faulty, 0, 1)
+    return pd.DataFrame({
+        FAULT_COLUMN: fault, RUN_COLUMN: run, SAMPLE_COLUMN: sample,
+        "xmeas_7": rng.normal(2705, 5, n_rows) + 40 * faulty,
+        "xmeas_9": rng.normal(120.4, 0.05, n_rows),
+        "xmeas_10": rng.normal(0.337, 0.01, n_rows),
+        "detector": detector,
+        "faults_pred": np.where(faulty & (rng.random(n_rows) < 0.9), fault, 0).astype(float),
+    })
+
+
+# --- Mesure ---
+def summarize(durations_s: List[float]) -> Dict[str, float]:
+    ms = np.asarray(durations_s) * 1000
+    return {
+        "n": len(ms),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def timeit(fn: Callable[[], Any], repeat: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def bench_pipeline(model_path, scaler_path, config) -> Dict[str, Dict]:
+    results = {}
+    X, _ = synthetic_features(max(config["batch_sizes"]), seed=1)
+    row = dict(zip(FEATURES_ORDER, X[0].tolist()))
+    for backend in ("sklearn", "compiled"):
+        pipeline = PredictionPipeline(model_path, scaler_path, backend=backend)
+        results[f"pipeline.single_row.{backend}"] = timeit(lambda: pipeline.predict_proba(row), config["repeat"])
+        for size in config["batch_sizes"]:
+            batch = X[:size]
+            stats = timeit(lambda: pipeline.predict_proba_batch(batch), config["repeat"])
+            stats["per_row_us"] = stats["mean_ms"] * 1000 / size
+            results[f"pipeline.batch_{size}.{backend}"] = stats
+    return results
+
+
+def _load_app(model_path, scaler_path, data_path, store_path):
+    """Imports src.app against the synthetic artefacts (settings are read at import)."""
+    if "src.app" in sys.modules:
+        raise RuntimeError("src.app already imported: run the benchmark in a fresh process")
+    from src.config import settings
+    settings.model_path, settings.scaler_path = str(model_path), str(scaler_path)
+    settings.model_registry_dir = str(Path(model_path).parent)
+    settings.model_watch_interval_s = 0
+    settings.process_data_path, settings.process_store_path = str(data_path), str(store_path)
+    from src.app import app
+    return app
+
+
+async def _load(app, requests: int, concurrency: int, make_request, base_url: str = "http://bench") -> Dict[str, float]:
+    """Runs `requests` calls from `concurrency` tasks, in process (app) or over HTTP (app=None)."""
+    import httpx
+    transport = httpx.ASGITransport(app=app) if app is not None else None
+    durations: List[float] = []
+    errors = 0
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        queue = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for i in queue:
+                start = time.perf_counter()
+                response = await make_request(client, i)
+                durations.append(time.perf_counter() - start)
+                errors += response.status_code >= 400
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {**summarize(durations), "rps": requests / elapsed, "errors": errors, "concurrency": concurrency}
+
+
+def bench_predict(app, config) -> Dict[str, Dict]:
+    from src.config import settings
+    X, _ = synthetic_features(config["requests"], seed=2)
+    bodies = [dict(zip(FEATURES_ORDER, x)) for x in X.tolist()]
+
+    async def predict(client, i):
+        return await client.post("/predict", json=bodies[i])
+
+    results = {}
+    batching = settings.batching_enabled
+    for mode, enabled in (("batched", True), ("direct", False)):
+        settings.batching_enabled = enabled
+        for concurrency in config["concurrency"]:
+            results[f"predict.{mode}.c{concurrency}"] = asyncio.run(_load(app, config["requests"], concurrency, predict))
+    settings.batching_enabled = batching
+    return results
+
+
+def bench_process_data(app, data_path, config) -> Dict[str, Dict]:
+    from src.processdata import load_process_data, serialize
+    df = load_process_data(str(data_path))
+    results = {}
+    for rows in config["dataset_rows"]:
+        subset = df.iloc[:rows]
+        for fmt, compression in (("json", "none"), ("arrow", "zstd"), ("arrow", "lz4"), ("parquet", "zstd")):
+            repeat = max(5, config["repeat"] // 10)
+            stats = timeit(lambda: serialize(subset, fmt, compression), repeat, warmup=1)
+            stats["bytes"] = len(serialize(subset, fmt, compression))
+            results[f"process_data.serialize.{fmt}_{compression}.{rows}"] = stats
+        for fmt in ("json", "arrow"):
+            async def fetch(client, _, fmt=fmt, rows=rows):
+                return await client.get("/get-process-data", params={"fault": 1, "run": 1, "stop": rows, "format": fmt})
+            results[f"process_data.route.{fmt}.{rows}"] = asyncio.run(_load(app, max(5, config["repeat"] // 10), 1, fetch))
+    return results
+
+
+def bench_replay(config) -> Dict[str, Dict]:
+    """Per-frame cost of the dashboard loop: next chunk, append to the 4 charts, render and serialize them."""
+    import plotly.graph_objects as go
+    from src.rendering import LiveFigure
+    from src.replay import ReplayEngine
+
+    frame = make_process_data(config["replay_rows"])
+    results = {}
+    for decimation in (1, 5):
+        engine = ReplayEngine(frame, fault_code=1, chunk_size=10, decimation=decimation, speed=0)
+        figs = [LiveFigure(go.Figure(go.Scatter(x=[], y=[], mode="lines")), 600) for _ in range(4)]
+        durations = []
+        for chunk in engine.chunks():
+            start = time.perf_counter()
+            for live, y in zip(figs, (chunk.pressure, chunk.temperature, chunk.flow, chunk.prediction)):
+                live.extend(chunk.time_h, y)
+                live.render().to_json()
+            durations.append(time.perf_counter() - start)
+        stats = summarize(durations)
+        # Dernières images : celles où l'historique est le plus long
+        stats["last_frames_p50_ms"] = float(np.median(durations[-10:]) * 1000)
+        results[f"replay.frame.decimation_{decimation}"] = stats
+    return results
+
+
+def _free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 60.0):
+    import httpx
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Server at {url} not ready after {timeout}s")
+
+
+def bench_serving(root: Path, config) -> Dict[str, Dict]:
+    """
+    Load test of the pre-forked server (python -m src.serve) over TCP at
+    several worker counts, on CPU-bound /predict/batch calls (forest model,
+    process pool disabled so that only the serving workers scale).
+    """
+    import signal
+    import subprocess
+    model_path, scaler_path = make_model(root / "serving", kind="forest")
+    X, _ = synthetic_features(config["serving_batch"], seed=3)
+    body = {"instances": [dict(zip(FEATURES_ORDER, x)) for x in X.tolist()]}
+
+    async def score(client, _):
+        return await client.post("/predict/batch", json=body)
+
+    env = {**os.environ, "MODEL_PATH": str(model_path), "SCALER_PATH": str(scaler_path),
+           "MODEL_REGISTRY_DIR": str(model_path.parent), "MODEL_WATCH_INTERVAL_S": "0",
+           "SCORING_POOL_WORKERS": "0", "BATCHING_ENABLED": "false"}
+    results = {}
+    for workers in config["serving_workers"]:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        proc = subprocess.Popen([sys.executable, "-m", "src.serve", "--workers", str(workers), "--host", "127.0.0.1",
+                                 "--port", str(port), "--log-level", "warning"], env=env)
+        try:
+            _wait_ready(url)
+            stats = asyncio.run(_load(None, config["serving_requests"], 4 * workers, score, base_url=url))
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+        stats["workers"] = workers
+        results[f"serving.workers_{workers}"] = stats
+    base = results[f"serving.workers_{config['serving_workers'][0]}"]["rps"]
+    for stats in results.values():
+        stats["scaling"] = stats["rps"] / base
+    return results
+
+
+def run(config: Dict[str, Any], suites=("pipeline", "predict", "process_data", "replay"), workdir=None) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(workdir or tmp)
+        model_path, scaler_path = make_model(root / "models")
+        data_path = root / "process_data.parquet"
+        make_process_data(max(config["dataset_rows"])).to_parquet(data_path)
+
+        results: Dict[str, Dict] = {}
+        if "pipeline" in suites:
+            results.update(bench_pipeline(model_path, scaler_path, config))
+        if "predict" in suites or "process_data" in suites:
+            app = _load_app(model_path, scaler_path, data_path, root / "no-store")
+            if "predict" in suites:
+                results.update(bench_predict(app, config))
+            if "process_data" in suites:
+                results.update(bench_process_data(app, data_path, config))
+        if "replay" in suites:
+            results.update(bench_replay(config))
+        if "serving" in suites:
+            results.update(bench_serving(root, config))
+
+    import sklearn
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__,
+            "cpu_count": os.cpu_count(), "config": {k: list(v) if isinstance(v, tuple) else v for k, v in config.items()},
+        },
+        "results": results,
+    }
+
+
+# --- Comparaison ---
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Relative change of each primary metric present in both reports;
+    `regression` is set when it worsens by more than `tolerance`.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric, better in PRIMARY_METRICS.items():
+            if metric not in result or not base.get(metric):
+                continue
+            change = result[metric] / base[metric] - 1
+            worse = change if better == "lower" else -change
+            rows.append({"name": name, "metric": metric, "baseline": base[metric], "current": result[metric],
+                         "change": change, "regression": worse > tolerance})
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<48} {'metric':<8} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        lines.append(f"{r['name']:<48} {r['metric']:<8} {r['baseline']:>10.3f} {r['current']:>10.3f} {r['change']:>+7.1%}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Banc de mesure : inférence, API et rejeu")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--baseline", help="Rapport JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Dégradation relative tolérée (0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="Tailles réduites (CI)")
+    parser.add_argument("--suite", action="append", choices=["pipeline", "predict", "process_data", "replay", "serving"],
+                        help="Suites à exécuter (toutes sauf serving par défaut)")
+    args = parser.parse_args(argv)
+
+    report = run(QUICK if args.quick else FULL, suites=args.suite or ("pipeline", "predict", "process_data", "replay"))
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    for name, result in report["results"].items():
+        primary = ", ".join(f"{m}={result[m]:.3f}" for m in PRIMARY_METRICS if m in result)
+        print(f"{name:<48} {primary}")
+
+    if args.baseline:
+        rows = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        print()
+        print(format_comparison(rows))
+        if any(r["regression"] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
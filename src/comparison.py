@@ -0,0 +1,120 @@
+"""
+Comparaison de plusieurs scénarios de panne côte à côte.
+
+Le jeu de données (toutes les pannes demandées) est lu une seule fois, ses
+colonnes converties une seule fois en tableaux NumPy (read_run) et triées par
+faute ; chaque scénario n'est ensuite qu'une paire d'offsets dans ces tableaux
+(vues sans copie). Les chronologies de détection / diagnostic sont calculées
+par la machine à états vectorisée (detect_events) dans un pool de threads qui
+partagent ces tableaux, puis affichées en petits multiples à axes alignés.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.processdata import FAULT_COLUMN
+from src.rendering import lttb
+from src.replay import INJECTION_TIME_MIN, ReplayEvents, compute_baseline, detect_events, read_run
+
+SERIES = ("detector", "prediction", "pressure", "temperature", "flow")
+
+
+@dataclass
+class ScenarioTimeline:
+    """Events of one scenario and its series, downsampled for display."""
+    fault: int
+    events: ReplayEvents
+    baseline: Dict[str, Optional[float]]
+    samples: int
+    time_h: Dict[str, np.ndarray]
+    series: Dict[str, np.ndarray]
+
+
+class ScenarioSet:
+    """One dataset, converted once, with the [lo, hi) row range of every fault."""
+
+    def __init__(self, frame: pd.DataFrame):
+        faults = frame[FAULT_COLUMN].to_numpy()
+        order = np.argsort(faults, kind="stable")
+        if not np.array_equal(order, np.arange(len(order))):
+            frame = frame.iloc[order]
+            faults = faults[order]
+        self.cols = read_run(frame)
+        starts = np.flatnonzero(np.r_[True, faults[1:] != faults[:-1]]) if len(faults) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(faults)]
+        self.bounds: Dict[int, Tuple[int, int]] = {int(faults[s]): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    @property
+    def faults(self) -> List[int]:
+        return sorted(self.bounds)
+
+    def arrays(self, fault: int) -> Dict[str, np.ndarray]:
+        lo, hi = self.bounds[fault]
+        return {name: arr[lo:hi] for name, arr in self.cols.items()}
+
+    def timeline(self, fault: int, series: Sequence[str] = SERIES, max_points: int = 400) -> ScenarioTimeline:
+        cols = self.arrays(fault)
+        events = detect_events(cols["minutes"], cols["detector"], cols["diagnosis"], fault)
+        time_h, values = {}, {}
+        for name in series:
+            time_h[name], values[name] = lttb(cols["time_h"], cols[name], max_points)
+        return ScenarioTimeline(fault, events, compute_baseline(cols["pressure"], cols["temperature"], cols["flow"]),
+                                len(cols["time_h"]), time_h, values)
+
+    def timelines(self, faults: Optional[Sequence[int]] = None, series: Sequence[str] = SERIES, workers: int = 4,
+                  max_points: int = 400) -> List[ScenarioTimeline]:
+        """
+        Timelines of `faults` (all by default), computed in parallel, in the
+        requested order; only the `series` to display are downsampled.
+        """
+        faults = [f for f in (faults or self.faults) if f in self.bounds]
+        if workers <= 1 or len(faults) <= 1:
+            return [self.timeline(f, series, max_points) for f in faults]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda f: self.timeline(f, series, max_points), faults))
+
+
+def summary(timelines: Sequence[ScenarioTimeline]) -> pd.DataFrame:
+    return pd.DataFrame([{
+        "faultNumber": t.fault,
+        "samples": t.samples,
+        "detection_delay": t.events.detection_delay,
+        "diagnosis_delay": t.events.diagnosis_delay,
+    } for t in timelines])
+
+
+def small_multiples(timelines: Sequence[ScenarioTimeline], series: str = "detector", ncols: int = 4,
+                    titles: Optional[Dict[int, str]] = None, panel_height: int = 160):
+    """
+    Grid of one panel per scenario with shared (aligned) time and value axes,
+    marking the injection time and the detection / diagnosis instants.
+    """
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+
+    titles = titles or {}
+    ncols = max(1, min(ncols, len(timelines)))
+    nrows = max(1, -(-len(timelines) // ncols))
+    fig = make_subplots(rows=nrows, cols=ncols, shared_xaxes="all", shared_yaxes="all",
+                        subplot_titles=[titles.get(t.fault, f"Panne #{t.fault}") for t in timelines],
+                        vertical_spacing=min(0.08, 0.3 / nrows), horizontal_spacing=0.03)
+    # Traces et repères ajoutés en un seul appel chacun (add_vline par panneau revalide toute la figure)
+    traces, rows, cols, shapes = [], [], [], []
+    markers = [(lambda t: INJECTION_TIME_MIN, dict(width=1, dash="dot", color="grey")),
+               (lambda t: t.events.anomaly_time_min, dict(width=1.5, dash="dash", color="orange")),
+               (lambda t: t.events.diagnosis_time_min, dict(width=1.5, color="red"))]
+    for i, t in enumerate(timelines):
+        traces.append(go.Scatter(x=t.time_h[series], y=t.series[series], mode="lines", line=dict(color="#00CC96", width=1),
+                                 name=f"#{t.fault}", showlegend=False))
+        rows.append(i // ncols + 1)
+        cols.append(i % ncols + 1)
+        axis = "" if i == 0 else str(i + 1)
+        for minutes, line in markers:
+            if minutes(t) is not None:
+                shapes.append(dict(type="line", x0=minutes(t) / 60, x1=minutes(t) / 60, y0=0, y1=1,
+                                   xref=f"x{axis}", yref=f"y{axis} domain", line=line))
+    fig.add_traces(traces, rows=rows, cols=cols)
+    fig.update_layout(shapes=shapes, height=panel_height * nrows + 60, margin=dict(l=20, r=20, t=40, b=20), template="plotly_dark")
+    fig.update_xaxes(showgrid=False)
+    return fig
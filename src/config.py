@@ -1,11 +1,40 @@
-import os
+from typing import List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
+    host: str = "0.0.0.0"
+    port: int = 8080
+    # Processus uvicorn pré-forkés par python -m src.serve ; > 1 seulement pour du scoring sans état :
+    # télémétrie, détecteur, cache, /metrics et /admin/reload vivent dans chaque worker (voir src/serve.py)
+    workers: int = 1
     model_path: str = "models/bestmodel.pkl"
     scaler_path: str = "models/preprocessor.pkl"
+    model_registry_dir: str = "models"
+    model_watch_interval_s: float = 5.0
+    inference_backend: str = "sklearn"  # "compiled" : chemin NumPy fusionné (src/backends.py)
+    model_snapshot_dir: str = ""  # instantanés du backend compilé : démarrage sans sklearn ni joblib
     alert_threshold: float = 0.8
+    feature_schema_path: str = ""  # schéma JSON des variables (src/schema.py) ; vide : schéma intégré
+    feature_on_invalid: str = ""  # "reject" (422) ou "impute" ; vide : valeur du schéma
+    rolling_windows: List[int] = []  # ex. [5, 20] : moyenne / variance / pente glissantes (src/features.py)
+    rolling_ewma_alphas: List[float] = []  # ex. [0.2] ; tout vide : le modèle consomme le vecteur brut
+    # Avec variables glissantes, l'état de chaque flux vit dans le worker : src.serve force workers=1
+    process_data_path: str = "data/process_data.parquet"
+    process_store_path: str = "data/store"
+    telemetry_buffer_size: int = 10000
+    telemetry_seconds_per_sample: float = 0.05
+    detector_window: int = 1
     debug: bool = False
+    batching_enabled: bool = True
+    batch_max_size: int = 64
+    batch_max_wait_ms: float = 2.0
+    prediction_cache_enabled: bool = False
+    prediction_cache_size: int = 10000
+    prediction_cache_ttl_s: float = 60.0
+    prediction_cache_precision: int = 3
+    metrics_enabled: bool = True
+    scoring_pool_workers: int = 2  # 0 : lots scorés dans un thread du worker
+    scoring_pool_min_batch: int = 1000
 
     class Config:
         env_file = ".env"
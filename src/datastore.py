@@ -0,0 +1,174 @@
+"""
+Stockage disque du jeu de données process, colonne par colonne.
+
+Chaque colonne est un fichier .npy ouvert en mémoire mappée (np.load(mmap_mode="r")),
+les lignes étant triées par (faultNumber, simulationRun, sample). Un petit index
+JSON associe chaque partition (faute, run) à son offset et sa longueur : une
+tranche de samples se lit alors comme une vue sans copie, et tous les processus
+qui ouvrent le store partagent les mêmes pages du cache système.
+
+Les colonnes d'une construction vivent dans un sous-dossier versionné
+(data-*) nommé par l'index. Une reconstruction écrit un nouveau sous-dossier
+puis remplace l'index par un renommage atomique : les processus qui mappent
+encore l'ancienne version ne voient jamais de fichier réécrit (les fichiers
+supprimés restent lisibles tant qu'ils sont mappés).
+
+    python -m src.datastore --input data/process_data.parquet --output data/store
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+import numpy as np
+from src.processdata import FAULT_COLUMN, RUN_COLUMN, SAMPLE_COLUMN
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INDEX_FILE = "index.json"
+
+
+class ProcessDataStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        meta = json.loads((self.root / INDEX_FILE).read_text())
+        self.data_dir = self.root / meta.get("data", "")  # sans "data" : colonnes à la racine (ancienne disposition)
+        self.columns: List[str] = meta["columns"]
+        self.num_rows: int = meta["num_rows"]
+        # Partitions : (faute, run) -> (offset, longueur)
+        self.partitions: Dict[tuple, tuple] = {(p["fault"], p["run"]): (p["offset"], p["length"]) for p in meta["partitions"]}
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def build(cls, df: "pd.DataFrame", root) -> "ProcessDataStore":
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        if RUN_COLUMN not in df.columns:
+            df = df.assign(**{RUN_COLUMN: 0})
+        if SAMPLE_COLUMN not in df.columns:
+            df = df.assign(**{SAMPLE_COLUMN: df.groupby([FAULT_COLUMN, RUN_COLUMN]).cumcount()})
+        df = df.sort_values([FAULT_COLUMN, RUN_COLUMN, SAMPLE_COLUMN], kind="stable").reset_index(drop=True)
+        for name in df.columns:
+            if df[name].dtype.kind not in "biuf":
+                raise ValueError(f"Column {name} is not numeric ({df[name].dtype})")
+
+        # Nouvelle version à côté de l'ancienne, jamais réécrite en place
+        data_dir = Path(tempfile.mkdtemp(prefix="data-", dir=root))
+        try:
+            for name in df.columns:
+                np.save(data_dir / f"{name}.npy", np.ascontiguousarray(df[name].to_numpy()))
+            sizes = df.groupby([FAULT_COLUMN, RUN_COLUMN], sort=True).size()
+            offsets = np.concatenate([[0], np.cumsum(sizes.to_numpy())[:-1]])
+            partitions = [{"fault": int(f), "run": int(r), "offset": int(o), "length": int(n)}
+                          for (f, r), n, o in zip(sizes.index, sizes.to_numpy(), offsets)]
+            meta = {"data": data_dir.name, "columns": list(df.columns), "num_rows": len(df), "partitions": partitions}
+            tmp_index = data_dir / INDEX_FILE
+            tmp_index.write_text(json.dumps(meta))
+            os.replace(tmp_index, root / INDEX_FILE)  # bascule atomique vers la nouvelle version
+        except BaseException:
+            shutil.rmtree(data_dir, ignore_errors=True)
+            raise
+        # Anciennes versions : supprimées, les fichiers encore mappés restent lisibles jusqu'à leur fermeture
+        for old in root.glob("data-*"):
+            if old != data_dir:
+                shutil.rmtree(old, ignore_errors=True)
+        return cls(root)
+
+    def array(self, name: str) -> np.ndarray:
+        """Memory-mapped read-only column; opened once per store."""
+        if name not in self._arrays:
+            if name not in self.columns:
+                raise ValueError(f"Unknown columns: {[name]}")
+            self._arrays[name] = np.load(self.data_dir / f"{name}.npy", mmap_mode="r")
+        return self._arrays[name]
+
+    def faults(self) -> List[int]:
+        return sorted({f for f, _ in self.partitions})
+
+    def runs(self, fault: int) -> List[int]:
+        return sorted(r for f, r in self.partitions if f == fault)
+
+    def _ranges(self, fault: Optional[int], run: Optional[int], start: Optional[int], stop: Optional[int]) -> List[tuple]:
+        """Row ranges [lo, hi) of the selection, merged when contiguous."""
+        keys = sorted(k for k in self.partitions if (fault is None or k[0] == fault) and (run is None or k[1] == run))
+        samples = self.array(SAMPLE_COLUMN)
+        ranges = []
+        for key in keys:
+            offset, length = self.partitions[key]
+            lo, hi = offset, offset + length
+            if start is not None or stop is not None:
+                part = samples[lo:hi]
+                if start is not None:
+                    lo = offset + int(np.searchsorted(part, start, side="left"))
+                if stop is not None:
+                    hi = offset + int(np.searchsorted(part, stop, side="left"))
+            if hi <= lo:
+                continue
+            if ranges and ranges[-1][1] == lo:
+                ranges[-1] = (ranges[-1][0], hi)
+            else:
+                ranges.append((lo, hi))
+        return ranges
+
+    def select(self, fault: Optional[int] = None, run: Optional[int] = None,
+               start: Optional[int] = None, stop: Optional[int] = None,
+               columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Column arrays of the selection. A single contiguous range (one fault, one
+        run or one sample window) is returned as zero-copy memmap views.
+        """
+        columns = columns or self.columns
+        ranges = self._ranges(fault, run, start, stop)
+        out = {}
+        for name in columns:
+            arr = self.array(name)
+            if len(ranges) == 1:
+                lo, hi = ranges[0]
+                out[name] = arr[lo:hi]
+            else:
+                out[name] = np.concatenate([arr[lo:hi] for lo, hi in ranges]) if ranges else arr[:0]
+        return out
+
+    def frame(self, fault: Optional[int] = None, run: Optional[int] = None,
+              start: Optional[int] = None, stop: Optional[int] = None,
+              columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        import pandas as pd
+        return pd.DataFrame(self.select(fault, run, start, stop, columns), columns=columns or self.columns)
+
+
+def open_store(root: str) -> Optional[ProcessDataStore]:
+    """
+    Shared store for `root`, or None if it has not been built yet. Misses are
+    not cached, and a rebuilt store (new index file) is reopened.
+    """
+    try:
+        stat = (Path(root) / INDEX_FILE).stat()
+    except FileNotFoundError:
+        return None
+    return _open_store(root, (stat.st_ino, stat.st_mtime_ns))
+
+
+@lru_cache(maxsize=4)
+def _open_store(root: str, index_id: tuple) -> ProcessDataStore:
+    return ProcessDataStore(root)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construit le store mmap du jeu de données process")
+    parser.add_argument("--input", required=True, help="Fichier CSV ou Parquet source")
+    parser.add_argument("--output", default="data/store")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    path = Path(args.input)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    store = ProcessDataStore.build(df, args.output)
+    print(f"{store.num_rows} lignes, {len(store.partitions)} partitions -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Évaluation hors-ligne des scénarios de panne.
+
+Calcule, pour chaque `faultNumber`, les délais de détection et de diagnostic
+(règle PERSISTENCE_LIMIT) ainsi que le F1 et l'accuracy du diagnostic, en une
+passe vectorisée sur tout le jeu de données.
+
+    python -m src.evaluation --url http://localhost:8000 --output reports/fault_evaluation.csv
+    python -m src.evaluation --input data/process.parquet --workers 4
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.processdata import FAULT_COLUMN, RUN_COLUMN, deserialize
+from src.replay import TIME_STEP_MINUTES, INJECTION_TIME_MIN, PERSISTENCE_LIMIT, DETECTOR_THRESHOLD
+
+DEFAULT_REPORT_PATH = "reports/fault_evaluation.csv"
+
+EVALUATION_COLUMNS = [FAULT_COLUMN, RUN_COLUMN, "sample", "detector", "faults_pred"]
+REPORT_COLUMNS = ["faultNumber", "runs", "detection_rate", "detection_delay", "diagnosis_rate", "diagnosis_delay", "f1", "accuracy"]
+
+
+def _run_starts(keys: np.ndarray) -> np.ndarray:
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = keys[1:] != keys[:-1]
+    return starts
+
+
+def _consecutive_runs(mask: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Like replay.consecutive_runs, but the count restarts at each run boundary."""
+    idx = np.arange(len(mask))
+    marker = np.where(~mask, idx, np.where(starts, idx - 1, -1))
+    return idx - np.maximum.accumulate(marker)
+
+
+def _first_minute(minutes: pd.Series, mask: np.ndarray, run_id: np.ndarray) -> pd.Series:
+    return minutes[mask].groupby(run_id[mask]).min()
+
+
+def evaluate_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per faultNumber, computed with NumPy/pandas over every run at once."""
+    if RUN_COLUMN not in df.columns:
+        df = df.assign(**{RUN_COLUMN: 0})
+    if "sample" not in df.columns:
+        df = df.assign(sample=df.groupby([FAULT_COLUMN, RUN_COLUMN]).cumcount())
+    df = df.sort_values([FAULT_COLUMN, RUN_COLUMN, "sample"], kind="stable").reset_index(drop=True)
+
+    fault = df[FAULT_COLUMN].to_numpy(dtype=int)
+    run = df[RUN_COLUMN].to_numpy(dtype=int)
+    minutes = df["sample"].to_numpy(dtype=float) * TIME_STEP_MINUTES
+    detector = df["detector"].to_numpy(dtype=float)
+    predicted = np.round(df["faults_pred"].to_numpy(dtype=float)).astype(int)
+
+    # Identifiant unique (faute, run) pour les regroupements
+    run_id = np.cumsum(_run_starts(fault * (run.max() + 1) + run)) - 1
+    starts = _run_starts(run_id)
+    active = minutes > INJECTION_TIME_MIN
+
+    detected = active & (detector > DETECTOR_THRESHOLD)
+    matches = active & (predicted == fault)
+    confirmed = _consecutive_runs(matches, starts) >= PERSISTENCE_LIMIT
+
+    minutes_s = pd.Series(minutes)
+    runs = pd.DataFrame({FAULT_COLUMN: fault[starts]}, index=np.arange(run_id[-1] + 1) if len(run_id) else [])
+    runs["detection_delay"] = (_first_minute(minutes_s, detected, run_id) - INJECTION_TIME_MIN).clip(lower=0)
+    runs["diagnosis_delay"] = (_first_minute(minutes_s, confirmed, run_id) - INJECTION_TIME_MIN).clip(lower=0)
+
+    # Vérité terrain : la panne est présente après l'injection
+    truth = np.where(active, fault, 0)
+    rows = pd.DataFrame({
+        FAULT_COLUMN: fault,
+        "correct": predicted == truth,
+        "tp": (predicted == fault) & (truth == fault),
+        "fp": (predicted == fault) & (truth != fault),
+        "fn": (predicted != fault) & (truth == fault),
+    })
+    counts = rows.groupby(FAULT_COLUMN).agg(accuracy=("correct", "mean"), tp=("tp", "sum"), fp=("fp", "sum"), fn=("fn", "sum"))
+    denom = 2 * counts["tp"] + counts["fp"] + counts["fn"]
+    counts["f1"] = np.where(denom > 0, 2 * counts["tp"] / denom.where(denom > 0, 1), 0.0)
+
+    per_fault = runs.groupby(FAULT_COLUMN).agg(
+        runs=(FAULT_COLUMN, "size"),
+        detection_rate=("detection_delay", lambda s: s.notna().mean()),
+        detection_delay=("detection_delay", "mean"),
+        diagnosis_rate=("diagnosis_delay", lambda s: s.notna().mean()),
+        diagnosis_delay=("diagnosis_delay", "mean"),
+    )
+    report = per_fault.join(counts[["f1", "accuracy"]]).reset_index()
+    return report[REPORT_COLUMNS]
+
+
+def evaluate(df: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
+    """Evaluates every scenario, optionally splitting the faults over a process pool."""
+    if workers <= 1 or df[FAULT_COLUMN].nunique() <= 1:
+        return evaluate_frame(df)
+    parts = [part for _, part in df.groupby(FAULT_COLUMN, sort=True)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        reports = list(pool.map(evaluate_frame, parts))
+    return pd.concat(reports, ignore_index=True)
+
+
+def load_dataset(url: str = None, path: str = None) -> pd.DataFrame:
+    if path:
+        path = Path(path)
+        return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    import requests
+    params = {"columns": ",".join(EVALUATION_COLUMNS), "format": "arrow"}
+    response = requests.get(f"{url.rstrip('/')}/get-process-data", params=params, timeout=300)
+    response.raise_for_status()
+    return deserialize(response.content, response.headers.get("content-type", ""))
+
+
+def load_report(path: str = DEFAULT_REPORT_PATH) -> pd.DataFrame:
+    """Report written by the CLI, or an empty frame if it has not been generated."""
+    path = Path(path)
+    return pd.read_csv(path) if path.exists() else pd.DataFrame(columns=REPORT_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Évaluation hors-ligne des 20 scénarios de panne")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="URL de l'API (route /get-process-data)")
+    source.add_argument("--input", help="Fichier CSV ou Parquet du jeu de données")
+    parser.add_argument("--output", default=DEFAULT_REPORT_PATH)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = evaluate(load_dataset(args.url, args.input), workers=args.workers)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(args.output, index=False)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
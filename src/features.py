@@ -0,0 +1,209 @@
+"""
+Variables temporelles glissantes par capteur.
+
+Certaines pannes (#3, #5) ne se distinguent pas sur un échantillon isolé mais
+sur son contexte récent. RollingFeatures ajoute au vecteur brut, pour chaque
+capteur : moyenne, variance et pente (moindres carrés) sur une ou plusieurs
+fenêtres, et une ou plusieurs moyennes mobiles exponentielles (EWMA).
+
+Deux chemins produisent exactement les mêmes valeurs :
+
+- en ligne (update) : un état par flux, tampon circulaire des dernières
+  valeurs et sommes courantes (somme, somme des carrés, somme pondérée par le
+  temps relatif) mises à jour en O(1) par échantillon, quelle que soit la
+  taille des fenêtres, en flottants Python (quelques scalaires par capteur) ;
+- hors ligne (transform) : sommes cumulées sur un run entier, ou sur tous
+  les runs d'un jeu de données à la fois (`starts` marque leurs débuts), et
+  EWMA par blocs (produit matriciel triangulaire par bloc).
+
+Les valeurs sont centrées sur le premier échantillon du run (variance et
+pente n'en dépendent pas) pour limiter les erreurs d'arrondi ; au début d'un
+run, les fenêtres sont partielles.
+"""
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+import numpy as np
+from src.processdata import FAULT_COLUMN, RUN_COLUMN
+from src.schema import DEFAULT_SCHEMA, FeatureSchema
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+EWMA_BLOCK = 64
+
+
+class RollingState:
+    """Online state of one stream (one reactor / run), in plain Python floats."""
+
+    def __init__(self, n_windows: int, n_alphas: int, n_inputs: int, capacity: int):
+        self.count = 0
+        self.shift = [0.0] * n_inputs
+        self.ring = [None] * capacity
+        self.s1 = [[0.0] * n_inputs for _ in range(n_windows)]
+        self.s2 = [[0.0] * n_inputs for _ in range(n_windows)]
+        self.st = [[0.0] * n_inputs for _ in range(n_windows)]  # somme de (j - t) * x_j sur la fenêtre, t = dernier échantillon
+        self.ewma = [[0.0] * n_inputs for _ in range(n_alphas)]
+
+
+class RollingFeatures:
+    def __init__(self, n_inputs: int, windows: Sequence[int] = (5, 20), ewma_alphas: Sequence[float] = (0.2,),
+                 include_raw: bool = True):
+        if any(w < 1 for w in windows):
+            raise ValueError(f"Windows must be >= 1, got {list(windows)}")
+        if any(not 0 < a <= 1 for a in ewma_alphas):
+            raise ValueError(f"EWMA alphas must be in (0, 1], got {list(ewma_alphas)}")
+        self.n_inputs = n_inputs
+        self.windows = np.array(windows, dtype=np.int64)
+        self.ewma_alphas = np.array(ewma_alphas, dtype=float)
+        self.include_raw = include_raw
+        self._window_list = [int(w) for w in self.windows]
+        self._alpha_list = [float(a) for a in self.ewma_alphas]
+        self.capacity = int(self.windows.max()) if len(self.windows) else 1
+        self.n_outputs = n_inputs * (int(include_raw) + 3 * len(self.windows) + len(self.ewma_alphas))
+        # Poids EWMA intra-bloc : W[a, i, j] = alpha * (1 - alpha)^(i - j) pour j <= i
+        lag = np.arange(EWMA_BLOCK)[:, None] - np.arange(EWMA_BLOCK)[None, :]
+        decay = (1 - self.ewma_alphas)[:, None, None] ** np.maximum(lag, 0)
+        self._ewma_weights = np.where(lag >= 0, self.ewma_alphas[:, None, None] * decay, 0.0)
+        self._ewma_carry = (1 - self.ewma_alphas)[:, None] ** np.arange(1, EWMA_BLOCK + 1)[None, :]
+
+    def feature_names(self, names: Sequence[str]) -> List[str]:
+        out = list(names) if self.include_raw else []
+        for w in self.windows:
+            out += [f"{n}_{stat}_{w}" for stat in ("mean", "var", "slope") for n in names]
+        out += [f"{n}_ewma_{a:g}" for a in self.ewma_alphas for n in names]
+        return out
+
+    # --- En ligne ---
+    def state(self) -> RollingState:
+        return RollingState(len(self.windows), len(self.ewma_alphas), self.n_inputs, self.capacity)
+
+    def update(self, state: RollingState, x: Sequence[float]) -> List[float]:
+        """
+        Consumes one sample of a stream and returns its feature vector, in O(1).
+        A few scalars per sensor: plain Python is cheaper than NumPy calls here.
+        """
+        x = [float(v) for v in x]
+        t = state.count
+        if t == 0:
+            state.shift = x
+        shift = state.shift
+        xc = [v - s for v, s in zip(x, shift)]
+        out = list(x) if self.include_raw else []
+        for i, w in enumerate(self._window_list):
+            s1, s2, st = state.s1[i], state.s2[i], state.st[i]
+            # Valeur qui sort de la fenêtre pleine (lue avant d'être écrasée dans le tampon)
+            old = state.ring[(t - w) % self.capacity] if t >= w else None
+            c = min(t + 1, w)
+            half, denom = (c - 1) / 2, (c * (c * c - 1) / 12) or 1.0  # pente nulle sur un seul point
+            means, variances, slopes = [], [], []
+            for j, v in enumerate(xc):
+                a = s1[j]
+                if old is None:
+                    r = st[j] - a  # temps relatifs décalés de -1
+                    a += v
+                    q = s2[j] + v * v
+                else:
+                    o = old[j]
+                    r = st[j] + w * o - a  # ... et retrait du sortant (temps relatif -w)
+                    a += v - o
+                    q = s2[j] + v * v - o * o
+                s1[j], s2[j], st[j] = a, q, r
+                m = a / c
+                means.append(m + shift[j])
+                variances.append(max(q / c - m * m, 0.0))
+                slopes.append((r + half * a) / denom)
+            out += means + variances + slopes
+        for alpha, ewma in zip(self._alpha_list, state.ewma):
+            for j, v in enumerate(xc):
+                ewma[j] += alpha * (v - ewma[j])
+            out += [e + s for e, s in zip(ewma, shift)]
+        state.ring[t % self.capacity] = xc
+        state.count = t + 1
+        return out
+
+    # --- Hors ligne ---
+    def transform(self, X: np.ndarray, starts: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Feature matrix of whole runs in one vectorized pass; `starts` flags the
+        first row of each run (a single run when omitted). Matches update().
+        """
+        X = np.asarray(X, dtype=float)
+        n, k = X.shape
+        if n == 0:
+            return np.empty((0, self.n_outputs))
+        idx = np.arange(n)
+        first = np.zeros(n, dtype=bool) if starts is None else np.asarray(starts, dtype=bool).copy()
+        first[0] = True
+        seg = np.maximum.accumulate(np.where(first, idx, 0))
+        shift = X[seg] if starts is not None else X[:1]
+        xc = X - shift
+        t = (idx - seg)[:, None].astype(float)  # temps local dans le run
+
+        zero = np.zeros((1, k))
+        c1 = np.concatenate([zero, np.cumsum(xc, axis=0)])
+        c2 = np.concatenate([zero, np.cumsum(xc * xc, axis=0)])
+        ct = np.concatenate([zero, np.cumsum(t * xc, axis=0)])
+        stats = np.empty((n, len(self.windows), 3, k))
+        for i, w in enumerate(self.windows):
+            c = np.minimum(idx - seg + 1, w)
+            lo = idx + 1 - c
+            s1 = c1[1:] - c1[lo]
+            s2 = c2[1:] - c2[lo]
+            st = ct[1:] - ct[lo] - t * s1
+            c = c[:, None].astype(float)
+            mean = s1 / c
+            stats[:, i, 0] = mean + shift
+            stats[:, i, 1] = np.maximum(s2 / c - mean * mean, 0.0)
+            stats[:, i, 2] = _slope(st, s1, c)
+        parts = [X] if self.include_raw else []
+        parts += [stats.reshape(n, -1), (self._ewma(xc, seg) + shift[:, None, :]).reshape(n, -1)]
+        return np.concatenate(parts, axis=1)
+
+    def _ewma(self, xc: np.ndarray, seg: np.ndarray) -> np.ndarray:
+        """
+        EWMA of the centered values, (n, n_alphas, k); restarts at each run (its
+        first value is 0). Every block is filtered by one batched product, then
+        only the block-end values are propagated from block to block.
+        """
+        n, k = xc.shape
+        B = EWMA_BLOCK
+        nb = -(-n // B)
+        xb = np.zeros((nb * B, k))
+        xb[:n] = xc
+        xb = xb.reshape(nb, B, k)
+        segb = np.concatenate([seg, np.full(nb * B - n, seg[-1])]).reshape(nb, B)
+        y = np.matmul(self._ewma_weights, xb[:, None])  # (nb, a, B, k)
+        # Blocs où un run commence en cours de bloc : poids limités au même run
+        for b in np.flatnonzero((segb[:, 1:] != segb[:, :1]).any(axis=1)):
+            same = segb[b][:, None] == segb[b][None, :]
+            y[b] = np.einsum("aij,jk->aik", self._ewma_weights * same, xb[b])
+        # Report de la dernière valeur du bloc précédent, pour les lignes du même run
+        cont = segb == np.r_[-1, segb[:-1, -1]][:, None]
+        decay = self._ewma_carry[:, -1][:, None]
+        carry = np.zeros((nb, len(self.ewma_alphas), k))  # valeur en fin du bloc précédent
+        for b in range(1, nb):
+            last = y[b - 1, :, -1]
+            carry[b] = last + decay * carry[b - 1] if cont[b - 1, -1] else last
+        y += cont[:, None, :, None] * self._ewma_carry[None, :, :, None] * carry[:, :, None, :]
+        return y.transpose(0, 2, 1, 3).reshape(nb * B, len(self.ewma_alphas), k)[:n]
+
+
+def frame_features(frame: "pd.DataFrame", window: RollingFeatures,
+                   schema: FeatureSchema = DEFAULT_SCHEMA) -> Tuple[np.ndarray, List[str]]:
+    """
+    Training / evaluation matrix of a process-data frame, every run at once,
+    aligned with its rows. Each run must be contiguous and in sample order (as
+    stored); windows never span two runs.
+    """
+    run_keys = [c for c in (FAULT_COLUMN, RUN_COLUMN) if c in frame.columns]
+    starts = np.zeros(len(frame), dtype=bool)
+    for c in run_keys:
+        values = frame[c].to_numpy()
+        starts[1:] |= values[1:] != values[:-1]
+    return window.transform(schema.transform(frame), starts), window.feature_names(schema.names)
+
+
+def _slope(st: np.ndarray, s1: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Least-squares slope per sample from sum((j - t) x_j) and sum(x_j) over c points."""
+    denom = c * (c * c - 1) / 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(c > 1, (st + (c - 1) / 2 * s1) / denom, 0.0)
@@ -0,0 +1,242 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Any, List, Sequence, Tuple
+import threading
+import time
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        cumulative, running = {}, 0
+        for bound, c in zip(self.buckets, counts):
+            running += c
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+# --- Registre de métriques exposé en texte Prometheus (/metrics) ---
+LATENCY_BUCKETS_S = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+SIZE_BUCKETS_BYTES = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+
+class Value:
+    """Counter / gauge cell; a gauge may instead read its value from a callback at scrape time."""
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function):
+        self.function = function
+
+    def get(self) -> float:
+        return float(self.function()) if self.function is not None else self.value
+
+
+class Metric:
+    """A named metric family; `labels(*values)` returns (and creates once) the child for those values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS_S):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = buckets
+        self._children: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return Histogram(self.buckets) if self.kind == "histogram" else Value()
+
+    def labels(self, *values) -> Any:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    # Raccourcis pour les familles sans étiquette
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function):
+        self.labels().set_function(function)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    @contextmanager
+    def time(self, *values):
+        """Observes the duration of the block in seconds (histograms)."""
+        child = self.labels(*values)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            child.observe(time.perf_counter() - start)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(child.get())}")
+                continue
+            snap = child.snapshot()
+            for bound, count in snap["buckets"].items():
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(snap['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {snap['count']}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+
+class HistogramMetric(Metric):
+    kind = "histogram"
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value == value else "NaN"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _add(self, metric: Metric) -> Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS_S) -> HistogramMetric:
+        return self._add(HistogramMetric(name, help, labelnames, buckets))
+
+    def register_histogram(self, name: str, help: str, histogram: Histogram) -> HistogramMetric:
+        """Exposes an existing unlabeled Histogram (e.g. the micro-batcher's) under `name`."""
+        metric = self.histogram(name, help, buckets=histogram.buckets)
+        metric._children[()] = histogram
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+
+# --- Lecture côté client (page de test de l'API) ---
+def parse_metrics(text: str) -> Dict[str, List[Tuple[Dict[str, str], float]]]:
+    """Parses the text exposition format into {sample name: [(labels, value), ...]}."""
+    samples: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        head, _, value = line.rpartition(" ")
+        name, _, raw = head.partition("{")
+        labels = dict(pair.split("=", 1) for pair in raw.rstrip("}").split(",") if pair) if raw else {}
+        labels = {k: v.strip('"') for k, v in labels.items()}
+        samples.setdefault(name, []).append((labels, float(value)))
+    return samples
+
+
+def histogram_quantile(q: float, buckets: Dict[str, float]) -> float:
+    """Prometheus-style quantile from cumulative bucket counts {le: count}, interpolated linearly."""
+    bounds = sorted(((float(le), count) for le, count in buckets.items()), key=lambda b: b[0])
+    total = bounds[-1][1] if bounds else 0
+    if total == 0:
+        return float("nan")
+    rank = q * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in bounds:
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / max(count - prev_count, 1e-12)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests by route template and status, timing
+    them and tracking the number in flight. The route is read after the call
+    (FastAPI stores the matched route in the scope), so unknown paths are
+    grouped under "unmatched" instead of creating one series per URL.
+    """
+
+    def __init__(self, app, requests_total: Counter, duration: HistogramMetric, in_flight: Gauge):
+        self.app = app
+        self.requests_total, self.duration, self.in_flight = requests_total, duration, in_flight
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.duration.labels(scope["method"], path).observe(time.perf_counter() - start)
+            self.requests_total.labels(scope["method"], path, status).inc()
@@ -0,0 +1,64 @@
+"""
+Cache des prédictions, en amont du pipeline.
+
+En régime établi les capteurs répètent (presque) les mêmes valeurs : la clé est
+le vecteur de features arrondi à `precision` décimales, préfixé de la
+signature du modèle servi, de sorte qu'un rechargement invalide naturellement
+les entrées. LRU borné + TTL, protégé par un verrou (threads du serveur).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 10000, ttl_s: float = 60.0, precision: int = 3):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.precision = precision
+        self._data: "OrderedDict[Tuple, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def key(self, model_key: Hashable, features: Sequence[float]) -> Tuple:
+        return (model_key,) + tuple(round(float(v), self.precision) for v in features)
+
+    def get(self, key: Tuple) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires = entry
+            if expires < now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: float):
+        expires = time.monotonic() + self.ttl_s
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data), "maxsize": self.maxsize, "ttl_s": self.ttl_s, "precision": self.precision,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions, "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,30 +1,171 @@
+import threading
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, Any
-import joblib
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, Any, List, Optional, Union
 import numpy as np
+from src.backends import compile_pipeline, load_snapshot, save_snapshot, snapshot_key
+from src.features import RollingFeatures, RollingState
+from src.schema import DEFAULT_SCHEMA, FeatureSchema
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FEATURES_ORDER = DEFAULT_SCHEMA.names
+
+BatchInput = Union[List[Dict[str, Any]], "pd.DataFrame", np.ndarray]
+StageTimer = Callable[[str], ContextManager]
+
+def _no_timer(stage: str) -> ContextManager:
+    return nullcontext()
 
 class PredictionPipeline:
-    def __init__(self, modelpath="models/bestmodel.pkl", scalerpath="models/preprocessor.pkl"):
+    def __init__(self, modelpath="models/bestmodel.pkl", scalerpath="models/preprocessor.pkl", mmap_mode=None, backend="sklearn",
+                 timer: Optional[StageTimer] = None, snapshot_dir=None, schema: Optional[FeatureSchema] = None,
+                 window: Optional[RollingFeatures] = None):
         self.model_path = Path(modelpath)
         self.scaler_path = Path(scalerpath)
-        self.model = joblib.load(self.model_path) if self.model_path.exists() else None
-        self.scaler = joblib.load(self.scaler_path) if self.scaler_path.exists() else None
-
-    def preprocess(self, data: Dict[str, Any]) -> np.ndarray:
-        features_order = ["temperature", "pressure", "flowrate", "vibration"]
-        missing = [f for f in features_order if f not in data]
-        if missing:
-            raise ValueError(f"Missing features: {missing}")
-        X = np.array([data[f] for f in features_order]).reshape(1, -1)
-        return self.scaler.transform(X) if self.scaler else X
-
-    def predict_proba(self, data: Dict[str, Any]) -> float:
-        if not self.model:
+        self.mmap_mode = mmap_mode
+        # Correspondance colonnes -> variables, plages et politique rejet / imputation
+        self.schema = schema or DEFAULT_SCHEMA
+        # Variables glissantes (moyenne, variance, pente, EWMA) : le modèle consomme alors le vecteur élargi
+        self.window = window
+        # Artefacts joblib (et donc sklearn) chargés au premier accès à .model / .scaler
+        self._artifacts = None
+        self._artifacts_lock = threading.Lock()
+        # timer(stage) : context manager chronométrant "validation", "features", "preprocess" et "model"
+        self.timer = timer or _no_timer
+        # backend="compiled" : scaler replié dans le modèle, évalué en NumPy (repli sklearn si non pris en charge)
+        self.compiled = self._compile(snapshot_dir) if backend == "compiled" else None
+
+    def __getstate__(self):
+        # Copie envoyée à un autre processus : chemins, schéma, fenêtres et modèle compilé ;
+        # les artefacts sont relus depuis le disque, sans verrou ni chronomètre du parent
+        state = self.__dict__.copy()
+        state.update(_artifacts=None, _artifacts_lock=None, timer=_no_timer)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._artifacts_lock = threading.Lock()
+
+    def _load_artifacts(self):
+        with self._artifacts_lock:
+            if self._artifacts is None:
+                import joblib
+                # mmap_mode="r" : les tableaux NumPy des artefacts non compressés sont mappés en mémoire
+                model = joblib.load(self.model_path, mmap_mode=self.mmap_mode) if self.model_path.exists() else None
+                scaler = joblib.load(self.scaler_path, mmap_mode=self.mmap_mode) if self.scaler_path.exists() else None
+                self._artifacts = (model, scaler)
+            return self._artifacts
+
+    @property
+    def model(self):
+        return self._load_artifacts()[0]
+
+    @property
+    def scaler(self):
+        return self._load_artifacts()[1]
+
+    def _compile(self, snapshot_dir):
+        """Compiled pipeline, read from a snapshot of these artefacts when one exists (no sklearn import)."""
+        if snapshot_dir:
+            path = Path(snapshot_dir) / f"{snapshot_key(self.model_path, self.scaler_path)}.pkl"
+            compiled = load_snapshot(path)
+            if compiled is not None:
+                return compiled
+        compiled = compile_pipeline(self.model, self.scaler, self.n_features)
+        if snapshot_dir and compiled is not None:
+            save_snapshot(compiled, path)
+        return compiled
+
+    @property
+    def n_features(self) -> int:
+        return self.window.n_outputs if self.window is not None else len(self.schema.names)
+
+    @property
+    def has_model(self) -> bool:
+        return self.compiled is not None or self.model is not None
+
+    @property
+    def has_scaler(self) -> bool:
+        if self.compiled is not None and self._artifacts is None:
+            return self.scaler_path.exists()  # scaler replié dans l'instantané
+        return self.scaler is not None
+
+    def vector(self, data: Dict[str, Any], state: Optional[RollingState] = None) -> List[float]:
+        """
+        Model input of one sample. With rolling features, `state` carries the
+        stream's history (a fresh one when omitted) and is updated in O(1).
+        """
+        with self.timer("validation"):
+            x = self.schema.row(data)
+        if self.window is None:
+            return x
+        with self.timer("features"):
+            return self.window.update(state if state is not None else self.window.state(), x)
+
+    def features(self, X: np.ndarray, starts: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rolling features of whole runs (rows in time order, `starts` flags each run's first row)."""
+        if self.window is None:
+            return X
+        with self.timer("features"):
+            return self.window.transform(X, starts)
+
+    def preprocess(self, data: Dict[str, Any], state: Optional[RollingState] = None) -> np.ndarray:
+        X = np.array(self.vector(data, state)).reshape(1, -1)
+        with self.timer("preprocess"):
+            return self.scaler.transform(X) if self.scaler else X
+
+    def to_matrix(self, data: BatchInput) -> np.ndarray:
+        """Builds the (n, k) feature matrix of a batch, validated in bulk by the schema."""
+        return self.schema.transform(data)
+
+    def preprocess_batch(self, data: BatchInput, starts: Optional[np.ndarray] = None) -> np.ndarray:
+        with self.timer("validation"):
+            X = self.to_matrix(data)
+        X = self.features(X, starts)
+        with self.timer("preprocess"):
+            return self.scaler.transform(X) if self.scaler else X
+
+    def predict_proba(self, data: Dict[str, Any], state: Optional[RollingState] = None) -> float:
+        if not self.has_model:
+            return 0.0
+        return self.predict_proba_vector(self.vector(data, state))
+
+    def predict_proba_vector(self, x: List[float]) -> float:
+        """Probability of a model input already built by vector() (e.g. under a stream's lock)."""
+        if not self.has_model:
             return 0.0
-        Xp = self.preprocess(data)
-        return float(self.model.predict_proba(Xp)[0, 1])
+        if self.compiled is not None:
+            with self.timer("model"):
+                return self.compiled.predict_proba_one(x)
+        X = np.array(x).reshape(1, -1)
+        with self.timer("preprocess"):
+            Xp = self.scaler.transform(X) if self.scaler else X
+        with self.timer("model"):
+            return float(self.model.predict_proba(Xp)[0, 1])
+
+    def predict_proba_batch(self, data: BatchInput, starts: Optional[np.ndarray] = None) -> np.ndarray:
+        with self.timer("validation"):
+            X = self.to_matrix(data)
+        if len(X) == 0 or not self.has_model:
+            return np.zeros(len(X))
+        X = self.features(X, starts)
+        if self.compiled is not None:
+            # Scaler replié dans le modèle compilé : pas d'étape "preprocess"
+            with self.timer("model"):
+                return self.compiled.predict_proba_batch(X)
+        with self.timer("preprocess"):
+            Xp = self.scaler.transform(X) if self.scaler else X
+        with self.timer("model"):
+            return self.model.predict_proba(Xp)[:, 1]
 
     def predict_with_alert(self, data: Dict[str, Any], threshold: float = 0.8):
         proba = self.predict_proba(data)
         alert = proba >= threshold
         return {"probability": proba, "alert": alert, "threshold": threshold}
+
+    def predict_with_alert_batch(self, data: BatchInput, threshold: float = 0.8):
+        probas = self.predict_proba_batch(data)
+        alerts = probas >= threshold
+        return {"probabilities": probas, "alerts": alerts, "threshold": threshold}
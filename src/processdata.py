@@ -0,0 +1,100 @@
+import io
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FAULT_COLUMN = "faultNumber"
+RUN_COLUMN = "simulationRun"
+SAMPLE_COLUMN = "sample"
+
+# Colonnes dont le tableau de bord a besoin pour un rejeu
+DASHBOARD_COLUMNS = [FAULT_COLUMN, SAMPLE_COLUMN, "xmeas_7", "xmeas_9", "xmeas_10", "detector", "faults_pred"]
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+FORMATS = {"json": "application/json", "arrow": ARROW_MEDIA_TYPE, "parquet": PARQUET_MEDIA_TYPE}
+COMPRESSIONS = ("zstd", "lz4", "none")
+
+
+@lru_cache(maxsize=4)
+def load_process_data(path: str) -> "pd.DataFrame":
+    """Reads the process dataset once per path (Parquet or CSV)."""
+    import pandas as pd
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Process data not found: {path}")
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+
+
+def parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    if not columns:
+        return None
+    return [c.strip() for c in columns.split(",") if c.strip()]
+
+
+def filter_process_data(df: "pd.DataFrame", fault: Optional[int] = None, run: Optional[int] = None,
+                        start: Optional[int] = None, stop: Optional[int] = None,
+                        columns: Optional[List[str]] = None) -> "pd.DataFrame":
+    """Server-side selection: fault/run equality, [start, stop) sample range, column projection."""
+    import pandas as pd
+    if columns:
+        unknown = [c for c in columns if c not in df.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+    mask = pd.Series(True, index=df.index)
+    if fault is not None and FAULT_COLUMN in df.columns:
+        mask &= df[FAULT_COLUMN] == fault
+    if run is not None and RUN_COLUMN in df.columns:
+        mask &= df[RUN_COLUMN] == run
+    if start is not None and SAMPLE_COLUMN in df.columns:
+        mask &= df[SAMPLE_COLUMN] >= start
+    if stop is not None and SAMPLE_COLUMN in df.columns:
+        mask &= df[SAMPLE_COLUMN] < stop
+    out = df.loc[mask.to_numpy()]
+    if columns:
+        out = out[columns]
+    return out.reset_index(drop=True)
+
+
+def negotiate_format(fmt: Optional[str], accept: Optional[str]) -> str:
+    """Explicit `format` wins, otherwise the Accept header, otherwise JSON."""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        return fmt
+    for name, media_type in FORMATS.items():
+        if accept and media_type in accept and name != "json":
+            return name
+    return "json"
+
+
+def serialize(df: "pd.DataFrame", fmt: str, compression: str = "zstd") -> bytes:
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+    if fmt == "json":
+        return df.to_json(orient="records").encode()
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    codec = None if compression == "none" else compression
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        with pa.ipc.new_stream(sink, table.schema, options=pa.ipc.IpcWriteOptions(compression=codec)) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink, compression=codec or "none")
+    return sink.getvalue()
+
+
+def deserialize(content: bytes, media_type: str) -> "pd.DataFrame":
+    """Inverse of `serialize`, keyed on the response Content-Type."""
+    import pandas as pd
+    if media_type.startswith(ARROW_MEDIA_TYPE):
+        import pyarrow as pa
+        return pa.ipc.open_stream(content).read_pandas()
+    if media_type.startswith(PARQUET_MEDIA_TYPE):
+        return pd.read_parquet(io.BytesIO(content))
+    return pd.read_json(io.BytesIO(content), orient="records")
@@ -0,0 +1,208 @@
+"""
+Registre de modèles versionnés avec rechargement à chaud.
+
+Disposition attendue :
+
+    models/
+        ACTIVE              # optionnel : nom de la version à servir
+        v1/bestmodel.pkl
+        v1/preprocessor.pkl
+        v2/...
+
+Sans sous-dossier de version, les chemins plats de la configuration
+(`model_path`, `scaler_path`) forment la version "default". Les artefacts sont
+chargés avec joblib.load(mmap_mode="r") : les tableaux NumPy des estimateurs
+sont mappés depuis le fichier et leurs pages partagées entre workers. Chaque
+version est préchauffée avec un lot factice avant d'être servie, puis
+remplace l'ancienne par une simple affectation (atomique).
+
+Une version choisie explicitement (/admin/reload?version=...) est épinglée :
+le watcher suit alors ses fichiers mais ne revient plus à ACTIVE / la plus
+récente, jusqu'à un rechargement sans version.
+
+Le chargement est paresseux : ensure_loaded() (appelé en tâche de fond au
+démarrage de l'API, ou avant le fork par src.serve) ou le premier accès à
+`pipeline` charge la version active.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from src.preprocesspredict import PredictionPipeline
+
+MODEL_FILE = "bestmodel.pkl"
+SCALER_FILE = "preprocessor.pkl"
+ACTIVE_FILE = "ACTIVE"
+DEFAULT_VERSION = "default"
+
+logger = logging.getLogger(__name__)
+WARMUP_ROWS = 8
+
+
+def _mtime(path: Path) -> int:
+    return path.stat().st_mtime_ns if path.exists() else 0
+
+
+class ModelRegistry:
+    def __init__(self, root="models", model_path="models/bestmodel.pkl", scaler_path="models/preprocessor.pkl",
+                 mmap_mode: Optional[str] = "r", cache_size: int = 2, backend: str = "sklearn", timer=None,
+                 snapshot_dir: Optional[str] = None, schema=None, window=None):
+        self.root = Path(root)
+        self.model_path = Path(model_path)
+        self.scaler_path = Path(scaler_path)
+        self.mmap_mode = mmap_mode
+        self.backend = backend
+        self.timer = timer
+        self.snapshot_dir = snapshot_dir
+        self.schema = schema
+        self.window = window
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, PredictionPipeline]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._pipeline: PredictionPipeline = None
+        self.version: str = None
+        self.signature: Tuple = None
+        self.load_time_s: float = 0.0
+        self.warmup_time_s: float = 0.0
+        self.loaded_at: float = None
+        self.reloads = 0
+        self.load_error: Optional[str] = None  # dernier échec de chargement, exposé par /health/ready
+        self.pinned: Optional[str] = None  # version imposée par l'admin, respectée par check_for_update
+        self._listeners = []
+
+    # --- Résolution des versions ---
+    def versions(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and (p / MODEL_FILE).exists())
+
+    def resolve(self, version: Optional[str] = None) -> str:
+        """Requested version, else the one named in ACTIVE, else the latest, else "default"."""
+        if version:
+            if version != DEFAULT_VERSION and version not in self.versions():
+                raise ValueError(f"Unknown model version: {version}")
+            return version
+        active = self.root / ACTIVE_FILE
+        if active.exists():
+            name = active.read_text().strip()
+            if name in self.versions():
+                return name
+        versions = self.versions()
+        return versions[-1] if versions else DEFAULT_VERSION
+
+    def paths(self, version: str) -> Tuple[Path, Path]:
+        if version == DEFAULT_VERSION:
+            return self.model_path, self.scaler_path
+        return self.root / version / MODEL_FILE, self.root / version / SCALER_FILE
+
+    def _signature(self, version: str) -> Tuple:
+        model, scaler = self.paths(version)
+        return (version, _mtime(model), _mtime(scaler))
+
+    # --- Chargement ---
+    def _build(self, version: str, signature: Tuple) -> PredictionPipeline:
+        cached = self._cache.get(signature)
+        if cached is not None:
+            self._cache.move_to_end(signature)
+            return cached
+        model, scaler = self.paths(version)
+        pipeline = PredictionPipeline(model, scaler, mmap_mode=self.mmap_mode, backend=self.backend, timer=self.timer,
+                                      snapshot_dir=self.snapshot_dir, schema=self.schema,
+                                      window=self.window)
+        self._cache[signature] = pipeline
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return pipeline
+
+    @staticmethod
+    def warm_up(pipeline: PredictionPipeline):
+        # Valeurs par défaut ramenées dans les plages du schéma : des zéros seraient rejetés par un min > 0
+        row = pipeline.schema.typical_row()
+        pipeline.predict_proba_batch(np.tile(list(row.values()), (WARMUP_ROWS, 1)))
+        pipeline.predict_proba(row)
+
+    def load(self, version: Optional[str] = None, pin: bool = False) -> Dict[str, Any]:
+        """
+        Loads, warms up, then swaps in `version` (or the resolved active one).
+        With pin=True the choice sticks: `version` is pinned, or unpinned when None.
+        """
+        with self._lock:
+            requested = version
+            version = self.resolve(version)
+            signature = self._signature(version)
+            start = time.perf_counter()
+            try:
+                pipeline = self._build(version, signature)
+                loaded = time.perf_counter()
+                self.warm_up(pipeline)
+            except Exception as e:
+                self._cache.pop(signature, None)
+                self.load_error = f"{type(e).__name__}: {e}"
+                logger.exception("Failed to load model version %s", version)
+                raise
+            self.load_error = None
+            self.warmup_time_s = time.perf_counter() - loaded
+            self.load_time_s = loaded - start
+            # Bascule atomique : les requêtes en cours terminent sur l'ancienne version
+            self._pipeline, self.version, self.signature = pipeline, version, signature
+            if pin:
+                self.pinned = requested
+            self.loaded_at = time.time()
+            self.reloads += 1
+        for callback in self._listeners:
+            callback(self)
+        return self.info()
+
+    @property
+    def ready(self) -> bool:
+        return self._pipeline is not None
+
+    def ensure_loaded(self) -> PredictionPipeline:
+        """Loads the active version unless one is already served."""
+        if self._pipeline is None:
+            with self._lock:
+                if self._pipeline is None:
+                    self.load()
+        return self._pipeline
+
+    @property
+    def pipeline(self) -> PredictionPipeline:
+        return self._pipeline if self._pipeline is not None else self.ensure_loaded()
+
+    def on_reload(self, callback):
+        """Registers callback(registry), called after every swap (e.g. cache invalidation)."""
+        self._listeners.append(callback)
+
+    def check_for_update(self) -> bool:
+        """Reloads if the active version (the pinned one, if any) or its files changed on disk."""
+        version = self.resolve(self.pinned)
+        if self._signature(version) == self.signature:
+            return False
+        self.load(version)
+        return True
+
+    async def watch(self, interval: float):
+        """Polls the registry every `interval` seconds (lifespan background task)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.check_for_update)
+            except Exception:
+                # Artefact en cours d'écriture : nouvel essai au prochain tour (échec journalisé par load)
+                pass
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.version,
+            "model_load_time_s": round(self.load_time_s, 6),
+            "model_warmup_time_s": round(self.warmup_time_s, 6),
+            "model_loaded_at": self.loaded_at,
+            "model_reloads": self.reloads,
+            "model_pinned": self.pinned,
+            "model_load_error": self.load_error,
+            "inference_backend": "compiled" if self._pipeline is not None and self._pipeline.compiled is not None else "sklearn",
+        }
@@ -0,0 +1,112 @@
+"""
+Rendu incrémental des courbes du tableau de bord.
+
+Les figures Plotly sont construites une seule fois ; l'historique complet vit
+dans des tampons NumPy extensibles et seule une version sous-échantillonnée
+(LTTB, au plus `max_points` points par courbe) est envoyée au navigateur. Le
+coût par image reste donc constant quelle que soit la durée du rejeu, et
+FrameThrottle découple la cadence d'affichage de celle des données.
+"""
+import time
+from typing import Tuple
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling: keeps the first and last points
+    and, in each bucket, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Moyennes de chaque seau, calculées d'un bloc par sommes cumulées
+    cx, cy = np.r_[0, np.cumsum(x)], np.r_[0, np.cumsum(y)]
+    lo, hi = edges[:-1], edges[1:]
+    mean_x = (cx[hi] - cx[lo]) / (hi - lo)
+    mean_y = (cy[hi] - cy[lo]) / (hi - lo)
+    next_x, next_y = np.r_[mean_x[1:], x[-1]], np.r_[mean_y[1:], y[-1]]
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        bx, by = x[lo[i]:hi[i]], y[lo[i]:hi[i]]
+        area = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = lo[i] + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+class SeriesBuffer:
+    """Append-only (x, y) series with amortized O(1) extension."""
+
+    def __init__(self, capacity: int = 1024):
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self.size = 0
+
+    def extend(self, x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        need = self.size + len(x)
+        if need > len(self._x):
+            capacity = max(need, 2 * len(self._x))
+            self._x = np.resize(self._x, capacity)
+            self._y = np.resize(self._y, capacity)
+        self._x[self.size:need] = x
+        self._y[self.size:need] = y
+        self.size = need
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._x[:self.size]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y[:self.size]
+
+
+class LiveFigure:
+    """A Plotly figure built once whose traces are fed incrementally."""
+
+    def __init__(self, fig, max_points: int = 600):
+        self.fig = fig
+        self.max_points = max_points
+        self.series = [SeriesBuffer() for _ in fig.data]
+        self._dirty = False
+
+    def extend(self, x, y, trace: int = 0):
+        if len(x):
+            self.series[trace].extend(x, y)
+            self._dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def render(self):
+        """Pushes the downsampled series into the figure and returns it."""
+        with self.fig.batch_update():
+            for trace, series in zip(self.fig.data, self.series):
+                trace.x, trace.y = lttb(series.x, series.y, self.max_points)
+        self._dirty = False
+        return self.fig
+
+
+class FrameThrottle:
+    """Allows at most `fps` redraws per second; `force` bypasses it (last frame)."""
+
+    def __init__(self, fps: float = 10.0):
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self._last = float("-inf")
+        self.frames = 0
+
+    def ready(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.frames += 1
+            return True
+        return False
@@ -0,0 +1,221 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+import numpy as np
+from src.schema import SENSOR_SCHEMA
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# --- Paramètres scientifiques (TEP) ---
+TIME_STEP_MINUTES = 3
+INJECTION_TIME_MIN = 60
+PERSISTENCE_LIMIT = 2
+DETECTOR_THRESHOLD = 0.5
+STABILISATION_HOURS = 1.0
+BASELINE_POINTS = 5
+
+# Nom affiché -> variable du schéma (et colonne TEP brute dont elle provient)
+SENSOR_FEATURES = {"pressure": "pressure", "temperature": "temperature", "flow": "flowrate"}
+SENSOR_COLUMNS = {name: {f.name: f.source for f in SENSOR_SCHEMA.features}[feature] for name, feature in SENSOR_FEATURES.items()}
+
+
+@dataclass
+class ReplayEvents:
+    """First detection / confirmed diagnosis of a run, as row indices and minutes."""
+    anomaly_index: Optional[int]
+    anomaly_time_min: Optional[float]
+    diagnosis_index: Optional[int]
+    diagnosis_time_min: Optional[float]
+
+    @property
+    def detection_delay(self) -> Optional[float]:
+        if self.anomaly_time_min is None:
+            return None
+        return max(0, self.anomaly_time_min - INJECTION_TIME_MIN)
+
+    @property
+    def diagnosis_delay(self) -> Optional[float]:
+        if self.diagnosis_time_min is None:
+            return None
+        return max(0, self.diagnosis_time_min - INJECTION_TIME_MIN)
+
+
+@dataclass
+class ReplayChunk:
+    """A slice [start, stop) of the run; the arrays hold its decimated points and
+    `current` the full-resolution values of its last sample."""
+    start: int
+    stop: int
+    time_h: np.ndarray
+    pressure: np.ndarray
+    temperature: np.ndarray
+    flow: np.ndarray
+    prediction: np.ndarray
+    current: Dict[str, float] = field(default_factory=dict)
+
+
+def consecutive_runs(mask: np.ndarray) -> np.ndarray:
+    """Length of the run of True ending at each position (0 where mask is False)."""
+    idx = np.arange(len(mask))
+    last_false = np.maximum.accumulate(np.where(mask, -1, idx))
+    return idx - last_false
+
+
+def detect_events(minutes: np.ndarray, detector: np.ndarray, diagnosis: np.ndarray, fault_code: int,
+                  injection_time_min: float = INJECTION_TIME_MIN,
+                  persistence_limit: int = PERSISTENCE_LIMIT) -> ReplayEvents:
+    """
+    Vectorized version of the hybrid detection/diagnosis state machine:
+    after the injection time, the anomaly is the first detector score above 0.5
+    and the diagnosis is confirmed once the predicted fault matches
+    `fault_code` on `persistence_limit` consecutive samples.
+    """
+    active = minutes > injection_time_min
+    detected = np.flatnonzero(active & (detector > DETECTOR_THRESHOLD))
+    matches = active & (np.round(diagnosis) == fault_code)
+    confirmed = np.flatnonzero(consecutive_runs(matches) >= persistence_limit)
+
+    a_idx = int(detected[0]) if len(detected) else None
+    d_idx = int(confirmed[0]) if len(confirmed) else None
+    return ReplayEvents(
+        anomaly_index=a_idx,
+        anomaly_time_min=float(minutes[a_idx]) if a_idx is not None else None,
+        diagnosis_index=d_idx,
+        diagnosis_time_min=float(minutes[d_idx]) if d_idx is not None else None,
+    )
+
+
+def _column(frame: "pd.DataFrame", name: str, default: np.ndarray) -> np.ndarray:
+    return frame[name].to_numpy(dtype=float) if name in frame.columns else default
+
+
+def read_run(frame: "pd.DataFrame") -> Dict[str, np.ndarray]:
+    """Column arrays of a run (or of a slice of it), with the derived time axes."""
+    n = len(frame)
+    zeros = np.zeros(n)
+    # Capteurs validés par le schéma partagé avec l'API : mesures absentes comblées par la dernière valide
+    sensors = SENSOR_SCHEMA.columns(frame)
+    cols = {
+        "sample": _column(frame, "sample", np.arange(n, dtype=float)),
+        **{name: sensors[feature] for name, feature in SENSOR_FEATURES.items()},
+        "detector": _column(frame, "detector", zeros),
+        "diagnosis": _column(frame, "faults_pred", zeros),
+    }
+    cols["minutes"] = cols["sample"] * TIME_STEP_MINUTES
+    cols["time_h"] = cols["minutes"] / 60
+    cols["prediction"] = np.where(cols["time_h"] < STABILISATION_HOURS, 0.0, cols["diagnosis"])
+    return cols
+
+
+def compute_baseline(pressure: np.ndarray, temperature: np.ndarray, flow: np.ndarray) -> Dict[str, Optional[float]]:
+    """Valeurs "normales" : moyenne des premiers points de la simulation."""
+    if len(pressure) <= BASELINE_POINTS:
+        return {"p": None, "t": None, "f": None}
+    return {
+        "p": float(pressure[:BASELINE_POINTS].mean()),
+        "t": float(temperature[:BASELINE_POINTS].mean()),
+        "f": float(flow[:BASELINE_POINTS].mean()),
+    }
+
+
+def make_chunk(cols: Dict[str, np.ndarray], start: int, lo: int, hi: int, decimation: int) -> ReplayChunk:
+    """
+    Chunk for rows [lo, hi) of `cols`, whose row lo is global index `start`.
+    Decimation is aligned on the global index so chunks join seamlessly.
+    """
+    first = lo + (-start) % decimation
+    sl = slice(first, hi, decimation)
+    last = hi - 1
+    return ReplayChunk(
+        start, start + (hi - lo),
+        cols["time_h"][sl], cols["pressure"][sl], cols["temperature"][sl], cols["flow"][sl], cols["prediction"][sl],
+        current={k: float(cols[k][last]) for k in ("time_h", "pressure", "temperature", "flow")},
+    )
+
+
+class ReplayEngine:
+    """
+    Streams a simulation run chunk by chunk from column arrays read once.
+
+    `decimation` keeps one point out of k for display (events are always
+    computed at full resolution) and `speed` divides the 0.05 s per sample
+    pacing of the original animation.
+    """
+
+    def __init__(self, frame: "pd.DataFrame", fault_code: int, chunk_size: int = 10,
+                 decimation: int = 1, speed: float = 1.0, seconds_per_sample: float = 0.05):
+        self.fault_code = fault_code
+        self.chunk_size = max(1, chunk_size)
+        self.decimation = max(1, decimation)
+        self.speed = speed
+        self.seconds_per_sample = seconds_per_sample
+
+        self.cols = cols = read_run(frame)
+        self.sample, self.minutes, self.time_h = cols["sample"], cols["minutes"], cols["time_h"]
+        self.pressure, self.temperature, self.flow = cols["pressure"], cols["temperature"], cols["flow"]
+        self.detector, self.diagnosis, self.prediction = cols["detector"], cols["diagnosis"], cols["prediction"]
+        self.events = detect_events(self.minutes, self.detector, self.diagnosis, fault_code)
+        self.baseline = compute_baseline(self.pressure, self.temperature, self.flow)
+
+    def __len__(self) -> int:
+        return len(self.sample)
+
+    def chunks(self) -> Iterator[ReplayChunk]:
+        for start in range(0, len(self), self.chunk_size):
+            stop = min(start + self.chunk_size, len(self))
+            yield make_chunk(self.cols, start, start, stop, self.decimation)
+
+    def pause_for(self, chunk: ReplayChunk) -> float:
+        """Wall-clock seconds to wait after pushing `chunk`."""
+        if self.speed <= 0:
+            return 0.0
+        return (chunk.stop - chunk.start) * self.seconds_per_sample / self.speed
+
+
+class StreamingReplay:
+    """
+    Same interface as ReplayEngine for samples arriving over the network:
+    each pushed frame becomes one chunk, pacing is left to the producer and
+    the detection state is updated incrementally by a StreamDetector.
+    """
+
+    def __init__(self, fault_code: int, decimation: int = 1):
+        from src.streamdetector import StreamDetector  # import local : streamdetector dépend de ce module
+        self.fault_code = fault_code
+        self.decimation = max(1, decimation)
+        self.detector = StreamDetector(capacity=1)
+        self.stream = self.detector.add_stream(target=fault_code)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, frame: "pd.DataFrame") -> ReplayChunk:
+        cols = read_run(frame)
+        n = len(frame)
+        sensors = np.column_stack([cols["pressure"], cols["temperature"], cols["flow"]])
+        self.detector.update(np.full(n, self.stream), cols["sample"], sensors, cols["detector"], cols["diagnosis"])
+        start = self._size
+        self._size += n
+        return make_chunk(cols, start, 0, n, self.decimation)
+
+    @property
+    def baseline(self) -> Dict[str, Optional[float]]:
+        if self._size <= BASELINE_POINTS:
+            return {"p": None, "t": None, "f": None}
+        p, t, f = self.detector.baseline(self.stream)
+        return {"p": float(p), "t": float(t), "f": float(f)}
+
+    @property
+    def events(self) -> ReplayEvents:
+        d, s = self.detector, self.stream
+        alerted, diagnosed = d.alert_sample[s] >= 0, d.diag_sample[s] >= 0
+        return ReplayEvents(
+            anomaly_index=int(d.alert_row[s]) if alerted else None,
+            anomaly_time_min=float(d.alert_sample[s] * TIME_STEP_MINUTES) if alerted else None,
+            diagnosis_index=int(d.diag_row[s]) if diagnosed else None,
+            diagnosis_time_min=float(d.diag_sample[s] * TIME_STEP_MINUTES) if diagnosed else None,
+        )
+
+    def pause_for(self, chunk: ReplayChunk) -> float:
+        return 0.0
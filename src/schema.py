@@ -0,0 +1,233 @@
+"""
+Schéma déclaratif des variables du modèle.
+
+Chaque variable du modèle est décrite une seule fois : son nom, la colonne
+TEP brute dont elle provient (xmeas_* / xmv_*), sa plage physique et sa valeur
+d'imputation. Le même schéma sert à l'API (lots JSON, DataFrames, matrices)
+et au tableau de bord (colonnes des capteurs) :
+
+- la correspondance clés d'entrée -> colonnes est résolue une fois par jeu
+  de clés puis mise en cache ;
+- NaN / valeurs absentes, infinis et valeurs hors plage sont détectés en un
+  seul passage par masques NumPy sur la matrice (n, k) ;
+- selon `on_invalid`, le lot entier est rejeté (SchemaError, un rapport par
+  variable) ou imputé : valeur par défaut, ou dernière valeur valide
+  ("ffill", pour les séries temporelles).
+
+Un schéma se charge depuis un fichier JSON :
+
+    {"on_invalid": "impute", "impute": "ffill",
+     "features": [{"name": "temperature", "source": "xmeas_9", "min": 100, "max": 150}, ...]}
+"""
+import json
+from dataclasses import asdict, dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ON_INVALID = ("reject", "impute")
+IMPUTE = ("default", "ffill")
+MAPPING_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    source: Optional[str] = None  # colonne TEP brute acceptée à la place du nom
+    min: Optional[float] = None
+    max: Optional[float] = None
+    default: float = 0.0
+
+
+DEFAULT_FEATURES = (
+    Feature("temperature", "xmeas_9", min=-273.15),  # température du réacteur (°C)
+    Feature("pressure", "xmeas_7", min=0.0),  # pression du réacteur (kPa)
+    Feature("flowrate", "xmeas_10", min=0.0),  # débit de purge
+    Feature("vibration", "xmv_12"),  # vitesse de l'agitateur
+)
+
+
+class SchemaError(ValueError):
+    """Invalid batch; `report` maps each offending feature to its problem counts."""
+
+    def __init__(self, message: str, report: Optional[Dict[str, Dict[str, int]]] = None):
+        super().__init__(message)
+        self.report = report or {}
+
+
+class FeatureSchema:
+    def __init__(self, features: Sequence[Feature] = DEFAULT_FEATURES, on_invalid: str = "reject", impute: str = "default"):
+        if on_invalid not in ON_INVALID:
+            raise ValueError(f"on_invalid must be one of {ON_INVALID}, got {on_invalid!r}")
+        if impute not in IMPUTE:
+            raise ValueError(f"impute must be one of {IMPUTE}, got {impute!r}")
+        self.features = tuple(features)
+        self.names = [f.name for f in self.features]
+        self.on_invalid = on_invalid
+        self.impute = impute
+        self.lower = np.array([-np.inf if f.min is None else f.min for f in self.features], dtype=float)
+        self.upper = np.array([np.inf if f.max is None else f.max for f in self.features], dtype=float)
+        self.defaults = np.array([f.default for f in self.features], dtype=float)
+        self._mappings: Dict[Tuple, List[Optional[str]]] = {}
+        # Bornes en float Python pour le chemin scalaire (plus rapides que des scalaires NumPy)
+        self._bounds = [(f, float(lo), float(hi), float(d)) for f, lo, hi, d in zip(self.features, self.lower, self.upper, self.defaults)]
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "FeatureSchema":
+        features = [Feature(**f) for f in spec.get("features", [asdict(f) for f in DEFAULT_FEATURES])]
+        return cls(features, spec.get("on_invalid", "reject"), spec.get("impute", "default"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"on_invalid": self.on_invalid, "impute": self.impute, "features": [asdict(f) for f in self.features]}
+
+    def subset(self, names: Sequence[str], **options) -> "FeatureSchema":
+        """Schema restricted to `names` (in that order), optionally with other on_invalid / impute."""
+        by_name = {f.name: f for f in self.features}
+        return FeatureSchema([by_name[n] for n in names], options.get("on_invalid", self.on_invalid),
+                             options.get("impute", self.impute))
+
+    # --- Correspondance des colonnes ---
+    def resolve(self, keys) -> List[Optional[str]]:
+        """Input key used for each feature (its name, else its raw source), None if absent; cached per key set."""
+        keys = tuple(keys)
+        mapping = self._mappings.get(keys)
+        if mapping is None:
+            present = set(keys)
+            mapping = [f.name if f.name in present else f.source if f.source in present else None for f in self.features]
+            if len(self._mappings) >= MAPPING_CACHE_SIZE:
+                self._mappings.clear()
+            self._mappings[keys] = mapping
+        return mapping
+
+    def matrix(self, data) -> np.ndarray:
+        """Raw (n, k) float matrix of a batch, NaN where a value is absent; not validated."""
+        k = len(self.features)
+        if isinstance(data, np.ndarray):
+            if data.ndim != 2 or data.shape[1] != k:
+                raise SchemaError(f"Expected an array of shape (n, {k}), got {data.shape}")
+            return self._floats(lambda: np.asarray(data, dtype=float))
+        if hasattr(data, "columns"):  # DataFrame
+            mapping = self.resolve(data.columns)
+            X = np.full((len(data), k), np.nan)
+            present = [i for i, key in enumerate(mapping) if key is not None]
+            if present:
+                X[:, present] = self._floats(lambda: data[[mapping[i] for i in present]].to_numpy(dtype=float))
+            return X
+        rows = list(data)
+        if not rows:
+            return np.empty((0, k))
+        mapping = self.resolve(rows[0])
+        if None not in mapping:
+            getter = itemgetter(*mapping) if k > 1 else (lambda row: (row[mapping[0]],))
+            try:
+                return self._floats(lambda: np.array([getter(row) for row in rows], dtype=float).reshape(len(rows), k))
+            except KeyError:
+                pass  # clés hétérogènes : résolution ligne par ligne ci-dessous
+        return self._floats(lambda: np.array([self._values(row) for row in rows], dtype=float).reshape(len(rows), k))
+
+    def _values(self, row: Dict[str, Any]) -> List[Any]:
+        return [row.get(f.name, row.get(f.source) if f.source else None) for f in self.features]
+
+    @staticmethod
+    def _floats(build) -> np.ndarray:
+        try:
+            return build()
+        except (TypeError, ValueError) as e:
+            raise SchemaError(f"Non-numeric feature values: {e}") from None
+
+    # --- Validation ---
+    def check(self, X: np.ndarray) -> Tuple[np.ndarray, Dict[str, Dict[str, int]]]:
+        """Invalid-value mask of X and, per offending feature, counts of missing / non-finite / out-of-range values."""
+        missing = np.isnan(X)
+        infinite = np.isinf(X)
+        below = ~infinite & (X < self.lower)
+        above = ~infinite & (X > self.upper)
+        bad = missing | infinite | below | above
+        report = {}
+        if bad.any():
+            counts = {"missing": missing.sum(axis=0), "non_finite": infinite.sum(axis=0),
+                      "below_min": below.sum(axis=0), "above_max": above.sum(axis=0)}
+            for j in np.flatnonzero(bad.any(axis=0)):
+                report[self.names[j]] = {kind: int(c[j]) for kind, c in counts.items() if c[j]}
+        return bad, report
+
+    def fill(self, X: np.ndarray, bad: np.ndarray) -> np.ndarray:
+        """Replaces the masked values in one pass (default value, or last valid value of the column)."""
+        if self.impute == "ffill" and len(X):
+            last = np.maximum.accumulate(np.where(bad, -1, np.arange(len(X))[:, None]), axis=0)
+            filled = np.take_along_axis(X, np.maximum(last, 0), axis=0)
+            return np.where(last < 0, self.defaults, filled)
+        return np.where(bad, self.defaults, X)
+
+    def transform(self, data) -> np.ndarray:
+        """Validated (n, k) matrix: the batch is rejected or imputed as a whole."""
+        X = self.matrix(data)
+        bad, report = self.check(X)
+        if not report:
+            return X
+        if self.on_invalid == "reject":
+            raise SchemaError(format_report(report), report)
+        return self.fill(X, bad)
+
+    def row(self, data: Dict[str, Any]) -> List[float]:
+        """Validated feature vector of a single sample (scalar path, no array allocation)."""
+        values = []
+        report = None
+        for f, lo, hi, default in self._bounds:
+            value = data.get(f.name)
+            if value is None and f.source:
+                value = data.get(f.source)
+            try:
+                value = float(value)
+            except TypeError:
+                value = float("nan")  # None : valeur absente
+            except ValueError:
+                raise SchemaError(f"Non-numeric feature values: {f.name}={value!r}") from None
+            if not (lo <= value <= hi and value - value == 0.0):  # hors plage, NaN ou infini
+                report = report or {}
+                report[f.name] = {_problem(value, lo, hi): 1}
+                value = default
+            values.append(value)
+        if report and self.on_invalid == "reject":
+            raise SchemaError(format_report(report), report)
+        return values
+
+    def typical_row(self) -> Dict[str, float]:
+        """A valid sample (each default clipped to its range), e.g. for warm-up."""
+        values = np.clip(self.defaults, self.lower, self.upper)
+        return {name: float(v) for name, v in zip(self.names, values)}
+
+    def columns(self, frame: "pd.DataFrame") -> Dict[str, np.ndarray]:
+        """Validated columns of a frame, by feature name."""
+        X = self.transform(frame)
+        return {name: X[:, j] for j, name in enumerate(self.names)}
+
+
+def _problem(value: float, lo: float, hi: float) -> str:
+    if value != value:
+        return "missing"
+    if value - value != 0.0:
+        return "non_finite"
+    return "below_min" if value < lo else "above_max"
+
+
+def format_report(report: Dict[str, Dict[str, int]]) -> str:
+    details = "; ".join(f"{name}: " + ", ".join(f"{n} {kind.replace('_', ' ')}" for kind, n in counts.items())
+                        for name, counts in report.items())
+    return f"Invalid features: {details}"
+
+
+def load_schema(path: Optional[str] = None, **options) -> FeatureSchema:
+    """Schema from a JSON file (the built-in features without one); `options` override on_invalid / impute."""
+    spec = json.loads(Path(path).read_text()) if path else {}
+    spec.update({k: v for k, v in options.items() if v is not None})
+    return FeatureSchema.from_dict(spec)
+
+
+DEFAULT_SCHEMA = FeatureSchema(DEFAULT_FEATURES)
+# Capteurs affichés par le tableau de bord : trous comblés par la dernière mesure valide
+SENSOR_SCHEMA = DEFAULT_SCHEMA.subset(["pressure", "temperature", "flowrate"], on_invalid="impute", impute="ffill")
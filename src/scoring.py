@@ -0,0 +1,79 @@
+"""
+Pool de processus pour le scoring des gros lots.
+
+Le scoring sklearn d'un gros lot est CPU-bound et garde le GIL : exécuté dans
+la boucle asyncio (ou même dans un thread), il retarde toutes les autres
+requêtes du worker. ScoringPool l'envoie à un ProcessPoolExecutor dont les
+processus partent d'un forkserver (spawn à défaut), jamais d'un fork du
+worker : celui-ci a déjà des threads (chargement, micro-batch, to_thread) et
+un fork pourrait hériter d'un verrou tenu et bloquer l'enfant. Chaque
+processus recharge le pipeline depuis ses chemins à son démarrage
+(initializer), puis seule la matrice (n, 4) transite. Après un rechargement
+du modèle, le pool est recréé au lot suivant ; l'ancien termine les lots déjà
+soumis. Les petits lots restent dans un thread : l'aller-retour inter-processus y
+coûterait plus que le calcul.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+import numpy as np
+from src.preprocesspredict import BatchInput, PredictionPipeline
+
+# Sans fork : pas d'état (verrous, threads) hérité du worker
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Pipeline chargé par chaque processus du pool à son démarrage
+_pipeline: Optional[PredictionPipeline] = None
+
+
+def _load(pipeline: PredictionPipeline):
+    global _pipeline
+    _pipeline = pipeline
+    pipeline.has_model  # artefacts lus dès le démarrage, pas au premier lot
+
+
+def _score(X: np.ndarray) -> np.ndarray:
+    return _pipeline.predict_proba_batch(X)
+
+
+class ScoringPool:
+    def __init__(self, workers: int = 2, min_batch: int = 1000):
+        self.workers = workers
+        self.min_batch = max(1, min_batch)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pipeline: Optional[PredictionPipeline] = None
+        self.offloaded = 0
+        self.inline = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _executor_for(self, pipeline: PredictionPipeline) -> ProcessPoolExecutor:
+        if self._executor is None or pipeline is not self._pipeline:
+            if self._executor is not None:
+                # Ancien pool : les lots déjà soumis (autres requêtes en vol) terminent, puis ses processus s'arrêtent
+                self._executor.shutdown(wait=False)
+            self._pipeline = pipeline
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(START_METHOD),
+                                                 initializer=_load, initargs=(pipeline,))
+        return self._executor
+
+    async def predict_proba_batch(self, pipeline: PredictionPipeline, data: BatchInput) -> np.ndarray:
+        """Validates in a thread, then scores in the pool (large batches) or in the thread."""
+        X = await asyncio.to_thread(pipeline.to_matrix, data)
+        if not self.enabled or not pipeline.has_model or len(X) < self.min_batch:
+            self.inline += 1
+            return await asyncio.to_thread(pipeline.predict_proba_batch, X)
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor_for(pipeline), _score, X)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "min_batch": self.min_batch, "offloaded": self.offloaded, "inline": self.inline}
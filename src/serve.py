@@ -0,0 +1,170 @@
+"""
+Mode de service multi-processus (pré-fork).
+
+Le parent importe l'application et charge le modèle et le scaler une seule
+fois (registry.ensure_loaded), ouvre la socket d'écoute, gèle le ramasse-miettes (gc.freeze : les objets
+déjà chargés ne seront plus parcourus, leurs pages ne sont pas recopiées)
+puis forke `workers` processus uvicorn. Les workers partagent la socket (le
+noyau répartit les connexions) et, en copie-sur-écriture, la mémoire des
+artefacts. Le parent ne sert aucune requête : il relance un worker qui meurt
+(délai doublé à chaque plantage rapproché, jusqu'à RESPAWN_MAX_DELAY_S) et
+propage SIGTERM / SIGINT pour un arrêt propre. Au-delà de MAX_CRASHES
+plantages en CRASH_WINDOW_S secondes (modèle illisible, port perdu...), il
+arrête les workers restants et sort en erreur pour laisser l'orchestrateur
+réagir.
+
+Plusieurs routes gardent leur état en mémoire du worker : flux de télémétrie
+(/stream/replay puis /stream/telemetry), détecteur d'événements, cache de
+prédictions, compteurs de /metrics et version chargée par /admin/reload.
+Avec plusieurs workers, chaque connexion tombe sur l'un d'eux : un flux lancé
+sur un worker est introuvable (404) depuis les autres et /metrics ne décrit
+que le worker qui répond. WORKERS vaut donc 1 par défaut ; au-delà, réserver
+le service au scoring sans état (/predict, /predict/batch). Avec des variables
+glissantes (ROLLING_WINDOWS / ROLLING_EWMA_ALPHAS), l'état de chaque flux vit
+aussi dans le worker : un seul worker est alors démarré quoi qu'il arrive.
+
+    python -m src.serve                       # WORKERS (défaut : 1)
+    python -m src.serve --workers 4 --port 8080
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from collections import deque
+from typing import Set
+from src.config import settings
+
+RESPAWN_DELAY_S = 0.5
+RESPAWN_MAX_DELAY_S = 30.0
+MAX_CRASHES = 5
+CRASH_WINDOW_S = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str = "info",
+                 respawn_delay: float = RESPAWN_DELAY_S, max_crashes: int = MAX_CRASHES, crash_window: float = CRASH_WINDOW_S):
+        self.app = app
+        self.sock = sock
+        self.workers = max(1, workers)
+        self.log_level = log_level
+        self.respawn_delay = respawn_delay
+        self.max_crashes = max_crashes
+        self.crash_window = crash_window
+        self.children: Set[int] = set()
+        self.crashes = deque()  # instants des morts de workers non demandées
+        self.stopping = False
+
+    def _serve(self):
+        import uvicorn
+        config = uvicorn.Config(self.app, log_level=self.log_level, lifespan="on")
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            # Enfant : uvicorn installe ses propres gestionnaires de signaux
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                self._serve()
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                sys.stderr.flush()
+                os._exit(code)
+        self.children.add(pid)
+        return pid
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def respawn_delay_after_crash(self, now: float) -> float:
+        """Records a worker death; backoff before the next spawn, or -1 once the crash budget is spent."""
+        self.crashes.append(now)
+        while self.crashes and self.crashes[0] < now - self.crash_window:
+            self.crashes.popleft()
+        if len(self.crashes) > self.max_crashes:
+            return -1
+        return min(self.respawn_delay * 2 ** (len(self.crashes) - 1), RESPAWN_MAX_DELAY_S)
+
+    def run(self) -> int:
+        """Serves until stopped; exit code 1 when workers keep crashing."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        gc.freeze()
+        for _ in range(self.workers):
+            self.spawn()
+        code = 0
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            self.children.discard(pid)
+            if self.stopping:
+                continue
+            delay = self.respawn_delay_after_crash(time.monotonic())
+            if delay < 0:
+                logger.error("%d worker crashes in %.0f s: stopping", len(self.crashes), self.crash_window)
+                code = 1
+                self.stop()
+                continue
+            logger.warning("Worker %d exited (status %d), respawning in %.1f s", pid, status, delay)
+            time.sleep(delay)
+            if not self.stopping:
+                self.spawn()
+        self.sock.close()
+        return code
+
+
+def serving_workers(requested: int) -> int:
+    """Worker count actually started: 1 when rolling features keep per-stream state in the worker."""
+    if (settings.rolling_windows or settings.rolling_ewma_alphas) and requested > 1:
+        logger.warning("Rolling features enabled: serving with 1 worker instead of %d", requested)
+        return 1
+    if requested > 1:
+        logger.warning("Serving with %d workers: telemetry streams, prediction cache, /metrics and /admin/reload "
+                       "are per worker; use them with a single worker", requested)
+    return requested
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serveur API pré-forké (modèle partagé entre workers)")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    workers = serving_workers(args.workers)
+    sock = bind_socket(args.host, args.port)
+    from src.app import app, registry
+    registry.ensure_loaded()  # modèle chargé dans le parent, avant le fork
+    return PreforkServer(app, sock, workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
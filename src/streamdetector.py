@@ -0,0 +1,155 @@
+"""
+Détecteur en ligne multi-flux.
+
+L'état de chaque flux (un réacteur / un run) est une ligne d'une table de
+tableaux NumPy : compteur d'échantillons, ligne de base des capteurs, fenêtre
+glissante des scores du détecteur (tampon circulaire + somme courante),
+compteur de diagnostics consécutifs et instants d'alerte / de diagnostic.
+Chaque échantillon coûte O(1), et un lot d'échantillons de flux différents est
+traité en une seule passe vectorisée.
+"""
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from src.replay import (BASELINE_POINTS, DETECTOR_THRESHOLD, INJECTION_TIME_MIN, PERSISTENCE_LIMIT,
+                        TIME_STEP_MINUTES)
+
+INJECTION_SAMPLE = INJECTION_TIME_MIN // TIME_STEP_MINUTES
+SENSOR_DEVIATION = 0.02  # 2% d'écart à la ligne de base = anomalie capteur
+
+
+class StreamDetector:
+    def __init__(self, capacity: int = 1024, n_sensors: int = 3, window: int = 1,
+                 threshold: float = DETECTOR_THRESHOLD, persistence_limit: int = PERSISTENCE_LIMIT,
+                 deviation: float = SENSOR_DEVIATION):
+        self.n_sensors = n_sensors
+        self.window = max(1, window)
+        self.threshold = threshold
+        self.persistence_limit = persistence_limit
+        self.deviation = deviation
+        self.size = 0
+        self._alloc(max(1, capacity))
+
+    def _alloc(self, capacity: int):
+        old = getattr(self, "count", None)
+        fields = {
+            "target": (np.int64, ()), "count": (np.int64, ()),
+            "base_sum": (np.float64, (self.n_sensors,)),
+            "ring": (np.float64, (self.window,)), "ring_sum": (np.float64, ()),
+            "last_pred": (np.int64, ()), "consecutive": (np.int64, ()),
+            "alert_sample": (np.float64, ()), "alert_row": (np.int64, ()),
+            "diag_sample": (np.float64, ()), "diag_row": (np.int64, ()), "diag_class": (np.int64, ()),
+        }
+        for name, (dtype, shape) in fields.items():
+            fill = -1 if name in ("alert_sample", "alert_row", "diag_sample", "diag_row") else 0
+            arr = np.full((capacity,) + shape, fill, dtype=dtype)
+            if old is not None:
+                arr[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, arr)
+        self.capacity = capacity
+
+    def add_stream(self, target: int = 0) -> int:
+        """
+        Registers a stream and returns its index. With target > 0 the diagnosis
+        must match that fault code; with 0 any persistent non-zero class counts.
+        """
+        if self.size == self.capacity:
+            self._alloc(self.capacity * 2)
+        idx = self.size
+        self.size += 1
+        self.reset(idx, target)
+        return idx
+
+    def reset(self, stream: int, target: int = None):
+        if target is not None:
+            self.target[stream] = target
+        self.count[stream] = 0
+        self.base_sum[stream] = 0
+        self.ring[stream] = 0
+        self.ring_sum[stream] = 0
+        self.last_pred[stream] = 0
+        self.consecutive[stream] = 0
+        self.alert_sample[stream] = self.alert_row[stream] = -1
+        self.diag_sample[stream] = self.diag_row[stream] = -1
+        self.diag_class[stream] = 0
+
+    def baseline(self, stream: int) -> np.ndarray:
+        """Mean of the first samples, or NaN until BASELINE_POINTS have been seen."""
+        if self.count[stream] < BASELINE_POINTS:
+            return np.full(self.n_sensors, np.nan)
+        return self.base_sum[stream] / BASELINE_POINTS
+
+    def update(self, streams, samples, sensors, detector, diagnosis) -> Tuple[Dict[str, np.ndarray], List[Dict[str, Any]]]:
+        """
+        Consumes n samples (any mix of streams, in arrival order). Returns
+        per-sample outputs (smoothed score, alert state, sensor deviation
+        flags) and the alert/diagnosis events raised by this batch.
+        """
+        streams = np.asarray(streams, dtype=np.int64)
+        samples = np.asarray(samples, dtype=float)
+        sensors = np.asarray(sensors, dtype=float).reshape(len(streams), self.n_sensors)
+        detector = np.asarray(detector, dtype=float)
+        diagnosis = np.asarray(diagnosis, dtype=float)
+
+        n = len(streams)
+        out = {"score": np.zeros(n), "alert": np.zeros(n, dtype=bool), "deviation": np.zeros((n, self.n_sensors), dtype=bool)}
+        events: List[Dict[str, Any]] = []
+        if n == 0:
+            return out, events
+
+        # Un flux peut apparaître plusieurs fois dans le lot : on traite par "tours"
+        # où chaque flux n'apparaît qu'une fois, dans l'ordre d'arrivée.
+        order = np.argsort(streams, kind="stable")
+        sorted_ids = streams[order]
+        group_start = np.r_[0, np.flatnonzero(sorted_ids[1:] != sorted_ids[:-1]) + 1]
+        rank = np.arange(n) - np.repeat(group_start, np.diff(np.r_[group_start, n]))
+        for r in range(int(rank.max()) + 1):
+            pos = np.sort(order[rank == r])
+            self._step(pos, streams[pos], samples[pos], sensors[pos], detector[pos], diagnosis[pos], out, events)
+        return out, events
+
+    def _step(self, pos, idx, sample, x, det, diag, out, events):
+        n_seen = self.count[idx]
+
+        # Écart à la ligne de base (disponible à partir du 6e échantillon)
+        ready = n_seen >= BASELINE_POINTS
+        base = self.base_sum[idx] / BASELINE_POINTS
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dev = np.abs(x - base) / base
+        out["deviation"][pos] = ready[:, None] & (base != 0) & (dev > self.deviation)
+        warm = ~ready
+        self.base_sum[idx[warm]] += x[warm]
+
+        # Fenêtre glissante du score détecteur
+        slot = n_seen % self.window
+        self.ring_sum[idx] += det - self.ring[idx, slot]
+        self.ring[idx, slot] = det
+        score = self.ring_sum[idx] / np.minimum(n_seen + 1, self.window)
+        out["score"][pos] = score
+
+        active = sample > INJECTION_SAMPLE
+        new_alert = active & (self.alert_sample[idx] < 0) & (score > self.threshold)
+        self.alert_sample[idx[new_alert]] = sample[new_alert]
+        self.alert_row[idx[new_alert]] = n_seen[new_alert]
+        out["alert"][pos] = self.alert_sample[idx] >= 0
+
+        # Règle de persistance du diagnostic
+        pred = np.round(diag).astype(np.int64)
+        target = self.target[idx]
+        open_ = active & (self.diag_sample[idx] < 0)
+        hit = np.where(target > 0, pred == target, pred != 0)
+        count = np.where(hit, np.where(pred == self.last_pred[idx], self.consecutive[idx] + 1, 1), 0)
+        self.consecutive[idx[open_]] = count[open_]
+        self.last_pred[idx] = pred
+        confirmed = open_ & (count >= self.persistence_limit)
+        self.diag_sample[idx[confirmed]] = sample[confirmed]
+        self.diag_row[idx[confirmed]] = n_seen[confirmed]
+        self.diag_class[idx[confirmed]] = pred[confirmed]
+
+        self.count[idx] = n_seen + 1
+
+        for i in np.flatnonzero(new_alert):
+            events.append({"type": "alert", "stream": int(idx[i]), "sample": float(sample[i]),
+                           "latency_samples": float(max(0, sample[i] - INJECTION_SAMPLE)), "score": float(score[i])})
+        for i in np.flatnonzero(confirmed):
+            events.append({"type": "diagnosis", "stream": int(idx[i]), "sample": float(sample[i]),
+                           "latency_samples": float(max(0, sample[i] - INJECTION_SAMPLE)), "fault": int(pred[i])})
@@ -0,0 +1,219 @@
+"""
+Flux de télémétrie poussé par le serveur (Server-Sent Events).
+
+Chaque flux (une panne / un réacteur) est un TelemetryBroker : un tampon
+circulaire d'événements numérotés. Les producteurs publient sans jamais
+bloquer ; chaque abonné lit à son rythme à partir de son dernier id
+(Last-Event-ID), et un abonné trop lent pour le tampon reçoit un événement
+`gap` puis reprend au plus ancien échantillon disponible.
+"""
+import asyncio
+import json
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+from src.schema import SENSOR_SCHEMA
+from src.streamdetector import StreamDetector
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class TelemetryBroker:
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._buf: List[Optional[Tuple[str, str]]] = [None] * capacity
+        self._next_id = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, row: Dict[str, Any], event: str = "sample") -> int:
+        """
+        Appends one event (a sample by default); callable from any thread.
+        Returns its id, or -1 once the broker is closed (the event is dropped).
+        """
+        with self._lock:
+            if self._closed:
+                return -1
+            event_id = self._next_id
+            self._buf[event_id % self.capacity] = (event, json.dumps({"id": event_id, **row}))
+            self._next_id += 1
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+        return event_id
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+
+    @staticmethod
+    def _wake(waiters):
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # boucle de l'abonné déjà fermée
+
+    def read(self, after_id: int, limit: int) -> Tuple[List[Tuple[int, str, str]], int, bool]:
+        """
+        Events with id > after_id, at most `limit`. Returns (events, new cursor,
+        gap) where gap is True when events were overwritten before being read.
+        """
+        with self._lock:
+            oldest = max(0, self._next_id - self.capacity)
+            start = after_id + 1
+            gap = start < oldest
+            start = max(start, oldest)
+            stop = min(self._next_id, start + limit)
+            events = [(i, *self._buf[i % self.capacity]) for i in range(start, stop)]
+        cursor = stop - 1 if events else max(after_id, oldest - 1)
+        return events, cursor, gap
+
+    async def wait(self, after_id: int, timeout: float) -> bool:
+        """Waits until an event newer than after_id exists or the stream closes."""
+        event = asyncio.Event()
+        with self._lock:
+            if self._next_id - 1 > after_id or self._closed:
+                return True
+            self._waiters.append((asyncio.get_running_loop(), event))
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+def format_sse(events: List[Tuple[int, str, str]]) -> str:
+    return "".join(f"id: {i}\nevent: {event}\ndata: {payload}\n\n" for i, event, payload in events)
+
+
+async def sse_events(broker: TelemetryBroker, last_id: int = -1, max_batch: int = 500, heartbeat: float = 15.0):
+    """
+    Async generator of SSE text for a subscriber resuming after `last_id`.
+    The ASGI server awaits each chunk being sent, so a slow client only slows
+    its own cursor down.
+    """
+    cursor = last_id
+    while True:
+        events, new_cursor, gap = broker.read(cursor, max_batch)
+        if gap:
+            resume = events[0][0] if events else new_cursor + 1
+            yield f"event: gap\ndata: {json.dumps({'after': cursor, 'resume': resume})}\n\n"
+        cursor = new_cursor
+        if events:
+            yield format_sse(events)
+            continue
+        if broker.closed:
+            yield f"event: end\ndata: {json.dumps({'last_id': cursor})}\n\n"
+            return
+        if not await broker.wait(cursor, heartbeat):
+            yield ": keepalive\n\n"
+
+
+class TelemetryHub:
+    """Brokers by stream key (one per fault scenario / reactor)."""
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._brokers: Dict[Any, TelemetryBroker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[TelemetryBroker]:
+        return self._brokers.get(key)
+
+    def reset(self, key) -> TelemetryBroker:
+        """Fresh broker for `key`; subscribers of the previous one get an `end` event."""
+        with self._lock:
+            old = self._brokers.get(key)
+            self._brokers[key] = broker = TelemetryBroker(self.capacity)
+        if old is not None:
+            old.close()
+        return broker
+
+
+def frame_records(frame: "pd.DataFrame") -> Iterator[Dict[str, Any]]:
+    """Rows as plain-Python dicts, converted column-wise once."""
+    columns = {name: frame[name].to_numpy().tolist() for name in frame.columns}
+    names = list(columns)
+    for values in zip(*columns.values()):
+        yield dict(zip(names, values))
+
+
+async def replay_producer(broker: TelemetryBroker, frame: "pd.DataFrame", seconds_per_sample: float = 0.05,
+                          detector: StreamDetector = None, stream: int = None):
+    """
+    Local producer: publishes a recorded run as if samples were arriving live.
+    With a StreamDetector, each sample carries its online score and alert state
+    and `alert` / `diagnosis` events are published as they are raised.
+    """
+    try:
+        for row in frame_records(frame):
+            events = []
+            if detector is not None:
+                sensors = [SENSOR_SCHEMA.row(row)]
+                out, events = detector.update([stream], [row.get("sample", 0)], sensors,
+                                              [row.get("detector", 0)], [row.get("faults_pred", 0)])
+                row["score"], row["alert"] = float(out["score"][0]), bool(out["alert"][0])
+            broker.publish(row)
+            for event in events:
+                broker.publish(event, event=event["type"])
+            await asyncio.sleep(seconds_per_sample)
+    finally:
+        broker.close()
+
+
+def parse_sse(lines: Iterator[str]) -> Iterator[Tuple[str, Optional[str], str]]:
+    """Client-side parser: yields (event, id, data) from a stream of text lines."""
+    event, event_id, data = "message", None, []
+    for line in lines:
+        if line == "":
+            if data:
+                yield event, event_id, "\n".join(data)
+            event, event_id, data = "message", None, []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "id":
+                event_id = value
+            elif field == "data":
+                data.append(value)
+
+
+def stream_chunks(url: str, fault: int, chunk_size: int = 10, last_id: int = -1, timeout=30.0,
+                  session=None) -> Iterator["pd.DataFrame"]:
+    """
+    Consumes /stream/telemetry incrementally and yields DataFrames of up to
+    `chunk_size` samples, without ever downloading the full dataset.
+    `session` (e.g. the dashboard's pooled requests.Session) reuses connections.
+    """
+    import pandas as pd
+    import requests
+    http = session or requests
+    headers = {"Accept": "text/event-stream", "Last-Event-ID": str(last_id)}
+    with http.get(f"{url}/stream/telemetry", params={"fault": fault}, headers=headers, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        rows = []
+        for event, _, data in parse_sse(response.iter_lines(decode_unicode=True)):
+            if event == "sample":
+                rows.append(json.loads(data))
+                if len(rows) >= chunk_size:
+                    yield pd.DataFrame(rows)
+                    rows = []
+            elif event == "end":
+                break
+        if rows:
+            yield pd.DataFrame(rows)
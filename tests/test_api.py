@@ -0,0 +1,141 @@
+import json
+from fastapi.testclient import TestClient
+from src.app import app
+
+client = TestClient(app)
+
+def test_root():
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.json() == {"greeting": "Monitor the Reactor API is running"}
+
+def test_health():
+    response = client.get("/health")
+    assert response.status_code == 200
+    json_data = response.json()
+    assert "status" in json_data
+    assert "modelloaded" in json_data
+    assert "preprocessorloaded" in json_data
+    assert "model_version" in json_data
+    assert "model_load_time_s" in json_data
+
+def test_predict():
+    response = client.post(
+        "/predict",
+        json={"temperature": 100, "pressure": 5, "flowrate": 10, "vibration": 0.3, "threshold": 0.8}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert "probability" in data
+    assert 0.0 <= data["probability"] <= 1.0
+    assert "alert" in data
+
+def test_predict_batch():
+    row = {"temperature": 100, "pressure": 5, "flowrate": 10, "vibration": 0.3}
+    response = client.post("/predict/batch", json={"instances": [row] * 5, "threshold": 0.8})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 5
+    assert len(data["probabilities"]) == 5
+    assert len(data["alerts"]) == 5
+
+def test_predict_batch_schema():
+    raw = {"xmeas_9": 100, "xmeas_7": 5, "xmeas_10": 10, "xmv_12": 0.3}  # colonnes TEP brutes
+    assert client.post("/predict/batch", json={"instances": [raw]}).status_code == 200
+    bad = {"temperature": 100, "pressure": -5, "flowrate": None, "vibration": 0.3}
+    response = client.post("/predict/batch", json={"instances": [bad, raw]})
+    assert response.status_code == 422
+    assert response.json()["detail"]["report"] == {"pressure": {"below_min": 1}, "flowrate": {"missing": 1}}
+    assert client.post("/predict", json={**bad, "flowrate": 10}).status_code == 422
+
+def test_batching_stats():
+    client.post("/predict", json={"temperature": 100, "pressure": 5, "flowrate": 10, "vibration": 0.3})
+    response = client.get("/stats/batching")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["batch_size"]["count"] >= 1
+    assert "queue_wait_ms" in data
+
+def test_get_process_data_filtered_arrow(tmp_path, monkeypatch):
+    import pandas as pd
+    from src.config import settings
+    from src.processdata import deserialize
+    path = tmp_path / "process.csv"
+    pd.DataFrame({"faultNumber": [1, 1, 2], "sample": [1, 2, 1], "xmeas_7": [1.0, 2.0, 3.0], "detector": [0, 1, 0]}).to_csv(path, index=False)
+    monkeypatch.setattr(settings, "process_data_path", str(path))
+    response = client.get("/get-process-data", params={"fault": 1, "columns": "sample,xmeas_7", "format": "arrow"})
+    assert response.status_code == 200
+    df = deserialize(response.content, response.headers["content-type"])
+    assert list(df.columns) == ["sample", "xmeas_7"]
+    assert df["xmeas_7"].tolist() == [1.0, 2.0]
+    assert client.get("/get-process-data", params={"columns": "nope"}).status_code == 422
+
+def test_gzip_only_for_uncompressed_formats(tmp_path, monkeypatch):
+    import pandas as pd
+    from src.config import settings
+    path = tmp_path / "process.csv"
+    pd.DataFrame({"faultNumber": [1] * 500, "sample": range(500), "xmeas_7": [1.5] * 500}).to_csv(path, index=False)
+    monkeypatch.setattr(settings, "process_data_path", str(path))
+    headers = {"Accept-Encoding": "gzip"}
+    encodings = {fmt: client.get("/get-process-data", params={"format": fmt}, headers=headers).headers.get("content-encoding")
+                 for fmt in ("json", "arrow", "parquet")}
+    # Arrow / Parquet sont déjà compressés par serialize : pas de second passage gzip
+    assert encodings == {"json": "gzip", "arrow": None, "parquet": None}
+
+def test_stream_replay_and_telemetry(tmp_path, monkeypatch):
+    import pandas as pd
+    from src.config import settings
+    from src.telemetry import parse_sse
+    path = tmp_path / "process.csv"
+    pd.DataFrame({"faultNumber": [3] * 4, "sample": [1, 2, 3, 4], "xmeas_7": [1.0] * 4, "xmeas_9": [2.0] * 4,
+                  "xmeas_10": [3.0] * 4, "detector": [0] * 4, "faults_pred": [3] * 4}).to_csv(path, index=False)
+    monkeypatch.setattr(settings, "process_data_path", str(path))
+    with TestClient(app) as c:
+        assert c.post("/stream/replay", params={"fault": 3, "speed": 0}).json()["samples"] == 4
+        with c.stream("GET", "/stream/telemetry", params={"fault": 3}, headers={"Last-Event-ID": "0"}) as response:
+            events = list(parse_sse(response.iter_lines()))
+    assert [e for e, _, _ in events] == ["sample"] * 3 + ["end"]
+    assert c.get("/stream/telemetry", params={"fault": 3}, headers={"Last-Event-ID": "abc"}).status_code == 422
+
+def test_new_replay_cancels_previous_producer(tmp_path, monkeypatch):
+    import pandas as pd
+    import src.app as api
+    from src.config import settings
+    from src.telemetry import parse_sse
+    path = tmp_path / "process.csv"
+    pd.DataFrame({"faultNumber": [3] * 4, "sample": [1, 2, 3, 4], "xmeas_7": [1.0] * 4, "xmeas_9": [2.0] * 4,
+                  "xmeas_10": [3.0] * 4, "detector": [1] * 4, "faults_pred": [3] * 4}).to_csv(path, index=False)
+    monkeypatch.setattr(settings, "process_data_path", str(path))
+    with TestClient(app) as c:
+        c.post("/stream/replay", params={"fault": 3, "speed": 0.001})  # 50 s par échantillon : toujours en cours
+        first = api._producers[3]
+        c.post("/stream/replay", params={"fault": 3, "speed": 0})
+        with c.stream("GET", "/stream/telemetry", params={"fault": 3}) as response:
+            events = list(parse_sse(response.iter_lines()))
+        assert first.cancelled() and len(api._producers) <= 1
+    assert [json.loads(d)["sample"] for e, _, d in events if e == "sample"] == [1, 2, 3, 4]
+    # Le flux du détecteur n'a compté que les échantillons du second rejeu
+    assert api.detector.count[api._detector_streams[3]] == 4
+
+def test_stream_scoring_runs_outside_feature_lock(monkeypatch):
+    import src.app as api
+    from src.features import RollingFeatures
+    monkeypatch.setattr(api, "window", RollingFeatures(4, windows=(3,)))
+    pipeline = api.registry.pipeline
+    held = []
+    monkeypatch.setattr(pipeline, "predict_proba_vector", lambda x: held.append(api._feature_lock.locked()) or 0.5)
+    assert api.predict_stream({"temperature": 100, "pressure": 5, "flowrate": 10, "vibration": 0.3}, "s1") == 0.5
+    assert held == [False]
+
+def test_cache_stats():
+    response = client.get("/stats/cache")
+    assert response.status_code == 200
+    assert "enabled" in response.json()
+
+def test_metrics():
+    client.post("/predict", json={"temperature": 100, "pressure": 5, "flowrate": 10, "vibration": 0.3})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'reactor_http_requests_total{method="POST",route="/predict",status="200"}' in response.text
+    assert "reactor_model_load_seconds" in response.text
@@ -0,0 +1,60 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import pytest
+pytest.importorskip("streamlit")  # dépendance du tableau de bord
+from src.apiclient import ApiClient
+from src.processdata import FORMATS, serialize
+
+FRAME = pd.DataFrame({"faultNumber": [1, 1], "sample": [1, 2], "xmeas_7": [0.1, 0.2]})
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    calls = []
+    flaky = 0
+
+    def do_GET(self):
+        Handler.calls.append((self.path, self.client_address[1]))
+        if self.path.startswith("/flaky") and Handler.flaky > 0:
+            Handler.flaky -= 1
+            body, status, ctype = b"busy", 503, "text/plain"
+        elif self.path.startswith("/get-process-data"):
+            body, status, ctype = serialize(FRAME, "arrow"), 200, FORMATS["arrow"]
+        else:
+            body, status, ctype = b'{"status": "ok"}', 200, "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    Handler.calls = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+def test_connections_are_reused(server):
+    client = ApiClient(server)
+    for _ in range(5):
+        assert client.get("/health").json() == {"status": "ok"}
+    assert len({port for _, port in Handler.calls}) == 1
+
+def test_retries_with_backoff(server):
+    Handler.flaky = 2
+    client = ApiClient(server, retries=3, backoff_factor=0.01)
+    assert client.get("/flaky").status_code == 200
+    assert len(Handler.calls) == 3
+
+def test_prefetch_and_concurrent_fetches(server):
+    client = ApiClient(server)
+    client.prefetch_process_data(2, ["faultNumber", "sample", "xmeas_7"]).result()
+    pd.testing.assert_frame_equal(client.fetch_process_data(2, ["faultNumber", "sample", "xmeas_7"]), FRAME)
+    assert len(Handler.calls) == 1  # servi par le préchargement
+    frames = client.fetch_process_data_many([1, 2, 3])
+    assert sorted(frames) == [1, 2, 3] and all(len(f) == 2 for f in frames.values())
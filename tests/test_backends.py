@@ -0,0 +1,64 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+from src.backends import compile_pipeline
+from src.preprocesspredict import PredictionPipeline
+
+rng = np.random.default_rng(0)
+X = rng.normal(loc=[300, 5, 10, 0.3], scale=[20, 1, 2, 0.1], size=(400, 4))
+y = (X[:, 0] + 10 * X[:, 1] + rng.normal(scale=10, size=400) > 350).astype(int)
+X_test = rng.normal(loc=[300, 5, 10, 0.3], scale=[25, 1.5, 3, 0.2], size=(1000, 4))
+
+SCALERS = [None, StandardScaler(), StandardScaler(with_mean=False), MinMaxScaler(), RobustScaler()]
+MODELS = [
+    LogisticRegression(),
+    DecisionTreeClassifier(max_depth=6, random_state=0),
+    RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0),
+    ExtraTreesClassifier(n_estimators=20, random_state=0),
+]
+
+def fit(model, scaler):
+    Xs = scaler.fit(X).transform(X) if scaler is not None else X
+    return model.fit(Xs, y), scaler
+
+@pytest.mark.parametrize("scaler", SCALERS, ids=lambda s: type(s).__name__)
+@pytest.mark.parametrize("model", MODELS, ids=lambda m: type(m).__name__)
+def test_parity_with_sklearn(model, scaler):
+    model, scaler = fit(model, scaler)
+    compiled = compile_pipeline(model, scaler, 4)
+    expected = model.predict_proba(scaler.transform(X_test) if scaler is not None else X_test)[:, 1]
+    np.testing.assert_allclose(compiled.predict_proba_batch(X_test), expected, rtol=1e-9, atol=1e-12)
+    for row, p in zip(X_test[:20], expected[:20]):
+        assert compiled.predict_proba_one(row.tolist()) == pytest.approx(p, rel=1e-9, abs=1e-12)
+
+def test_multiclass_logistic_parity():
+    y3 = np.digitize(X[:, 0], [290, 310])
+    model = LogisticRegression(max_iter=500).fit(StandardScaler().fit_transform(X), y3)
+    scaler = StandardScaler().fit(X)
+    compiled = compile_pipeline(model, scaler, 4)
+    np.testing.assert_allclose(compiled.predict_proba_batch(X_test), model.predict_proba(scaler.transform(X_test))[:, 1], rtol=1e-9)
+
+def test_unsupported_model_falls_back(tmp_path):
+    from sklearn.neighbors import KNeighborsClassifier
+    model, scaler = fit(KNeighborsClassifier(), StandardScaler())
+    assert compile_pipeline(model, scaler, 4) is None
+    joblib.dump(model, tmp_path / "m.pkl")
+    joblib.dump(scaler, tmp_path / "s.pkl")
+    pipeline = PredictionPipeline(tmp_path / "m.pkl", tmp_path / "s.pkl", backend="compiled")
+    assert pipeline.compiled is None
+    assert 0.0 <= pipeline.predict_proba(dict(temperature=300, pressure=5, flowrate=10, vibration=0.3)) <= 1.0
+
+def test_pipeline_compiled_backend_matches_sklearn(tmp_path):
+    model, scaler = fit(RandomForestClassifier(n_estimators=10, random_state=0), StandardScaler())
+    joblib.dump(model, tmp_path / "m.pkl")
+    joblib.dump(scaler, tmp_path / "s.pkl")
+    reference = PredictionPipeline(tmp_path / "m.pkl", tmp_path / "s.pkl")
+    compiled = PredictionPipeline(tmp_path / "m.pkl", tmp_path / "s.pkl", backend="compiled")
+    assert compiled.compiled is not None
+    row = dict(temperature=310, pressure=4.5, flowrate=11, vibration=0.25)
+    assert compiled.predict_proba(row) == pytest.approx(reference.predict_proba(row))
+    np.testing.assert_allclose(compiled.predict_proba_batch(X_test), reference.predict_proba_batch(X_test))
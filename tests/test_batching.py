@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import numpy as np
+from src.batching import MicroBatcher
+
+def test_concurrent_calls_are_coalesced():
+    calls = []
+    def score(rows):
+        calls.append(len(rows))
+        return np.array([r["x"] / 10 for r in rows])
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=5)
+        return await asyncio.gather(*(batcher.submit({"x": i}) for i in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [0.0, 0.1, 0.2, 0.3, 0.4]
+    assert calls == [5]
+
+def test_full_batch_flushes_without_waiting():
+    calls = []
+    def score(rows):
+        calls.append(len(rows))
+        return np.zeros(len(rows))
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=10_000)
+        await asyncio.gather(*(batcher.submit({"x": i}) for i in range(8)))
+
+    asyncio.run(asyncio.wait_for(run(), timeout=1))
+    assert calls == [4, 4]
+
+def test_scoring_runs_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    threads = []
+    def score(rows):
+        threads.append(threading.get_ident())
+        return np.ones(len(rows))
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=2, max_wait_ms=1)
+        return await asyncio.gather(*(batcher.submit({"x": i}) for i in range(3)))
+
+    assert asyncio.run(run()) == [1.0, 1.0, 1.0]
+    assert threads and loop_thread not in threads
+
+def test_scoring_errors_reach_every_caller():
+    def score(rows):
+        raise RuntimeError("model unavailable")
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=1)
+        return await asyncio.gather(*(batcher.submit({"x": i}) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,31 @@
+import pytest
+from src.benchmark import compare, make_process_data, run
+
+TINY = {"repeat": 3, "batch_sizes": (1, 8), "concurrency": (1,), "requests": 10,
+        "dataset_rows": (100,), "replay_rows": 60}
+
+def test_run_emits_results_and_meta():
+    report = run(TINY, suites=("pipeline",))
+    results = report["results"]
+    assert {"pipeline.single_row.sklearn", "pipeline.batch_8.compiled"} <= set(results)
+    assert all(r["p50_ms"] >= 0 for r in results.values())
+    assert report["meta"]["config"]["batch_sizes"] == [1, 8]
+
+def test_replay_suite():
+    pytest.importorskip("plotly")  # dépendance du tableau de bord
+    results = run(TINY, suites=("replay",))["results"]
+    assert "replay.frame.decimation_1" in results
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a": {"p50_ms": 1.0}, "b": {"p50_ms": 1.0, "rps": 100.0}, "gone": {"p50_ms": 1.0}}}
+    current = {"results": {"a": {"p50_ms": 1.1}, "b": {"p50_ms": 0.5, "rps": 50.0}, "new": {"p50_ms": 9.0}}}
+    rows = {(r["name"], r["metric"]): r for r in compare(current, baseline, tolerance=0.2)}
+    assert set(rows) == {("a", "p50_ms"), ("b", "p50_ms"), ("b", "rps")}
+    assert not rows[("a", "p50_ms")]["regression"]
+    assert not rows[("b", "p50_ms")]["regression"]
+    assert rows[("b", "rps")]["regression"]
+
+def test_synthetic_run_shape():
+    df = make_process_data(50)
+    assert len(df) == 50 and df["sample"].iloc[0] == 1
+    assert set(df["faults_pred"].unique()) <= {0.0, 1.0}
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from src.benchmark import make_process_data
+from src.comparison import ScenarioSet, small_multiples, summary
+from src.replay import ReplayEngine
+import pandas as pd
+
+def dataset():
+    # Pannes mélangées dans le désordre : le regroupement ne doit pas dépendre de l'ordre d'arrivée
+    frames = [make_process_data(200, fault=f, seed=f) for f in (3, 1, 2)]
+    return pd.concat(frames, ignore_index=True)
+
+def test_timelines_match_single_replay():
+    df = dataset()
+    scenarios = ScenarioSet(df)
+    assert scenarios.faults == [1, 2, 3]
+    timelines = scenarios.timelines(workers=3)
+    for t in timelines:
+        engine = ReplayEngine(df[df["faultNumber"] == t.fault].reset_index(drop=True), t.fault)
+        assert t.events == engine.events
+        assert t.baseline == engine.baseline
+        assert t.samples == 200
+
+def test_parallel_matches_sequential_and_downsamples():
+    scenarios = ScenarioSet(dataset())
+    parallel = scenarios.timelines([2, 3], workers=2, max_points=50)
+    sequential = scenarios.timelines([2, 3], workers=1, max_points=50)
+    assert [t.fault for t in parallel] == [2, 3]
+    for a, b in zip(parallel, sequential):
+        np.testing.assert_array_equal(a.series["detector"], b.series["detector"])
+        assert len(a.series["detector"]) == 50
+
+def test_small_multiples_share_axes():
+    pytest.importorskip("plotly")
+    timelines = ScenarioSet(dataset()).timelines()
+    fig = small_multiples(timelines, ncols=2)
+    assert len(fig.data) == 3
+    assert fig.layout.xaxis.matches == fig.layout.xaxis2.matches == "x3"
+    assert {s.xref for s in fig.layout.shapes} == {"x", "x2", "x3"}
+    assert list(summary(timelines)["faultNumber"]) == [1, 2, 3]
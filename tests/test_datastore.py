@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.datastore import ProcessDataStore, open_store
+from src.processdata import filter_process_data
+
+@pytest.fixture
+def df():
+    rows = [{"faultNumber": f, "simulationRun": r, "sample": s, "xmeas_7": f * 100 + r * 10 + s}
+            for f in (2, 1) for r in (2, 1) for s in range(1, 6)]
+    return pd.DataFrame(rows)
+
+def test_select_matches_dataframe_filter(df, tmp_path):
+    store = ProcessDataStore.build(df, tmp_path)
+    for query in [dict(fault=1), dict(fault=2, run=1), dict(fault=1, start=2, stop=4), dict(run=2, start=5)]:
+        expected = filter_process_data(df.sort_values(["faultNumber", "simulationRun", "sample"]), **query)
+        pd.testing.assert_frame_equal(store.frame(**query), expected, check_dtype=False)
+
+def test_contiguous_slice_is_memmap_view(df, tmp_path):
+    ProcessDataStore.build(df, tmp_path)
+    store = open_store(str(tmp_path))
+    out = store.select(fault=1, run=2, start=2, stop=4, columns=["xmeas_7"])
+    assert isinstance(out["xmeas_7"], np.memmap)
+    assert out["xmeas_7"].tolist() == [122, 123]
+    assert store.partitions[(1, 2)] == (5, 5)
+
+def test_open_store_missing(tmp_path):
+    assert open_store(str(tmp_path / "absent")) is None
+
+def test_open_store_after_build(df, tmp_path):
+    # Un store construit après un premier appel manqué est bien ouvert (pas de None en cache)
+    assert open_store(str(tmp_path)) is None
+    ProcessDataStore.build(df, tmp_path)
+    store = open_store(str(tmp_path))
+    assert store is not None and open_store(str(tmp_path)) is store
+
+def test_rebuild_swaps_in_new_version(df, tmp_path):
+    ProcessDataStore.build(df, tmp_path)
+    old = open_store(str(tmp_path))
+    view = old.select(fault=1, run=1, columns=["xmeas_7"])["xmeas_7"]
+    ProcessDataStore.build(df.assign(xmeas_7=-df["xmeas_7"]), tmp_path)
+    # Vue mappée de l'ancienne version intacte ; la nouvelle est ouverte au prochain appel
+    assert view.tolist() == [111, 112, 113, 114, 115]
+    new = open_store(str(tmp_path))
+    assert new is not old and new.select(fault=1, run=1, columns=["xmeas_7"])["xmeas_7"].tolist() == [-111, -112, -113, -114, -115]
+    assert len(list(tmp_path.glob("data-*"))) == 1
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from src.evaluation import evaluate, evaluate_frame
+from src.replay import ReplayEngine
+
+def make_dataset(seed=0, n=40):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for fault in (1, 2, 3):
+        for run in (1, 2):
+            frames.append(pd.DataFrame({
+                "faultNumber": fault, "simulationRun": run, "sample": np.arange(n),
+                "detector": rng.random(n), "faults_pred": rng.choice([0, fault, 7], size=n),
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+def test_delays_match_replay_engine():
+    df = make_dataset()
+    report = evaluate_frame(df).set_index("faultNumber")
+    for fault, group in df.groupby("faultNumber"):
+        delays = [ReplayEngine(run, fault).events for _, run in group.groupby("simulationRun")]
+        det = [e.detection_delay for e in delays if e.detection_delay is not None]
+        diag = [e.diagnosis_delay for e in delays if e.diagnosis_delay is not None]
+        assert report.loc[fault, "runs"] == 2
+        assert np.isclose(report.loc[fault, "detection_delay"], np.mean(det))
+        assert np.isclose(report.loc[fault, "diagnosis_delay"], np.mean(diag))
+
+def test_perfect_predictions_score_one():
+    df = make_dataset()
+    df["faults_pred"] = np.where(df["sample"] * 3 > 60, df["faultNumber"], 0)
+    report = evaluate_frame(df)
+    assert np.allclose(report["f1"], 1.0)
+    assert np.allclose(report["accuracy"], 1.0)
+
+def test_parallel_matches_serial():
+    df = make_dataset(seed=1)
+    pd.testing.assert_frame_equal(evaluate(df, workers=2), evaluate(df))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.benchmark import make_process_data
+from src.features import RollingFeatures, frame_features
+from src.schema import FeatureSchema, Feature
+
+rng = np.random.default_rng(0)
+X = rng.normal([2705, 120.4, 0.34], [5, 0.05, 0.01], size=(300, 3)) + np.linspace(0, 10, 300)[:, None]
+STARTS = np.isin(np.arange(300), [0, 137, 200])
+
+def online(features, X, starts):
+    rows = []
+    for x, first in zip(X, starts):
+        state = features.state() if first else state
+        rows.append(features.update(state, x))
+    return np.array(rows)
+
+def test_online_matches_offline_across_runs():
+    features = RollingFeatures(3, windows=(1, 5, 20), ewma_alphas=(0.1, 0.5))
+    offline = features.transform(X, STARTS)
+    assert offline.shape == (300, features.n_outputs) == (300, len(features.feature_names(["p", "t", "f"])))
+    np.testing.assert_allclose(online(features, X, STARTS), offline, rtol=1e-9, atol=1e-9)
+
+def test_matches_pandas_rolling_within_each_run():
+    features = RollingFeatures(3, windows=(5, 20), ewma_alphas=(0.1,))
+    out = pd.DataFrame(features.transform(X, STARTS), columns=features.feature_names(list("abc")))
+    for run in np.unique(np.cumsum(STARTS)):
+        rows = np.cumsum(STARTS) == run
+        raw = pd.DataFrame(X[rows], columns=list("abc"))
+        part = out[rows].reset_index(drop=True)
+        np.testing.assert_allclose(part[["a_mean_20", "b_mean_20", "c_mean_20"]], raw.rolling(20, min_periods=1).mean())
+        np.testing.assert_allclose(part[["a_var_5", "b_var_5", "c_var_5"]], raw.rolling(5, min_periods=1).var(ddof=0), atol=1e-8)
+        np.testing.assert_allclose(part[["a_ewma_0.1", "b_ewma_0.1", "c_ewma_0.1"]], raw.ewm(alpha=0.1, adjust=False).mean())
+        slope = raw["a"].rolling(5, min_periods=2).apply(lambda v: np.polyfit(np.arange(len(v)), v, 1)[0], raw=True)
+        np.testing.assert_allclose(part["a_slope_5"], slope.fillna(0.0), atol=1e-9)
+
+def test_state_size_does_not_grow():
+    features = RollingFeatures(3, windows=(5, 20))
+    state = features.state()
+    for x in X:
+        features.update(state, x)
+    assert len(state.ring) == 20 and state.count == len(X)
+
+def test_frame_features_restart_per_run():
+    frame = pd.concat([make_process_data(50, fault=1, seed=1), make_process_data(50, fault=2, seed=2)], ignore_index=True)
+    schema = FeatureSchema([Feature("pressure", "xmeas_7"), Feature("temperature", "xmeas_9")])
+    features = RollingFeatures(2, windows=(10,), ewma_alphas=())
+    F, names = frame_features(frame, features, schema)
+    assert F.shape == (100, 8) and names[2] == "pressure_mean_10"
+    # Premier échantillon du second run : fenêtre réduite à lui-même
+    assert F[50, 2] == frame["xmeas_7"][50] and F[50, 4] == 0.0
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        RollingFeatures(3, windows=(0,))
+    with pytest.raises(ValueError):
+        RollingFeatures(3, ewma_alphas=(1.5,))
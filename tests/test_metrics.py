@@ -0,0 +1,31 @@
+import pytest
+from src.metrics import Histogram, MetricsRegistry, histogram_quantile, parse_metrics
+
+def test_histogram_snapshot_is_cumulative():
+    h = Histogram([1, 5, 10])
+    for v in (0.5, 3, 3, 7, 50):
+        h.observe(v)
+    snap = h.snapshot()
+    assert snap["buckets"] == {"1": 1, "5": 3, "10": 4, "+Inf": 5}
+    assert snap["count"] == 5 and snap["sum"] == pytest.approx(63.5)
+
+def test_render_and_parse_roundtrip():
+    metrics = MetricsRegistry()
+    requests = metrics.counter("reqs_total", "Requests.", ["route", "status"])
+    requests.labels("/predict", 200).inc()
+    requests.labels("/predict", 200).inc()
+    metrics.gauge("queue", "Queue length.").set_function(lambda: 7)
+    latency = metrics.histogram("lat_seconds", "Latency.", ["stage"], buckets=(0.01, 0.1))
+    with latency.time("model"):
+        pass
+    samples = parse_metrics(metrics.render())
+    assert samples["reqs_total"] == [({"route": "/predict", "status": "200"}, 2.0)]
+    assert samples["queue"] == [({}, 7.0)]
+    assert samples["lat_seconds_count"] == [({"stage": "model"}, 1.0)]
+    assert {labels["le"] for labels, _ in samples["lat_seconds_bucket"]} == {"0.01", "0.1", "+Inf"}
+
+def test_histogram_quantile_interpolates():
+    buckets = {"0.1": 50, "0.2": 100, "+Inf": 100}
+    assert histogram_quantile(0.5, buckets) == pytest.approx(0.1)
+    assert histogram_quantile(0.75, buckets) == pytest.approx(0.15)
+    assert histogram_quantile(0.99, {"0.1": 0, "+Inf": 10}) == pytest.approx(0.1)
@@ -11,3 +11,46 @@ def test_predict_no_model():
     result = pipeline.predict_with_alert({"temperature":100,"pressure":5,"flowrate":10,"vibration":0.3})
     assert result["probability"] == 0.0
     assert result["alert"] == False
+
+def test_predict_batch_no_model():
+    pipeline = PredictionPipeline()
+    rows = [{"temperature":100,"pressure":5,"flowrate":10,"vibration":0.3}] * 3
+    result = pipeline.predict_with_alert_batch(rows)
+    assert result["probabilities"].shape == (3,)
+    assert not result["alerts"].any()
+
+def test_predict_batch_missing_feature():
+    pipeline = PredictionPipeline()
+    with pytest.raises(ValueError):
+        pipeline.predict_proba_batch([{"temperature":100,"pressure":5,"flowrate":10}])
+
+def test_stage_timer_hook():
+    from contextlib import nullcontext
+    stages = []
+    pipeline = PredictionPipeline(timer=lambda stage: stages.append(stage) or nullcontext())
+    pipeline.predict_proba_batch([{"temperature":100,"pressure":5,"flowrate":10,"vibration":0.3}])
+    assert stages == ["validation"]
+
+@pytest.mark.parametrize("backend", ["sklearn", "compiled"])
+def test_rolling_features_online_matches_batch(tmp_path, backend):
+    import joblib
+    import numpy as np
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+    from src.benchmark import synthetic_features
+    from src.features import RollingFeatures
+    from src.preprocesspredict import FEATURES_ORDER
+    window = RollingFeatures(len(FEATURES_ORDER), windows=(3, 10), ewma_alphas=(0.3,))
+    X, y = synthetic_features(200)
+    F = window.transform(X)
+    scaler = StandardScaler().fit(F)
+    joblib.dump(LogisticRegression().fit(scaler.transform(F), y), tmp_path / "m.pkl")
+    joblib.dump(scaler, tmp_path / "s.pkl")
+    pipeline = PredictionPipeline(tmp_path / "m.pkl", tmp_path / "s.pkl", backend=backend, window=window)
+    state = window.state()
+    online = [pipeline.predict_proba(dict(zip(FEATURES_ORDER, x)), state=state) for x in X[:30]]
+    np.testing.assert_allclose(online, pipeline.predict_proba_batch(X[:30]), rtol=1e-7)
+    # Même résultat en deux temps (état mis à jour, puis inférence), comme /predict sous le verrou des flux
+    state = window.state()
+    split = [pipeline.predict_proba_vector(pipeline.vector(dict(zip(FEATURES_ORDER, x)), state)) for x in X[:30]]
+    np.testing.assert_allclose(split, online)
@@ -0,0 +1,20 @@
+import time
+from src.predcache import PredictionCache
+
+def test_quantized_keys_share_entry():
+    cache = PredictionCache(precision=2)
+    cache.put(cache.key("v1", [100.001, 5.0, 10.0, 0.3]), 0.42)
+    assert cache.get(cache.key("v1", [100.004, 5.0, 10.0, 0.3])) == 0.42
+    assert cache.get(cache.key("v2", [100.001, 5.0, 10.0, 0.3])) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_lru_eviction_and_ttl():
+    cache = PredictionCache(maxsize=2, ttl_s=0.05)
+    for i in range(3):
+        cache.put(("m", i), float(i))
+    assert cache.get(("m", 0)) is None
+    assert cache.get(("m", 2)) == 2.0
+    assert cache.stats()["evictions"] == 1
+    time.sleep(0.06)
+    assert cache.get(("m", 2)) is None
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+from src.processdata import filter_process_data, negotiate_format, serialize, deserialize, FORMATS
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "faultNumber": [1, 1, 1, 2], "simulationRun": [1, 1, 2, 1],
+        "sample": [1, 2, 1, 1], "xmeas_7": [0.1, 0.2, 0.3, 0.4],
+    })
+
+def test_filter_by_fault_run_and_range(df):
+    out = filter_process_data(df, fault=1, run=1, start=2, columns=["sample", "xmeas_7"])
+    assert out.to_dict("records") == [{"sample": 2, "xmeas_7": 0.2}]
+
+def test_negotiate_format():
+    assert negotiate_format(None, None) == "json"
+    assert negotiate_format(None, FORMATS["arrow"]) == "arrow"
+    assert negotiate_format("parquet", FORMATS["arrow"]) == "parquet"
+
+@pytest.mark.parametrize("fmt", ["json", "arrow", "parquet"])
+def test_serialize_roundtrip(df, fmt):
+    out = deserialize(serialize(df, fmt), FORMATS[fmt])
+    pd.testing.assert_frame_equal(out, df, check_dtype=False)
@@ -0,0 +1,83 @@
+import os
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from src.registry import ModelRegistry
+
+def save_version(root, name, seed):
+    rng = np.random.default_rng(seed)
+    X, y = rng.normal(size=(50, 4)), rng.integers(0, 2, 50)
+    scaler = StandardScaler().fit(X)
+    (root / name).mkdir(parents=True)
+    joblib.dump(LogisticRegression().fit(scaler.transform(X), y), root / name / "bestmodel.pkl")
+    joblib.dump(scaler, root / name / "preprocessor.pkl")
+
+def test_default_version_without_artifacts(tmp_path):
+    registry = ModelRegistry(tmp_path, tmp_path / "none.pkl", tmp_path / "none.pkl")
+    info = registry.load()
+    assert info["model_version"] == "default"
+    assert registry.pipeline.model is None
+
+def test_latest_version_then_active_pointer(tmp_path):
+    save_version(tmp_path, "v1", 0)
+    save_version(tmp_path, "v2", 1)
+    registry = ModelRegistry(tmp_path)
+    assert registry.load()["model_version"] == "v2"
+    assert registry.pipeline.model is not None
+    (tmp_path / "ACTIVE").write_text("v1")
+    assert registry.check_for_update()
+    assert registry.version == "v1"
+    assert not registry.check_for_update()
+    with pytest.raises(ValueError):
+        registry.load("v9")
+
+def test_hot_swap_on_file_change_and_cache(tmp_path):
+    save_version(tmp_path, "v1", 0)
+    registry = ModelRegistry(tmp_path)
+    registry.load()
+    first = registry.pipeline
+    registry.load("v1")
+    assert registry.pipeline is first  # version déjà chargée : pas de nouvel unpickle
+    model = tmp_path / "v1" / "bestmodel.pkl"
+    os.utime(model, ns=(model.stat().st_atime_ns, model.stat().st_mtime_ns + 10**9))
+    assert registry.check_for_update()
+    assert registry.pipeline is not first
+
+def test_reload_listeners_called(tmp_path):
+    save_version(tmp_path, "v1", 0)
+    registry = ModelRegistry(tmp_path)
+    seen = []
+    registry.on_reload(lambda r: seen.append(r.version))
+    registry.load()
+    assert seen == ["v1"]
+
+def test_warm_up_respects_schema_ranges(tmp_path):
+    from src.schema import DEFAULT_FEATURES, FeatureSchema
+    from dataclasses import replace
+    save_version(tmp_path, "v1", 0)
+    # Plages strictement positives : des lignes de zéros seraient rejetées
+    schema = FeatureSchema([replace(f, min=50.0) if f.name == "temperature" else f for f in DEFAULT_FEATURES])
+    registry = ModelRegistry(tmp_path, schema=schema)
+    assert registry.load()["model_load_error"] is None
+
+def test_load_failure_is_recorded(tmp_path):
+    save_version(tmp_path, "v1", 0)
+    (tmp_path / "v1" / "bestmodel.pkl").write_bytes(b"not a pickle")
+    registry = ModelRegistry(tmp_path)
+    with pytest.raises(Exception):
+        registry.ensure_loaded()
+    assert not registry.ready
+    assert registry.load_error and registry.info()["model_load_error"] == registry.load_error
+
+def test_admin_choice_survives_watcher(tmp_path):
+    save_version(tmp_path, "v1", 0)
+    save_version(tmp_path, "v2", 1)
+    registry = ModelRegistry(tmp_path)
+    registry.load()
+    registry.load("v1", pin=True)  # /admin/reload?version=v1
+    assert not registry.check_for_update()
+    assert registry.version == "v1" and registry.info()["model_pinned"] == "v1"
+    registry.load(pin=True)  # /admin/reload sans version : le watcher suit de nouveau la plus récente
+    assert registry.version == "v2" and registry.pinned is None
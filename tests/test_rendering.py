@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+go = pytest.importorskip("plotly.graph_objects")  # dépendance du tableau de bord
+from src.rendering import FrameThrottle, LiveFigure, SeriesBuffer, lttb
+
+
+def test_lttb_keeps_endpoints_and_size():
+    x = np.linspace(0, 10, 5000)
+    y = np.sin(x)
+    y[2500] = 5.0  # pic isolé : doit survivre au sous-échantillonnage
+    dx, dy = lttb(x, y, 200)
+    assert len(dx) == len(dy) == 200
+    assert dx[0] == x[0] and dx[-1] == x[-1]
+    assert np.all(np.diff(dx) > 0)
+    assert dy.max() == 5.0
+
+
+def test_lttb_short_series_unchanged():
+    x, y = np.arange(10.0), np.arange(10.0)
+    dx, dy = lttb(x, y, 100)
+    assert dx is x and dy is y
+
+
+def test_series_buffer_grows():
+    buf = SeriesBuffer(capacity=4)
+    for i in range(10):
+        buf.extend([i, i + 0.5], [2 * i, 2 * i + 1])
+    assert buf.size == 20
+    assert buf.x[-1] == 9.5 and buf.y[-1] == 19
+
+
+def test_live_figure_payload_is_bounded():
+    live = LiveFigure(go.Figure(go.Scatter(x=[], y=[])), max_points=100)
+    for start in range(0, 10000, 10):
+        t = np.arange(start, start + 10, dtype=float)
+        live.extend(t, np.cos(t))
+    assert live.dirty
+    fig = live.render()
+    assert not live.dirty
+    assert len(fig.data[0].x) == 100
+    assert fig.data[0].x[-1] == 9999
+
+
+def test_frame_throttle():
+    throttle = FrameThrottle(fps=1)
+    assert throttle.ready()
+    assert not throttle.ready()
+    assert throttle.ready(force=True)
+    assert throttle.frames == 2
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from src.replay import ReplayEngine, StreamingReplay, detect_events, INJECTION_TIME_MIN, PERSISTENCE_LIMIT, TIME_STEP_MINUTES
+
+def reference_events(minutes, detector, diagnosis, fault_code):
+    """Per-row state machine as it used to run in app.py."""
+    anomaly, diag, count = None, None, 0
+    for m, det, pred in zip(minutes, detector, diagnosis):
+        if m > INJECTION_TIME_MIN:
+            if anomaly is None and det > 0.5:
+                anomaly = m
+            if diag is None:
+                count = count + 1 if round(pred) == fault_code else 0
+                if count >= PERSISTENCE_LIMIT:
+                    diag = m
+    return anomaly, diag
+
+def test_detect_events_matches_row_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n = 60
+        minutes = np.arange(n) * TIME_STEP_MINUTES
+        detector = rng.random(n)
+        diagnosis = rng.choice([0, 3, 3.4, 5], size=n)
+        events = detect_events(minutes, detector, diagnosis, 3)
+        assert (events.anomaly_time_min, events.diagnosis_time_min) == reference_events(minutes, detector, diagnosis, 3)
+
+def test_engine_chunks_cover_run_with_decimation():
+    frame = pd.DataFrame({"sample": np.arange(25), "xmeas_7": np.arange(25.0)})
+    engine = ReplayEngine(frame, fault_code=1, chunk_size=10, decimation=3)
+    chunks = list(engine.chunks())
+    assert [(c.start, c.stop) for c in chunks] == [(0, 10), (10, 20), (20, 25)]
+    assert np.concatenate([c.pressure for c in chunks]).tolist() == list(np.arange(0, 25, 3.0))
+    assert engine.baseline["p"] == 2.0
+    assert engine.events.anomaly_index is None
+
+def test_streaming_replay_matches_engine():
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({"sample": np.arange(60), "xmeas_7": rng.random(60), "detector": rng.random(60),
+                          "faults_pred": rng.choice([0, 2], size=60)})
+    engine = ReplayEngine(frame, fault_code=2, chunk_size=7, decimation=2)
+    live = StreamingReplay(fault_code=2, decimation=2)
+    live_chunks = [live.push(frame.iloc[i:i + 7]) for i in range(0, 60, 7)]
+    for a, b in zip(engine.chunks(), live_chunks):
+        assert (a.start, a.stop) == (b.start, b.stop)
+        assert np.array_equal(a.pressure, b.pressure)
+        assert a.current == b.current
+    assert live.events == engine.events
+    assert live.baseline == engine.baseline
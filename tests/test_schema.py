@@ -0,0 +1,42 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.schema import DEFAULT_SCHEMA, Feature, FeatureSchema, SchemaError, load_schema
+
+SCHEMA = FeatureSchema([Feature("t", "xmeas_9", min=0, max=200, default=120.0), Feature("p", "xmeas_7", min=0, default=2700.0)])
+
+def test_sources_and_names_map_to_the_same_matrix():
+    rows = [{"t": 120.0, "p": 2700.0}, {"t": 121.0, "p": 2701.0}]
+    raw = [{"xmeas_9": r["t"], "xmeas_7": r["p"], "xmeas_1": 0.2} for r in rows]
+    expected = np.array([[120.0, 2700.0], [121.0, 2701.0]])
+    np.testing.assert_array_equal(SCHEMA.transform(rows), expected)
+    np.testing.assert_array_equal(SCHEMA.transform(raw), expected)
+    np.testing.assert_array_equal(SCHEMA.transform(pd.DataFrame(raw)), expected)
+    # Clés hétérogènes d'une ligne à l'autre
+    np.testing.assert_array_equal(SCHEMA.transform([rows[0], raw[1]]), expected)
+
+def test_reject_reports_every_problem_at_once():
+    rows = [{"t": np.nan, "p": -1.0}, {"t": 250.0, "p": np.inf}, {"p": 2700.0}]
+    with pytest.raises(SchemaError) as err:
+        SCHEMA.transform(rows)
+    assert err.value.report == {"t": {"missing": 2, "above_max": 1}, "p": {"non_finite": 1, "below_min": 1}}
+    with pytest.raises(SchemaError):
+        SCHEMA.transform([{"t": "hot", "p": 1.0}])
+    with pytest.raises(SchemaError):
+        SCHEMA.row({"t": 120.0})
+
+def test_impute_default_and_ffill():
+    X = np.array([[np.nan, 2700.0], [121.0, -1.0], [np.nan, 2702.0]])
+    np.testing.assert_array_equal(SCHEMA.subset(["t", "p"], on_invalid="impute").transform(X),
+                                  [[120.0, 2700.0], [121.0, 2700.0], [120.0, 2702.0]])
+    np.testing.assert_array_equal(SCHEMA.subset(["t", "p"], on_invalid="impute", impute="ffill").transform(X),
+                                  [[120.0, 2700.0], [121.0, 2700.0], [121.0, 2702.0]])
+    assert SCHEMA.subset(["p"], on_invalid="impute").row({}) == [2700.0]
+
+def test_load_schema_from_json(tmp_path):
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(SCHEMA.to_dict()))
+    schema = load_schema(str(path), on_invalid="impute")
+    assert schema.names == ["t", "p"] and schema.on_invalid == "impute"
+    assert load_schema().names == DEFAULT_SCHEMA.names
@@ -0,0 +1,62 @@
+import asyncio
+from contextlib import nullcontext
+import numpy as np
+from src.benchmark import make_model, synthetic_features
+from src.preprocesspredict import PredictionPipeline
+from src.scoring import START_METHOD, ScoringPool
+
+def test_offloaded_scores_match_inline(tmp_path):
+    pipeline = PredictionPipeline(*make_model(tmp_path, kind="forest"))
+    X, _ = synthetic_features(300, seed=4)
+    pool = ScoringPool(workers=1, min_batch=100)
+    try:
+        small = asyncio.run(pool.predict_proba_batch(pipeline, X[:10]))
+        large = asyncio.run(pool.predict_proba_batch(pipeline, X))
+    finally:
+        pool.shutdown()
+    np.testing.assert_allclose(small, pipeline.predict_proba_batch(X[:10]))
+    np.testing.assert_allclose(large, pipeline.predict_proba_batch(X))
+    assert pool.stats()["inline"] == 1 and pool.stats()["offloaded"] == 1
+
+def test_pool_follows_reloaded_pipeline(tmp_path):
+    first = PredictionPipeline(*make_model(tmp_path / "a", kind="logistic"))
+    second = PredictionPipeline(*make_model(tmp_path / "b", kind="forest"))
+    X, _ = synthetic_features(50, seed=5)
+    pool = ScoringPool(workers=1, min_batch=1)
+    try:
+        asyncio.run(pool.predict_proba_batch(first, X))
+        out = asyncio.run(pool.predict_proba_batch(second, X))
+    finally:
+        pool.shutdown()
+    np.testing.assert_allclose(out, second.predict_proba_batch(X))
+
+def test_pool_reloads_pipeline_without_fork(tmp_path):
+    # Le chronomètre (fermeture, non sérialisable) reste dans le worker ; le pool recharge les artefacts
+    stages = []
+    pipeline = PredictionPipeline(*make_model(tmp_path, kind="forest"), timer=lambda stage: stages.append(stage) or nullcontext())
+    X, _ = synthetic_features(50, seed=6)
+    pool = ScoringPool(workers=1, min_batch=1)
+    try:
+        out = asyncio.run(pool.predict_proba_batch(pipeline, X))
+    finally:
+        pool.shutdown()
+    assert START_METHOD != "fork"
+    np.testing.assert_allclose(out, pipeline.predict_proba_batch(X))
+
+def test_reload_lets_queued_batches_finish(tmp_path):
+    first = PredictionPipeline(*make_model(tmp_path / "a", kind="logistic"))
+    second = PredictionPipeline(*make_model(tmp_path / "b", kind="forest"))
+    X, _ = synthetic_features(50, seed=7)
+    pool = ScoringPool(workers=1, min_batch=1)
+
+    async def run():
+        # Lots de l'ancien pipeline encore en file quand le premier lot du nouveau recrée le pool
+        return await asyncio.gather(*(pool.predict_proba_batch(first, X) for _ in range(4)),
+                                    pool.predict_proba_batch(second, X))
+    try:
+        *old, new = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    for out in old:
+        np.testing.assert_allclose(out, first.predict_proba_batch(X))
+    np.testing.assert_allclose(new, second.predict_proba_batch(X))
@@ -0,0 +1,60 @@
+import os
+import signal
+import subprocess
+import sys
+import httpx
+from src.benchmark import _free_port, _wait_ready
+
+def test_prefork_serves_and_stops():
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "MODEL_WATCH_INTERVAL_S": "0"}
+    proc = subprocess.Popen([sys.executable, "-m", "src.serve", "--workers", "2", "--host", "127.0.0.1",
+                             "--port", str(port), "--log-level", "warning"], env=env)
+    try:
+        _wait_ready(url, timeout=30)
+        pids = {httpx.get(f"{url}/health").json()["worker_pid"] for _ in range(10)}
+        assert pids and proc.pid not in pids
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=30) == 0
+
+def test_rolling_features_force_single_worker(monkeypatch):
+    from src.config import settings
+    from src.serve import serving_workers
+    assert serving_workers(4) == 4
+    monkeypatch.setattr(settings, "rolling_windows", [5, 20])
+    assert serving_workers(4) == 1
+
+def test_crash_loop_stops_master():
+    # Un worker qui plante à chaque démarrage : traceback journalisée, relances espacées puis arrêt en erreur
+    code = ("import socket, time\n"
+            "from src.serve import PreforkServer\n"
+            "class Broken(PreforkServer):\n"
+            "    def _serve(self):\n"
+            "        raise RuntimeError('model file unreadable')\n"
+            "server = Broken(None, socket.socket(), workers=1, respawn_delay=0.05, max_crashes=3)\n"
+            "start = time.monotonic()\n"
+            "code = server.run()\n"
+            "print(code, len(server.crashes), round(time.monotonic() - start, 2))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=30)
+    exit_code, crashes, elapsed = out.stdout.split()
+    assert (exit_code, crashes) == ("1", "4")
+    assert float(elapsed) >= 0.05 + 0.1 + 0.2  # délais doublés entre les relances
+    assert out.stderr.count("RuntimeError: model file unreadable") == 4
+
+def test_respawn_backoff_is_capped_and_forgets_old_crashes():
+    from src.serve import RESPAWN_MAX_DELAY_S, PreforkServer
+    server = PreforkServer(None, None, workers=1, respawn_delay=1, max_crashes=100, crash_window=60)
+    delays = [server.respawn_delay_after_crash(t) for t in range(10)]
+    assert delays[:3] == [1, 2, 4] and delays[-1] == RESPAWN_MAX_DELAY_S
+    assert server.respawn_delay_after_crash(1000) == 1
+
+def test_single_worker_by_default(monkeypatch, caplog):
+    # Télémétrie, cache et /metrics vivent dans chaque worker : un seul par défaut, avertissement au-delà
+    from src.config import Settings
+    from src.serve import serving_workers
+    monkeypatch.delenv("WORKERS", raising=False)
+    assert Settings().workers == 1
+    assert serving_workers(3) == 3
+    assert "per worker" in caplog.text
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import time
+from src.benchmark import make_model
+from src.preprocesspredict import PredictionPipeline
+
+HEAVY = ("pandas", "sklearn", "joblib", "streamlit", "plotly")
+# Budgets larges (machines de CI partagées) : ~0.7 s d'import et ~2.5 s jusqu'à la première prédiction mesurés ici
+IMPORT_BUDGET_S = 2.0
+FIRST_PREDICTION_BUDGET_S = 5.0
+COLD_START_BUDGET_S = 8.0
+
+def run_python(code, env=None):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         env={**os.environ, **(env or {})})
+    return out.stdout.strip()
+
+def test_app_import_is_light():
+    loaded = run_python(f"import sys, src.app; print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+    assert loaded == ""
+
+def test_snapshot_skips_sklearn(tmp_path):
+    model_path, scaler_path = make_model(tmp_path)
+    snapshots = tmp_path / "snapshots"
+    first = PredictionPipeline(model_path, scaler_path, backend="compiled", snapshot_dir=snapshots)
+    assert first.compiled is not None and len(list(snapshots.iterdir())) == 1
+    code = (f"import sys; from src.preprocesspredict import PredictionPipeline\n"
+            f"p = PredictionPipeline({str(model_path)!r}, {str(scaler_path)!r}, backend='compiled', snapshot_dir={str(snapshots)!r})\n"
+            f"print(p.predict_proba(dict(temperature=300, pressure=5, flowrate=10, vibration=0.3)), 'sklearn' in sys.modules)")
+    proba, sklearn_loaded = run_python(code).split()
+    assert sklearn_loaded == "False"
+    assert float(proba) == first.predict_proba(dict(temperature=300, pressure=5, flowrate=10, vibration=0.3))
+
+def model_env(tmp_path):
+    model_path, scaler_path = make_model(tmp_path / "models")
+    return {"MODEL_PATH": str(model_path), "SCALER_PATH": str(scaler_path), "MODEL_REGISTRY_DIR": str(model_path.parent),
+            "MODEL_WATCH_INTERVAL_S": "0"}
+
+def test_cold_start_budget(tmp_path):
+    # Démarrage à froid mesuré de bout en bout : interpréteur, import de l'API, chargement du modèle, première prédiction
+    code = ("import time; start = time.perf_counter()\n"
+            "import src.app\n"
+            "imported = time.perf_counter() - start\n"
+            "from fastapi.testclient import TestClient\n"
+            "with TestClient(src.app.app) as client:\n"
+            "    r = client.post('/predict', json=dict(temperature=300, pressure=5, flowrate=10, vibration=0.3))\n"
+            "    assert r.status_code == 200 and 0 < r.json()['probability'] < 1\n"
+            "print(imported, time.perf_counter() - start)")
+    start = time.perf_counter()
+    imported, first_prediction = map(float, run_python(code, model_env(tmp_path)).split())
+    total = time.perf_counter() - start
+    assert imported < IMPORT_BUDGET_S
+    assert first_prediction < FIRST_PREDICTION_BUDGET_S
+    assert total < COLD_START_BUDGET_S
+
+def test_readiness_follows_background_load(tmp_path):
+    # Le chargement lancé par le lifespan est bloqué jusqu'au feu vert : /health/ready doit passer de 503 à 200
+    code = ("import threading, time\n"
+            "import src.app as api\n"
+            "from fastapi.testclient import TestClient\n"
+            "gate = threading.Event()\n"
+            "load = api.registry.load\n"
+            "api.registry.load = lambda *a, **k: gate.wait(10) and load(*a, **k)\n"
+            "with TestClient(api.app) as client:\n"
+            "    before = client.get('/health/ready').status_code\n"
+            "    live = client.get('/health/live').status_code\n"
+            "    gate.set()\n"
+            "    deadline = time.monotonic() + 10\n"
+            "    while client.get('/health/ready').status_code != 200 and time.monotonic() < deadline:\n"
+            "        time.sleep(0.02)\n"
+            "    after = client.get('/health/ready').json()['status']\n"
+            "print(before, live, after)")
+    assert run_python(code, model_env(tmp_path)).split() == ["503", "200", "ready"]
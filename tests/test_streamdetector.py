@@ -0,0 +1,42 @@
+import numpy as np
+from src.replay import detect_events, TIME_STEP_MINUTES
+from src.streamdetector import StreamDetector
+
+def test_interleaved_streams_match_offline_events():
+    rng = np.random.default_rng(0)
+    n_streams, n = 50, 40
+    detector = StreamDetector(capacity=4)
+    ids = [detector.add_stream(target=3) for _ in range(n_streams)]
+    det = rng.random((n_streams, n))
+    diag = rng.choice([0, 3, 5], size=(n_streams, n))
+    # Échantillons entrelacés, plusieurs par flux dans chaque lot
+    streams = np.repeat(ids, n).reshape(n_streams, n).T.ravel()
+    samples = np.tile(np.arange(n), (n_streams, 1)).T.ravel()
+    for lo in range(0, len(streams), 128):
+        sl = slice(lo, lo + 128)
+        detector.update(streams[sl], samples[sl], np.ones((len(streams[sl]), 3)),
+                        det.T.ravel()[sl], diag.T.ravel()[sl])
+    for s in ids:
+        expected = detect_events(np.arange(n) * TIME_STEP_MINUTES, det[s], diag[s], 3)
+        got_alert = detector.alert_sample[s] * TIME_STEP_MINUTES if detector.alert_sample[s] >= 0 else None
+        got_diag = detector.diag_sample[s] * TIME_STEP_MINUTES if detector.diag_sample[s] >= 0 else None
+        assert (got_alert, got_diag) == (expected.anomaly_time_min, expected.diagnosis_time_min)
+
+def test_events_and_sensor_deviation():
+    detector = StreamDetector()
+    s = detector.add_stream()
+    sensors = np.ones((30, 3))
+    sensors[25, 1] = 1.5
+    diag = np.where(np.arange(30) > 22, 4, 0)
+    out, events = detector.update(np.full(30, s), np.arange(30), sensors, np.where(np.arange(30) > 21, 0.9, 0.1), diag)
+    assert [(e["type"], e["latency_samples"]) for e in events] == [("alert", 2.0), ("diagnosis", 4.0)]
+    assert events[1]["fault"] == 4
+    assert out["deviation"][25].tolist() == [False, True, False]
+    assert out["alert"][22] and not out["alert"][21]
+    assert np.allclose(detector.baseline(s), 1.0)
+
+def test_rolling_window_smooths_score():
+    detector = StreamDetector(window=4)
+    s = detector.add_stream()
+    out, _ = detector.update(np.full(6, s), np.arange(6), np.ones((6, 3)), [1, 0, 0, 0, 0, 0], np.zeros(6))
+    assert np.allclose(out["score"], [1, 0.5, 1 / 3, 0.25, 0, 0])
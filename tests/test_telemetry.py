@@ -0,0 +1,47 @@
+import asyncio
+import json
+from src.telemetry import TelemetryBroker, parse_sse, sse_events
+
+def collect(broker, last_id=-1):
+    async def run():
+        return "".join([chunk async for chunk in sse_events(broker, last_id)])
+    return list(parse_sse(asyncio.run(run()).split("\n")))
+
+def test_resume_from_last_id():
+    broker = TelemetryBroker(capacity=10)
+    for i in range(5):
+        broker.publish({"sample": i})
+    broker.close()
+    events = collect(broker, last_id=2)
+    assert [json.loads(d)["sample"] for e, _, d in events if e == "sample"] == [3, 4]
+    assert events[-1][0] == "end"
+
+def test_slow_subscriber_gets_gap_then_oldest():
+    broker = TelemetryBroker(capacity=3)
+    for i in range(6):
+        broker.publish({"sample": i})
+    broker.close()
+    events = collect(broker)
+    assert events[0][0] == "gap"
+    assert [int(i) for e, i, _ in events if e == "sample"] == [3, 4, 5]
+
+def test_subscriber_woken_by_publish():
+    broker = TelemetryBroker()
+
+    async def run():
+        async def produce():
+            await asyncio.sleep(0.01)
+            broker.publish({"sample": 0})
+            broker.close()
+        asyncio.get_running_loop().create_task(produce())
+        return [chunk async for chunk in sse_events(broker, heartbeat=5)]
+
+    chunks = asyncio.run(asyncio.wait_for(run(), timeout=2))
+    assert "event: sample" in chunks[0]
+
+def test_publish_after_close_is_dropped():
+    broker = TelemetryBroker()
+    broker.publish({"sample": 0})
+    broker.close()
+    assert broker.publish({"sample": 1}) == -1
+    assert broker.last_id == 0